@@ -0,0 +1,287 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'aiocore.py' contains the asyncio-based MQTT core,
+an alternative to the selector loop of 'network.py' ('connection: core: asyncio' in
+'config.yaml'). One dedicated thread runs an asyncio event loop; the sockets of the
+paho clients are registered with 'add_reader' / 'add_writer' via paho's external-loop
+socket hooks. Incoming events are published on a bounded async stream, which the GUI
+bridge ('forward') and the headless consumer await.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import asyncio
+import concurrent.futures
+import threading
+import traceback
+
+
+##############################################################################
+# EVENT STREAM
+##############################################################################
+class EventStream:
+    """
+    +++ Responsibilities of the event stream +++
+
+    1. Accept events from the MQTT callbacks ('put', same interface as IngestQueue)
+    2. Stay bounded: if the consumers fall behind, the oldest events are dropped
+    3. Hand out the events to consumers on the core's event loop ('await get()',
+       'async for event in stream')
+    """
+    def __init__(self, core, maxsize=10000):
+        """
+        Input:
+            core (AsyncCore): core whose event loop the consumers run on
+            maxsize (int): maximum number of buffered events
+        Output: None
+        """
+        self.core = core
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0  # Number of events dropped because the stream was full
+
+    def put(self, event):
+        """
+        Adds an event. Called on the core's loop (paho callbacks) or from any other
+        thread (e.g. replay), then handed over with 'call_soon_threadsafe'.
+
+        Input: event (IngestEvent)
+        Output: None
+        """
+        if threading.get_ident() == self.core.ident:
+            self.put_nowait(event)
+        else:
+            self.core.loop.call_soon_threadsafe(self.put_nowait, event)
+
+    def put_nowait(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()  # Drop the oldest event (callbacks must never block)
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        """
+        Waits for the next event.
+        """
+        return await self.queue.get()
+
+    def get_nowait(self):
+        """
+        Returns the oldest event or None if the stream is empty.
+        """
+        try:
+            return self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def __len__(self):
+        return self.queue.qsize()
+
+
+async def forward(stream, ingest):
+    """
+    GUI bridge: moves the events of the stream into the ingest queue, which is
+    drained by the Tkinter pump on the main loop.
+
+    Input: stream (EventStream), ingest (IngestQueue)
+    Output: None (runs until cancelled)
+    """
+    async for event in stream:
+        ingest.put(event)
+
+
+##############################################################################
+# ASYNCIO CORE
+##############################################################################
+class AsyncCore(threading.Thread):
+    """
+    +++ Responsibilities of the asyncio core +++
+
+    1. Run one asyncio event loop in a dedicated thread
+    2. Register the paho sockets with the loop (paho's socket hooks) and call
+       'loop_read' / 'loop_write' when they are ready
+    3. Run one task per client: connection attempts (with timeout, on a helper
+       thread, so the loop is never blocked), reconnect backoff and keep-alive
+    4. Cancel the tasks on 'remove' / 'stop' -> clean DISCONNECT
+
+    'add', 'remove' and 'stop' may be called from any thread (same interface as
+    'NetworkLoop' in 'network.py').
+    """
+    def __init__(self, misc_interval=1.0, close_timeout=2.0):
+        """
+        Input:
+            misc_interval (float): seconds between two 'loop_misc' calls
+            close_timeout (float): maximum wait for the DISCONNECT to be written
+        Output: None
+        """
+        super().__init__(name="mqtt-asyncio", daemon=True)
+        self.misc_interval = misc_interval
+        self.close_timeout = close_timeout
+        self.loop = asyncio.new_event_loop()
+        self.connector = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="mqtt-connect")
+        self.tasks = {}  # paho client -> Task
+        self.closing = set()  # Tasks of removed clients, still sending their DISCONNECT
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+            self.connector.shutdown(wait=False)
+
+    def submit(self, coroutine):
+        """
+        Runs a coroutine on the core's loop (from any thread).
+
+        Input: coroutine
+        Output: concurrent.futures.Future - result, exception or 'cancel()'
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call(self, function, *args):
+        """
+        Calls the function on the core's loop: directly on the loop thread, otherwise
+        with 'call_soon_threadsafe'.
+        """
+        if threading.get_ident() == self.ident:
+            function(*args)
+        elif not self.loop.is_closed():  # paho may still close sockets after the core stopped
+            self.loop.call_soon_threadsafe(function, *args)
+
+    def add(self, client, min_delay=1, max_delay=120):
+        """
+        Hands a paho client to the core. 'connect_async' must have been called.
+
+        Input: client (paho Client), min_delay / max_delay (float) - reconnect backoff
+        Output: None
+        """
+        client.on_socket_open = self.on_socket_open
+        client.on_socket_close = self.on_socket_close
+        client.on_socket_register_write = self.on_socket_register_write
+        client.on_socket_unregister_write = self.on_socket_unregister_write
+        self.call(self.start_task, client, min_delay, max_delay)
+
+    def remove(self, client):
+        """
+        Disconnects the client and removes it from the core.
+        """
+        self.call(self.cancel_task, client)
+
+    def stop(self):
+        """
+        Disconnects all clients and stops the event loop.
+        """
+        self.submit(self.shutdown())
+
+    def start_task(self, client, min_delay, max_delay):
+        self.tasks[client] = self.loop.create_task(self.run_client(client, min_delay, max_delay))
+
+    def cancel_task(self, client):
+        task = self.tasks.pop(client, None)
+        if task is not None:
+            task.cancel()
+            self.closing.add(task)
+            task.add_done_callback(self.closing.discard)
+
+    async def shutdown(self):
+        """
+        Cancels all tasks of the loop (clients, consumers, bridge), waits until the
+        clients sent their DISCONNECT and stops the loop.
+        """
+        self.tasks.clear()
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}  # Incl. clients which are still closing
+        for task in tasks - self.closing:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    async def run_client(self, client, min_delay, max_delay):
+        """
+        Task of one client: connects, reconnects with exponential backoff and runs
+        paho's housekeeping (keep-alive) until it is cancelled.
+        """
+        delay = min_delay
+        try:
+            while True:
+                if client.socket() is None:
+                    try:
+                        # Blocking DNS / TCP / TLS (limited by 'connect_timeout') on the helper thread
+                        await self.loop.run_in_executor(self.connector, client.reconnect)
+                    except Exception:
+                        on_connect_fail = client.on_connect_fail
+                        if on_connect_fail is not None:
+                            on_connect_fail(client, None)
+                        await asyncio.sleep(delay)
+                        delay = min(delay * 2, max_delay)
+                        continue
+                await asyncio.sleep(self.misc_interval)
+                client.loop_misc()  # Keep-alive ping / timeout
+                if client.is_connected():
+                    delay = min_delay  # Connected -> reset the backoff
+                elif client.socket() is None:
+                    await asyncio.sleep(delay)  # Connection lost -> wait before reconnecting
+                    delay = min(delay * 2, max_delay)
+        except asyncio.CancelledError:
+            await self.close_client(client)
+            raise
+
+    async def close_client(self, client):
+        """
+        Sends DISCONNECT and waits (at most 'close_timeout') until paho closed the socket.
+        """
+        client.disconnect()
+        try:
+            await asyncio.wait_for(self.socket_closed(client), self.close_timeout)
+        except asyncio.TimeoutError:
+            pass  # Broker did not take the DISCONNECT in time
+
+    async def socket_closed(self, client):
+        while client.socket() is not None:
+            await asyncio.sleep(0.05)
+
+    ##############################################################################
+    # PAHO SOCKET HOOKS (may be called from the loop or the connection helper)
+    ##############################################################################
+    def on_socket_open(self, client, userdata, sock):
+        self.call(self.loop.add_reader, sock, self.read, client)
+
+    def on_socket_close(self, client, userdata, sock):
+        self.call(self.forget_socket, sock)
+
+    def on_socket_register_write(self, client, userdata, sock):
+        self.call(self.loop.add_writer, sock, self.write, client)
+
+    def on_socket_unregister_write(self, client, userdata, sock):
+        self.call(self.loop.remove_writer, sock)
+
+    def forget_socket(self, sock):
+        self.loop.remove_reader(sock)
+        self.loop.remove_writer(sock)
+
+    def read(self, client):
+        """
+        Reads all available packets, including data buffered inside TLS / WebSocket
+        wrappers (invisible to the selector of the loop).
+        """
+        sock = client.socket()
+        while sock is not None:
+            try:
+                client.loop_read()
+            except Exception:
+                traceback.print_exc()
+                return
+            sock = client.socket()
+            if not (hasattr(sock, "pending") and sock.pending()):
+                return
+
+    def write(self, client):
+        if client.socket() is not None:
+            client.loop_write()
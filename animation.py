@@ -0,0 +1,368 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'animation.py' contains the animation engine of the
+message flow diagram. Any number of envelopes can be in flight at the same time, all of
+them glide along their waypoints, driven by one frame clock instead of one 'after'
+chain per envelope.
+Under message storms the level-of-detail controller switches from one envelope per
+message to sampled envelopes and finally to aggregated flow intensity.
+The envelope images are canvas items from a pool: they are hidden and moved when an
+envelope arrives, never deleted and recreated.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import time
+
+from scene import HIDDEN, NORMAL # Item states (envelopes are hidden, not deleted)
+
+
+##############################################################################
+# ENVELOPE RECORD
+##############################################################################
+class Envelope:
+    """
+    One envelope in flight on the canvas.
+
+    item_id: canvas item of the envelope image
+    path: waypoints (x, y) of the flow
+    start: time (monotonic) the envelope left the first waypoint
+    x, y: current position on the canvas
+    """
+    __slots__ = ("item_id", "path", "start", "x", "y")
+
+    def __init__(self, item_id, path, start, x, y):
+        self.item_id = item_id
+        self.path = path
+        self.start = start
+        self.x = x
+        self.y = y
+
+
+##############################################################################
+# SPRITE POOL
+##############################################################################
+class SpritePool:
+    """
+    +++ Responsibilities of the sprite pool +++
+
+    1. Hand out image items for envelopes: a free (hidden) item is moved with
+       'coords' and shown, a new item is only created while the pool is not full
+    2. Take items back by hiding them ('release'), so the canvas item table does
+       not grow or churn during long runs
+    """
+    def __init__(self, canvas, size):
+        """
+        Input: canvas (Canvas), size (int) - maximum number of items (envelopes in flight)
+        Output: None
+        """
+        self.canvas = canvas
+        self.size = size
+        self.free = []  # Hidden items ready for reuse
+        self.images = {}  # item -> image currently set
+        self.created = 0
+
+    def acquire(self, image, x, y):
+        """
+        Input: image (PhotoImage), x, y (float) - position
+        Output: int - canvas item, None if all 'size' items are in use
+        """
+        if self.free:
+            item_id = self.free.pop()
+            self.canvas.coords(item_id, x, y)
+            if self.images[item_id] is image:
+                self.canvas.itemconfigure(item_id, state=NORMAL)
+            else:
+                self.canvas.itemconfigure(item_id, image=image, state=NORMAL)
+        elif self.created < self.size:
+            item_id = self.canvas.create_image(x, y, image=image)
+            self.created += 1
+        else:
+            return None
+        self.images[item_id] = image
+        return item_id
+
+    def release(self, item_id):
+        self.canvas.itemconfigure(item_id, state=HIDDEN)
+        self.free.append(item_id)
+
+
+##############################################################################
+# ANIMATION ENGINE
+##############################################################################
+class AnimationEngine:
+    """
+    +++ Responsibilities of the animation engine +++
+
+    1. Create an envelope at the first waypoint of a flow
+    2. Move all envelopes smoothly along their waypoints (one segment per 'step_ms'),
+       driven by one frame clock for the whole canvas ('frame_rate' frames per second)
+    3. Skip frames when the main loop is behind; positions follow the elapsed time,
+       so envelopes keep their speed and only the motion gets coarser
+    4. Limit the number of envelopes on the canvas; messages above the limit are
+       only counted and shown in a badge ('+N') instead of being animated
+    """
+    def __init__(self, root, canvas, max_sprites=25, step_ms=1500, frame_rate=30, badge_position=(620, 30)):
+        """
+        Input:
+            root: Tkinter root window (provides 'after')
+            canvas (Canvas): canvas of the message flow diagram
+            max_sprites (int): maximum number of envelopes in flight
+            step_ms (int): travel time between two waypoints
+            frame_rate (int): frames per second of the frame clock
+            badge_position (tuple): position of the overflow badge
+        Output: None
+        """
+        self.root = root
+        self.canvas = canvas
+        self.max_sprites = max_sprites
+        self.step = step_ms / 1000.0
+        self.frame = 1.0 / frame_rate
+        self.badge_position = badge_position
+        self.envelopes = []
+        self.sprites = SpritePool(canvas, max_sprites)  # Envelope items are reused
+        self.overflow = 0  # Messages not animated because the limit was reached
+        self.badge_id = None
+        self.badge_text = ""
+        self.after_id = None
+        self.due = 0.0  # Time (monotonic) of the next frame
+        self.skipped_frames = 0  # Frames dropped because the main loop was behind
+
+    def spawn(self, image, path):
+        """
+        Starts a new envelope on the given path.
+
+        Input:
+            image (PhotoImage): image of the envelope
+            path (sequence): waypoints (x, y) of the flow
+        Output:
+            None
+        """
+        if len(self.envelopes) >= self.max_sprites:
+            self.overflow += 1
+            self.update_badge()
+            return
+
+        x, y = path[0]
+        item_id = self.sprites.acquire(image, x, y)
+        now = time.monotonic()
+        self.envelopes.append(Envelope(item_id, path, now, x, y))
+
+        if self.after_id is None:
+            self.due = now + self.frame
+            self.after_id = self.root.after(int(self.frame * 1000), self.tick)
+
+    def position(self, envelope, now):
+        """
+        Returns the position of the envelope on its path at the given time
+        (linear interpolation between two waypoints), None once the path is done.
+
+        Input: envelope (Envelope), now (float)
+        Output: tuple (x, y) or None
+        """
+        path = envelope.path
+        progress = (now - envelope.start) / self.step
+        segment = int(progress)
+        if segment >= len(path) - 1:
+            if segment == 0:
+                return path[0]  # One-point path -> shown for one step
+            return None  # Last waypoint reached
+        (x1, y1), (x2, y2) = path[segment], path[segment + 1]
+        fraction = progress - segment
+        return x1 + (x2 - x1) * fraction, y1 + (y2 - y1) * fraction
+
+    def tick(self):
+        """
+        One frame: moves every envelope to its interpolated position and removes
+        finished envelopes. The clock stops as soon as no envelope is in flight.
+
+        Input: None
+        Output: None
+        """
+        now = time.monotonic()
+        in_flight = []
+        move = self.canvas.move
+        for envelope in self.envelopes:
+            position = self.position(envelope, now)
+            if position is None:
+                self.sprites.release(envelope.item_id)  # End of the path reached -> back to the pool
+                continue
+            x, y = position
+            dx, dy = x - envelope.x, y - envelope.y
+            if dx or dy:
+                move(envelope.item_id, dx, dy)
+                envelope.x, envelope.y = x, y
+            in_flight.append(envelope)
+        self.envelopes = in_flight
+
+        if not self.envelopes:
+            self.after_id = None
+            self.overflow = 0  # Burst is over -> reset the badge
+            self.update_badge()
+            return
+
+        # Frame budget: the next frame stays on the fixed grid; frames whose time
+        # has already passed are skipped instead of being rendered late
+        self.due += self.frame
+        now = time.monotonic()
+        if now > self.due:
+            behind = int((now - self.due) / self.frame) + 1
+            self.skipped_frames += behind
+            self.due += behind * self.frame
+        self.after_id = self.root.after(max(1, int((self.due - now) * 1000)), self.tick)
+
+    def update_badge(self):
+        """
+        Shows the number of messages which were not animated ('+N'), hides it at 0.
+        """
+        text = f"+{self.overflow}" if self.overflow else ""
+        if text == self.badge_text:
+            return  # Unchanged -> no canvas update
+        self.badge_text = text
+        if self.badge_id is None:
+            x, y = self.badge_position
+            self.badge_id = self.canvas.create_text(x, y, text=text, font=("Arial", 12, "bold"), fill="red")
+        else:
+            self.canvas.itemconfig(self.badge_id, text=text)
+
+    def clear(self):
+        """
+        Removes all envelopes from the canvas and stops the frame clock.
+        """
+        for envelope in self.envelopes:
+            self.sprites.release(envelope.item_id)
+        self.envelopes = []
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.overflow = 0
+        self.update_badge()
+
+
+##############################################################################
+# LEVEL OF DETAIL
+##############################################################################
+class LevelOfDetail:
+    """
+    +++ Responsibilities of the level-of-detail controller +++
+
+    Chooses how messages are rendered, based on the GUI's own frame time, the backlog
+    of the ingest queue and the message rate:
+
+        'full'       -> one envelope per message
+        'sampled'    -> one envelope every N messages per flow (N follows the rate)
+        'aggregated' -> no envelopes, the arrows of the flows show the intensity
+
+    A lower level is only chosen again after 'calm_periods' quiet evaluations
+    (hysteresis), so the display does not flicker between the levels.
+    """
+    FULL = "full"
+    SAMPLED = "sampled"
+    AGGREGATED = "aggregated"
+    LEVELS = (FULL, SAMPLED, AGGREGATED)
+
+    def __init__(self, frame_budget_ms=12, full_max_rate=5, sampled_max_rate=200,
+                 backlog_low=50, backlog_high=1000, calm_periods=3, period_ms=1000):
+        """
+        Input:
+            frame_budget_ms (int): frame budget of the ingest pump
+            full_max_rate (float): messages/s up to which every message is animated
+            sampled_max_rate (float): messages/s up to which envelopes are sampled
+            backlog_low / backlog_high (int): queue depths for 'sampled' / 'aggregated'
+            calm_periods (int): quiet evaluations before switching to a lower level
+            period_ms (int): length of one evaluation period
+        Output: None
+        """
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.full_max_rate = full_max_rate
+        self.sampled_max_rate = sampled_max_rate
+        self.backlog_low = backlog_low
+        self.backlog_high = backlog_high
+        self.calm_periods = calm_periods
+        self.period = period_ms / 1000.0
+
+        self.level = self.FULL
+        self.sample_every = 1
+        self.calm = 0
+        self.period_start = time.monotonic()
+        self.frames = 0
+        self.frame_time_sum = 0.0
+        self.backlog_max = 0
+        self.messages = 0
+        self.flow_counts = {}  # flow name -> messages in the current period
+        self.flow_rates = {}  # flow name -> messages/s of the last period
+        self.sample_counters = {}
+
+    def admit(self, flow_name):
+        """
+        Counts a message of the flow and decides whether it gets an envelope.
+
+        Input: flow_name (str)
+        Output: bool - True -> animate the message
+        """
+        self.messages += 1
+        self.flow_counts[flow_name] = self.flow_counts.get(flow_name, 0) + 1
+        if self.level == self.FULL:
+            return True
+        if self.level == self.SAMPLED:
+            counter = self.sample_counters.get(flow_name, 0)
+            self.sample_counters[flow_name] = counter + 1
+            return counter % self.sample_every == 0
+        return False
+
+    def update(self, frame_time, backlog):
+        """
+        Adds the measurement of one frame. At the end of each period the level is
+        evaluated and the message rates per flow ('flow_rates') are updated.
+
+        Input:
+            frame_time (float): seconds spent in the last frame (incl. lateness)
+            backlog (int): events left in the ingest queue after the frame
+        Output:
+            bool - True at the end of a period (level and 'flow_rates' updated)
+        """
+        self.frames += 1
+        self.frame_time_sum += frame_time
+        if backlog > self.backlog_max:
+            self.backlog_max = backlog
+
+        now = time.monotonic()
+        elapsed = now - self.period_start
+        if elapsed < self.period:
+            return False
+
+        rate = self.messages / elapsed
+        frame_time_avg = self.frame_time_sum / self.frames
+        self.flow_rates = {name: count / elapsed for name, count in self.flow_counts.items()}
+
+        if self.backlog_max > self.backlog_high or frame_time_avg > 0.75 * self.frame_budget or rate > self.sampled_max_rate:
+            target = self.AGGREGATED
+        elif self.backlog_max > self.backlog_low or rate > self.full_max_rate:
+            target = self.SAMPLED
+        else:
+            target = self.FULL
+        self.sample_every = max(1, int(rate / self.full_max_rate + 0.5))
+
+        # Reset the period
+        self.period_start = now
+        self.frames = 0
+        self.frame_time_sum = 0.0
+        self.backlog_max = 0
+        self.messages = 0
+        self.flow_counts = {}
+
+        current = self.LEVELS.index(self.level)
+        wanted = self.LEVELS.index(target)
+        if wanted > current:
+            self.calm = 0
+            self.level = target  # Under pressure -> switch up immediately
+        elif wanted < current:
+            self.calm += 1
+            if self.calm >= self.calm_periods:
+                self.calm = 0
+                self.level = self.LEVELS[current - 1]  # Step down one level at a time
+        else:
+            self.calm = 0
+        return True
@@ -0,0 +1,70 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'assets.py' loads all images of the GUI (envelopes,
+logos) once at startup. The decoded and resized images are shared, so the animations
+do no file I/O or image decoding per message.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import os
+
+#############################################################################
+# IMAGE TABLE: NAME -> (FILE, SUBSAMPLE FACTOR)
+#############################################################################
+PICTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pictures")
+
+IMAGES = {
+    "mqtt": ("mqtt.png", 1),                        # Window icon
+    "sap_logo": ("sap-logo.png", 7),                # SAP in the diagram
+    "yellow_envelope": ("yellow-envelope.png", 9),  # Envelope 'toMES'
+    "red_envelope": ("red-envelope.png", 13),       # Envelope 'toERP'
+}
+
+
+##############################################################################
+# ASSET CACHE
+##############################################################################
+class AssetCache:
+    """
+    +++ Responsibilities of the asset cache +++
+
+    1. Decode and resize every image exactly once
+    2. Hand out shared PhotoImage references (and keep them alive for Tkinter)
+    """
+    def __init__(self, images=IMAGES):
+        """
+        Input: images (dict) - name -> (file in 'pictures/', subsample factor)
+        Output: None
+        """
+        self.images = images
+        self.cache = {}
+
+    def load(self):
+        """
+        Loads all images. Must be called after the Tkinter root window exists.
+
+        Input: None
+        Output: None
+        """
+        for name in self.images:
+            self.get(name)
+
+    def get(self, name):
+        """
+        Returns the shared image for the given name (loaded on first access).
+
+        Input: name (str)
+        Output: PhotoImage
+        """
+        image = self.cache.get(name)
+        if image is None:
+            import tkinter as tk  # Imported with the first image -> 'IMAGES' is readable without a GUI ('config.py')
+            file, factor = self.images[name]
+            image = tk.PhotoImage(file=os.path.join(PICTURES_DIR, file))
+            if factor > 1:
+                image = image.subsample(factor, factor)
+            self.cache[name] = image
+        return image
@@ -0,0 +1,142 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'bench_ring.py' measures the hand-off of the
+ingest process ('procingest.py'): a writer process classifies synthetic messages
+and writes them into the shared-memory ring, the main process drains the ring like
+the GUI's ingest pump (one batch per frame).
+
+Reported: write and read rate, dropped records, hand-off latency percentiles
+(reception in the writer -> read in the main process) and the time per read record.
+
+Usage (from the repository root):
+    python -m bench.bench_ring --rate 5000 --duration 5
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fakes import percentile
+
+
+##############################################################################
+# WRITER PROCESS
+##############################################################################
+def write_messages(name, slots, topic_bytes, payload_bytes, topics, payload, rate, duration, sent):
+    """
+    Writes messages into the ring for 'duration' seconds (at 'rate' per second or as
+    fast as possible). The number of written messages is stored in 'sent'.
+    """
+    from config import ConfigWatcher
+    from ingest import IngestEvent
+    from latency import load_latency
+    from procingest import RingWriter
+    from routing import FlowRouter
+    from rules import RuleEngine
+
+    config = ConfigWatcher().load()
+    router = FlowRouter(config.flows)
+    memory = shared_memory.SharedMemory(name)
+    ring = RingWriter(memory, slots, topic_bytes, payload_bytes, router,
+                      RuleEngine(*config.rules), load_latency(config.get("latency")))
+    count = 0
+    start = time.perf_counter()
+    end = start + duration
+    now = start
+    while now < end:
+        ring.put(IngestEvent("message", topics[count % len(topics)], payload))
+        count += 1
+        if rate:
+            delay = start + count / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        now = time.perf_counter()
+    sent.value = count
+    ring.close()
+
+
+##############################################################################
+# BENCHMARK
+##############################################################################
+def run(rate, duration, payload_size, topics, slots=8192, topic_bytes=256, payload_bytes=1024, interval_ms=16):
+    """
+    Runs one benchmark and returns the results as dictionary.
+    """
+    from config import ConfigWatcher
+    from procingest import HEADER_SIZE, RingReader, ring_size
+    from routing import FlowRouter
+
+    router = FlowRouter(ConfigWatcher().load().flows)
+    memory = shared_memory.SharedMemory(create=True, size=ring_size(slots, topic_bytes, payload_bytes))
+    memory.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+    reader = RingReader(memory, slots, topic_bytes, payload_bytes, router.flows)
+    context = multiprocessing.get_context("spawn")
+    sent = context.Value("q", 0)
+    writer = context.Process(target=write_messages, args=(
+        memory.name, slots, topic_bytes, payload_bytes, topics, b"x" * payload_size, rate, duration, sent))
+
+    latencies = []
+    received = 0
+    read_time = 0.0
+    writer.start()
+    start = time.perf_counter()
+    while writer.is_alive() or len(reader):
+        frame = time.perf_counter()
+        event = reader.get()
+        while event is not None:
+            received += 1
+            latencies.append(time.perf_counter() - event.received)
+            event = reader.get()
+        read_time += time.perf_counter() - frame
+        time.sleep(interval_ms / 1000.0)
+    elapsed = time.perf_counter() - start
+    writer.join()
+    dropped = reader.dropped
+    reader.close()
+    memory.unlink()
+
+    return {
+        "target_rate": rate or "max",
+        "sent": sent.value,
+        "received": received,
+        "dropped": dropped,
+        "write_rate": round(sent.value / duration, 1),
+        "read_rate": round(received / elapsed, 1),
+        "read_us_per_record": round(read_time / received * 1e6, 2) if received else 0.0,
+        "latency_ms_p50": round(percentile(latencies, 0.50) * 1000, 2),
+        "latency_ms_p99": round(percentile(latencies, 0.99) * 1000, 2),
+        "latency_ms_max": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-memory ring benchmark of the ingest process.")
+    parser.add_argument("--rate", type=float, default=None, help="messages per second (default: as fast as possible)")
+    parser.add_argument("--duration", type=float, default=5.0, help="writing time in seconds")
+    parser.add_argument("--payload-size", type=int, default=200, help="payload size in bytes")
+    parser.add_argument("--topics", nargs="+", default=["KU2UWdy8/toMES", "KU2UWdy8/toERP"],
+                        help="topics written in turn")
+    parser.add_argument("--slots", type=int, default=8192, help="records in the ring")
+    parser.add_argument("--json", action="store_true", help="print the results as one JSON line")
+    args = parser.parse_args()
+
+    results = run(args.rate, args.duration, args.payload_size, args.topics, slots=args.slots)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
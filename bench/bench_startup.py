@@ -0,0 +1,120 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'bench_startup.py' measures how fast the visualizer
+starts. Every run is a fresh interpreter:
+
+- Import profile ('python -X importtime'): time to import 'gui' and the slowest
+  modules imported before the first paint
+- With a display (--display, e.g. under Xvfb): time from process start to the first
+  paint of the window and until the MQTT stack is ready (milestones of
+  'MQTTVisualizerGUI.startup')
+
+Usage (from the repository root):
+    python -m bench.bench_startup --runs 5
+    xvfb-run python -m bench.bench_startup --display
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules which should only be imported after the first paint
+DEFERRED = ("paho.mqtt.client", "asyncio", "sqlite3", "multiprocessing", "mqttclient", "network", "aiocore", "procingest",
+            "history", "historyview")
+
+# Child process of the display measurement: prints the startup milestones (epoch seconds)
+CHILD = """
+import json, time
+started = time.time()
+from gui import MQTTVisualizerGUI
+imported = time.time()
+app = MQTTVisualizerGUI()
+print(json.dumps(dict(app.startup, started=started, imported=imported)))
+app.close()
+"""
+
+
+##############################################################################
+# IMPORT PROFILE
+##############################################################################
+def import_profile(module="gui"):
+    """
+    Imports the module in a fresh interpreter with '-X importtime'.
+
+    Input: module (str)
+    Output: dict - module name -> (self us, cumulative us)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def startup_times():
+    """
+    Starts the GUI once in a fresh interpreter.
+
+    Output: dict - milestone -> milliseconds since the process was started
+    """
+    spawned = time.time()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True)
+    milestones = json.loads(result.stdout.strip().splitlines()[-1])
+    return {name: (value - spawned) * 1000 for name, value in milestones.items()}
+
+
+def run(runs, display, top):
+    """
+    Runs the benchmark and returns the results as dictionary.
+    """
+    profiles = [import_profile() for _ in range(runs)]
+    gui_ms = [profile["gui"][1] / 1000 for profile in profiles]
+    last = profiles[-1]
+    slowest = sorted((name for name in last if name != "gui"), key=lambda name: -last[name][1])
+    results = {
+        "runs": runs,
+        "import_gui_ms": round(statistics.median(gui_ms), 1),
+        "modules_loaded": len(last),
+        "deferred_but_loaded": [name for name in DEFERRED if name in last],
+        "slowest_imports_ms": {name: round(last[name][1] / 1000, 1) for name in slowest[:top]},
+    }
+
+    if display:
+        samples = [startup_times() for _ in range(runs)]
+        for milestone in ("imported", "first_paint", "ready"):
+            results[f"{milestone}_ms"] = round(statistics.median(sample[milestone] for sample in samples), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark of the MQTT visualizer (import time, time to first paint).")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports listed")
+    parser.add_argument("--display", action="store_true", help="also start the window (needs a display / Xvfb)")
+    parser.add_argument("--json", action="store_true", help="print the results as one JSON line")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.display, args.top)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'bench_throughput.py' measures how many messages
+per second 'MQTTClient' + 'MQTTVisualizerGUI' can absorb. A fake publisher thread
+calls 'MQTTClient.on_message' (no broker, no network), the GUI runs either with
+stubbed Tkinter widgets (default) or with a real window (--display, e.g. under Xvfb).
+
+Reported: ingest rate, queue depth, message -> pixel latency percentiles, RSS growth.
+
+Usage (from the repository root):
+    python -m bench.bench_throughput --rate 1000 --duration 10
+    xvfb-run python -m bench.bench_throughput --display
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fakes import FakePublisher, StubCanvas, StubRoot, StubText, percentile, rss_bytes
+
+
+##############################################################################
+# GUI UNDER TEST
+##############################################################################
+class StubAssets:
+    """
+    Asset cache stand-in (no images without a Tkinter root).
+    """
+    def load(self):
+        pass
+
+    def get(self, name):
+        return name
+
+
+def build_stub_gui(config):
+    """
+    Creates a 'MQTTVisualizerGUI' with the real ingest, log, routing and animation
+    code, but with stubbed Tkinter root, canvas and text widget (no input widgets).
+
+    Input: config (Config) - the history is disabled (measured separately, see
+           'history.py') and the selector core is used (FakePublisher calls the
+           'on_message' of the clients in this process)
+    """
+    from config import Config
+    from gui import MQTTVisualizerGUI
+
+    data = dict(config.data)
+    data["history"] = dict(data.get("history") or {}, enabled=False)
+    data["connection"] = dict(data.get("connection") or {}, core="selector")
+    gui = MQTTVisualizerGUI(root=StubRoot(), assets=StubAssets(), canvas=StubCanvas(), log_text=StubText(),
+                            app_config=Config(data))
+    gui.mqtt_client.topic = config.topic or "KU2UWdy8/+"
+    return gui
+
+
+class Probe:
+    """
+    Hooks into the GUI to measure queue depth and message -> pixel latency.
+
+    A message counts as "on screen" once the log view has written it to the widget
+    (with --display additionally after Tk has processed the redraw).
+    """
+    def __init__(self, gui, display):
+        self.gui = gui
+        self.display = display
+        self.handled = 0
+        self.waiting = []  # Reception times of handled messages not yet on screen
+        self.latencies = []
+        self.depths = []
+
+        handle_event = gui.handle_event
+        pump = gui.ingest_pump.pump
+        flush = gui.log_view.flush
+
+        def probed_handle_event(event):
+            if event.kind == "message":
+                self.handled += 1
+                self.waiting.append(event.received)
+            handle_event(event)
+
+        def probed_pump():
+            self.depths.append(len(gui.ingest))
+            pump()
+
+        def probed_flush():
+            flush()
+            if self.display:
+                gui.root.update_idletasks()
+            now = time.perf_counter()
+            self.latencies.extend(now - received for received in self.waiting)
+            self.waiting.clear()
+
+        gui.ingest_pump.dispatch = probed_handle_event
+        gui.ingest_pump.pump = probed_pump
+        gui.log_view.flush = probed_flush
+
+
+##############################################################################
+# BENCHMARK
+##############################################################################
+def run(rate, duration, payload_size, display, topics, probes=False):
+    """
+    Runs one benchmark and returns the results as dictionary.
+    """
+    from config import ConfigWatcher
+    config = ConfigWatcher().load()
+    if display:
+        from gui import MQTTVisualizerGUI
+        gui = MQTTVisualizerGUI()
+        gui.mqtt_client.topic = config.topic
+    else:
+        gui = build_stub_gui(config)
+
+    if probes:
+        gui.instrumentation.enable()  # Before the publisher takes 'on_message'
+    probe = Probe(gui, display)
+    publisher = FakePublisher(gui.mqtt_client.on_message, topics, b"x" * payload_size, rate, duration)
+
+    rss_start = rss_bytes()
+    start = time.perf_counter()
+    gui.ingest_pump.start()
+    publisher.start()
+    drain_until = start + duration + 1.0  # Let the GUI catch up after the publisher stops
+    if display:
+        gui.root.after(int((drain_until - start) * 1000), gui.root.quit)
+        gui.root.mainloop()
+    else:
+        gui.root.run_until(drain_until)
+    publisher.join()
+    elapsed = time.perf_counter() - start
+
+    results = {
+        "mode": "display" if display else "stub",
+        "target_rate": rate or "max",
+        "sent": publisher.sent,
+        "handled": probe.handled,
+        "dropped": gui.ingest.dropped,
+        "publish_rate": round(publisher.sent / duration, 1),
+        "ingest_rate": round(probe.handled / elapsed, 1),
+        "queue_depth_max": max(probe.depths, default=0),
+        "queue_depth_mean": round(sum(probe.depths) / len(probe.depths), 1) if probe.depths else 0,
+        "latency_ms_p50": round(percentile(probe.latencies, 0.50) * 1000, 2),
+        "latency_ms_p95": round(percentile(probe.latencies, 0.95) * 1000, 2),
+        "latency_ms_p99": round(percentile(probe.latencies, 0.99) * 1000, 2),
+        "latency_ms_max": round(max(probe.latencies, default=0) * 1000, 2),
+        "canvas_items": len(gui.canvas.items) if not display else len(gui.canvas.find_all()),
+        "canvas_items_created": gui.canvas.created if not display else None,
+        "rss_start_mb": round(rss_start / 2**20, 1),
+        "rss_growth_mb": round((rss_bytes() - rss_start) / 2**20, 1),
+    }
+    if probes:
+        results["probes"] = gui.instrumentation.snapshot()["timings"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput/latency benchmark of the MQTT visualizer (no network).")
+    parser.add_argument("--rate", type=float, default=None, help="messages per second (default: as fast as possible)")
+    parser.add_argument("--duration", type=float, default=5.0, help="publishing time in seconds")
+    parser.add_argument("--payload-size", type=int, default=200, help="payload size in bytes")
+    parser.add_argument("--topics", nargs="+", default=["KU2UWdy8/toMES", "KU2UWdy8/toERP"],
+                        help="topics published in turn")
+    parser.add_argument("--display", action="store_true", help="use the real Tkinter window (needs a display / Xvfb)")
+    parser.add_argument("--probes", action="store_true", help="enable the timing probes and report them (see 'instrumentation.py')")
+    parser.add_argument("--json", action="store_true", help="print the results as one JSON line")
+    args = parser.parse_args()
+
+    results = run(args.rate, args.duration, args.payload_size, args.display, args.topics, args.probes)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'fakes.py' contains the stand-ins used by the
+benchmarks: a fake MQTT message/publisher (no broker, no network) and stubs for the
+Tkinter root, canvas and text widget, so the GUI code runs without a display.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+##############################################################################
+# FAKE MQTT MESSAGE + PUBLISHER
+##############################################################################
+class FakeMessage:
+    """
+    Same attributes as paho's MQTTMessage which are used by 'MQTTClient.on_message'.
+    """
+    __slots__ = ("topic", "payload", "qos", "retain", "mid", "dup", "timestamp", "properties")
+
+    def __init__(self, topic, payload, qos=0):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = False
+        self.mid = 0
+        self.dup = False
+        self.timestamp = time.monotonic()
+        self.properties = None
+
+
+class FakePublisher(threading.Thread):
+    """
+    Calls 'on_message' from its own thread like paho's network thread does.
+
+    rate = None publishes as fast as possible, otherwise 'rate' messages per second.
+    """
+    def __init__(self, on_message, topics, payload, rate=None, duration=5.0):
+        super().__init__(daemon=True)
+        self.on_message = on_message
+        self.topics = topics
+        self.payload = payload
+        self.rate = rate
+        self.duration = duration
+        self.sent = 0
+
+    def run(self):
+        topics = itertools.cycle(self.topics)
+        start = time.perf_counter()
+        end = start + self.duration
+        interval = 1.0 / self.rate if self.rate else 0.0
+        now = start
+        while now < end:
+            self.on_message(None, None, FakeMessage(next(topics), self.payload))
+            self.sent += 1
+            now = time.perf_counter()
+            if interval:
+                delay = start + self.sent * interval - now
+                if delay > 0:
+                    time.sleep(delay)
+                    now = time.perf_counter()
+
+
+##############################################################################
+# TKINTER STUBS
+##############################################################################
+class StubRoot:
+    """
+    Main loop stand-in: 'after' callbacks are kept in a heap and run on the
+    calling thread by 'run_until'.
+    """
+    def __init__(self):
+        self.timers = []
+        self.counter = itertools.count()
+        self.cancelled = set()
+
+    def after(self, ms, callback, *args):
+        timer_id = next(self.counter)
+        heapq.heappush(self.timers, (time.perf_counter() + ms / 1000.0, timer_id, callback, args))
+        return timer_id
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def bind(self, sequence, callback):
+        pass  # No key events without a window
+
+    def iconphoto(self, default, image):
+        pass
+
+    def update(self):
+        pass  # Nothing to paint
+
+    def run_until(self, end):
+        """
+        Runs all timers until the time 'end' (perf_counter) is reached.
+        """
+        while self.timers:
+            due, timer_id, callback, args = self.timers[0]
+            if due > end:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            heapq.heappop(self.timers)
+            if timer_id in self.cancelled:
+                self.cancelled.discard(timer_id)
+                continue
+            callback(*args)
+
+
+class StubCanvas:
+    """
+    Canvas stand-in which only keeps the coordinates of its items.
+    """
+    def __init__(self):
+        self.items = {}
+        self.counter = itertools.count(1)
+        self.created = 0
+
+    def create_item(self, *coords, **options):
+        item_id = next(self.counter)
+        self.items[item_id] = [list(coords), options]
+        self.created += 1
+        return item_id
+
+    create_image = create_text = create_line = create_rectangle = create_item
+
+    def coords(self, item_id, *coords):
+        if coords:
+            self.items[item_id][0] = list(coords)
+        return self.items[item_id][0]
+
+    def move(self, item_id, dx, dy):
+        item = self.items.get(item_id)
+        if item is not None:
+            item[0][0] += dx
+            item[0][1] += dy
+
+    def itemconfig(self, item_id, **options):
+        item = self.items.get(item_id)
+        if item is not None:
+            item[1].update(options)
+
+    itemconfigure = itemconfig
+
+    def find_withtag(self, tag):
+        return [item_id for item_id in self.items if item_id == tag]
+
+    def delete(self, item_id):
+        if item_id == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item_id, None)
+
+
+class StubText:
+    """
+    Text widget stand-in which only counts its lines.
+    """
+    def __init__(self):
+        self.lines = 0
+
+    def config(self, **options):
+        pass
+
+    configure = config
+
+    def insert(self, index, text, *tags):
+        self.lines += text.count("\n")
+
+    def delete(self, first, last=None):
+        if last == "end":
+            self.lines = 0
+        elif last is not None:
+            self.lines -= int(str(last).split(".")[0]) - int(str(first).split(".")[0])
+
+    def see(self, index):
+        pass
+
+
+##############################################################################
+# PROCESS MEMORY
+##############################################################################
+def rss_bytes():
+    """
+    Returns the resident set size of the process in bytes (Linux: /proc, otherwise
+    the peak RSS of 'resource').
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, fraction):
+    """
+    Returns the percentile (0.0 - 1.0) of the values (nearest rank).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,327 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'config.py' loads the configuration file
+'config.yaml' (broker, port, topic, flows, ...). Used by the GUI and the headless mode.
+
+The file is parsed once and cached; 'ConfigWatcher' polls its modification time
+(one 'stat' per poll) and returns a new validated 'Config' only when the file was
+changed. 'changed_keys' tells which settings differ, so the GUI can apply a change
+incrementally (resubscribe, reroute, ...) instead of restarting.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import os
+
+import yaml
+
+from assets import IMAGES
+from latency import UNITS
+from routing import ARROWS, check_filter, load_flows
+from rules import load_rules
+
+# libyaml parser if available (about 10x faster than the pure Python parser)
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+#############################################################################
+# CONFIG FILE (next to this module)
+#############################################################################
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+CORES = ("selector", "asyncio", "process")
+PROTOCOLS = ("3.1.1", "5")
+LATENCY_UNITS = tuple(UNITS) + ("iso", "auto")
+
+
+def resolve_path(path):
+    """
+    Relative paths in 'config.yaml' are relative to the directory of the config file.
+    """
+    return os.path.join(os.path.dirname(CONFIG_FILE), path)
+
+
+def file_stamp(path):
+    """
+    Modification time and size of the file (None if it does not exist).
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return (status.st_mtime_ns, status.st_size)
+
+
+_parsed = {}  # path -> (file stamp, 'data' section)
+
+
+def parse_config(path=CONFIG_FILE):
+    """
+    Parses the YAML file (cached until the file changes).
+
+    Input: path (str) - path of the YAML file
+    Output: dict - 'data' section
+    Raises: OSError if the file cannot be read, yaml.YAMLError / ValueError if it is invalid
+    """
+    stamp = file_stamp(path)
+    cached = _parsed.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(path, "r") as file:
+        document = yaml.load(file, Loader=SafeLoader)
+    if not isinstance(document, dict) or not isinstance(document.get("data"), dict):
+        raise ValueError("No 'data' section.")
+    _parsed[path] = (stamp, document["data"])
+    return document["data"]
+
+
+def load_config(path=CONFIG_FILE):
+    """
+    Loads the YAML file and returns the data
+
+    Input: path (str) - path of the YAML file
+    Output: dict or None (file missing or invalid)
+    """
+    try:
+        return parse_config(path)
+    except FileNotFoundError:
+        print(f"Error: '{path}' had not been found.")
+    except (yaml.YAMLError, ValueError) as e:
+        print(f"Error: parsing YAML file: '{e}'.")
+        return None
+
+
+##############################################################################
+# PLANTS (FURTHER BROKERS)
+##############################################################################
+class Plant:
+    """
+    One broker declared under 'brokers' in 'config.yaml'.
+    """
+    __slots__ = ("name", "broker", "port", "filters", "websocket", "tls", "lane", "qos")
+
+    def __init__(self, name, broker, port, filters, websocket=False, tls=False, lane=0, qos=None):
+        self.name = name
+        self.broker = broker
+        self.port = port
+        self.filters = filters
+        self.websocket = websocket
+        self.tls = tls
+        self.lane = lane
+        self.qos = qos  # None -> 'connection.qos'
+
+    def __repr__(self):
+        return f"Plant({self.name!r})"
+
+
+def load_plants(declarations):
+    """
+    Creates the plants from the declarations of 'config.yaml'. Plants without a
+    'lane' get the next free lane (lane 0 belongs to the primary broker).
+
+    Input: declarations (list of dict) - name, broker, port, filters, websocket, tls, lane, qos
+    Output: list of Plant
+    Raises: ValueError if a declaration is incomplete
+    """
+    plants = []
+    for index, declaration in enumerate(declarations or ()):
+        try:
+            name = declaration["name"]
+            broker = declaration["broker"]
+            port = int(declaration.get("port", 1883))
+            filters = declaration["filters"]
+            lane = int(declaration.get("lane", index + 1))
+            qos = declaration.get("qos")
+            if qos is not None and int(qos) not in (0, 1, 2):
+                raise ValueError(f"QoS must be 0, 1 or 2, not {qos}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid broker declaration '{declaration}': {e}") from None
+        if isinstance(filters, str):
+            filters = [filters]
+        if not filters:
+            raise ValueError(f"Broker '{name}' has no topic filters.")
+        for topic_filter in filters:
+            check_filter(topic_filter)
+        plants.append(Plant(name, broker, port, tuple(filters), bool(declaration.get("websocket", False)),
+                            bool(declaration.get("tls", False)), lane, None if qos is None else int(qos)))
+    return plants
+
+
+
+##############################################################################
+# VALIDATED CONFIGURATION
+##############################################################################
+class Config:
+    """
+    Validated 'data' section of 'config.yaml'.
+
+    The settings which are checked (and applied while running) are typed attributes;
+    all other settings are read with 'get' like from the dictionary.
+
+    broker, port, topic: primary broker
+    core, protocol, qos: 'connection' settings
+    plants: tuple of Plant ('brokers')
+    flows: list of Flow, rules: (list of Rule, field paths) - see 'routing.py' / 'rules.py'
+    retention_hours: age of the message history ('history')
+    queue_size, max_batch, frame_budget_ms, pump_interval_ms: rate limits ('ingest')
+
+    The 'latency', 'animation', 'log' and 'recording' sections are only checked (unit,
+    windows, rates, sizes); the tracker, animation engine, log view and recorder are
+    created from them.
+    """
+    __slots__ = ("data", "broker", "port", "topic", "core", "protocol", "qos", "plants", "flows", "rules",
+                 "retention_hours", "queue_size", "max_batch", "frame_budget_ms", "pump_interval_ms")
+
+    def __init__(self, data):
+        """
+        Input: data (dict) - 'data' section of 'config.yaml'
+        Output: None
+        Raises: ValueError with all problems found
+        """
+        self.data = data
+        errors = []
+
+        def setting(section, key, default, kind, check=None, allowed=""):
+            values = data if section is None else data.get(section) or {}
+            value = values.get(key) if isinstance(values, dict) else None
+            if value is None:
+                return default
+            name = f"{section}.{key}" if section else key
+            try:
+                value = kind(value)
+            except (TypeError, ValueError):
+                errors.append(f"'{name}': {value!r} is no {kind.__name__}")
+                return default
+            if check is not None and not check(value):
+                errors.append(f"'{name}': {value!r} is not allowed{allowed}")
+                return default
+            return value
+
+        positive = lambda value: value > 0
+        self.broker = setting(None, "broker", "broker.hivemq.com", str)
+        self.port = setting(None, "port", 1883, int, lambda port: 0 < port < 65536, " (1 - 65535)")
+        self.topic = setting(None, "topic", "", str)
+        self.core = setting("connection", "core", "selector", str, CORES.__contains__, f" {CORES}")
+        self.protocol = setting("connection", "protocol", "3.1.1", str, PROTOCOLS.__contains__, f" {PROTOCOLS}")
+        self.qos = setting("connection", "qos", 0, int, (0, 1, 2).__contains__, " (0, 1 or 2)")
+        self.retention_hours = setting("history", "retention_hours", 24, float, lambda hours: hours >= 0)
+        self.queue_size = setting("ingest", "queue_size", 10000, int, positive)
+        self.max_batch = setting("ingest", "max_batch", 200, int, positive)
+        self.frame_budget_ms = setting("ingest", "frame_budget_ms", 12, float, positive)
+        self.pump_interval_ms = setting("ingest", "pump_interval_ms", 16, int, positive)
+        for section in ("connection", "history", "ingest", "latency", "animation", "log", "recording"):
+            if not isinstance(data.get(section) or {}, dict):
+                errors.append(f"'{section}': {data[section]!r} is no section")
+        # Only checked, the objects are created from the sections ('load_latency', GUI)
+        setting("latency", "unit", "auto", str, LATENCY_UNITS.__contains__, f" {LATENCY_UNITS}")
+        setting("latency", "window_s", 30, float, positive)
+        setting("latency", "duplicate_window", 4096, int, positive)
+        setting("animation", "max_sprites", 25, int, positive)
+        setting("animation", "step_ms", 1500, int, positive)
+        setting("animation", "frame_rate", 30, float, positive)
+        setting("log", "capacity", 1000, int, positive)
+        setting("log", "refresh_ms", 100, int, positive)
+        setting("log", "preview_bytes", 200, int, positive)
+        setting("recording", "flush_interval", 1.0, float, positive)
+
+        self.plants = ()
+        self.flows = []
+        self.rules = ([], ())
+        try:
+            self.plants = tuple(load_plants(data.get("brokers")))
+            names = [plant.name for plant in self.plants]
+            if len(set(names)) != len(names):
+                errors.append("'brokers': plant names must be unique")
+        except ValueError as e:
+            errors.append(f"'brokers': {e}")
+        try:
+            self.flows = load_flows(data.get("flows"))
+            self.rules = load_rules(data.get("rules"), self.flows)
+        except ValueError as e:
+            errors.append(f"'flows' / 'rules': {e}")
+        for flow in self.flows:  # Checked here, an unknown image or arrow would only fail on the first message
+            if flow.sprite not in IMAGES:
+                errors.append(f"'flows': flow '{flow.name}' has unknown sprite '{flow.sprite}' {tuple(IMAGES)}")
+            unknown = [arrow for arrow in flow.arrows if arrow not in ARROWS]
+            if unknown:
+                errors.append(f"'flows': flow '{flow.name}' has unknown arrows {unknown}")
+        if errors:
+            raise ValueError("; ".join(errors))
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.data
+
+
+def changed_keys(old, new):
+    """
+    Settings which differ between two configurations: top-level keys, and for
+    sections (dictionaries) the keys inside ('connection.qos', 'history.retention_hours').
+
+    Input: old, new (Config or dict)
+    Output: set of str
+    """
+    old = old.data if isinstance(old, Config) else old or {}
+    new = new.data if isinstance(new, Config) else new or {}
+    changed = set()
+    for key in set(old) | set(new):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            changed.update(f"{key}.{inner}" for inner in set(before) | set(after) if before.get(inner) != after.get(inner))
+        else:
+            changed.add(key)
+    return changed
+
+
+##############################################################################
+# CONFIG WATCHER
+##############################################################################
+class ConfigWatcher:
+    """
+    +++ Responsibilities of the config watcher +++
+
+    1. Parse and validate the file once ('load', cached)
+    2. Detect changes by polling modification time and size ('poll', one 'stat')
+    3. Return a new Config only for a changed and valid file; an invalid file is
+       reported once and the current configuration stays active
+    """
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self.stamp = None  # Stamp of the file version seen last (valid or not)
+        self.config = None  # Active Config
+
+    def load(self):
+        """
+        Output: Config (cached after the first call)
+        Raises: OSError if the file cannot be read, ValueError if it is invalid
+        """
+        if self.config is None:
+            self.stamp = file_stamp(self.path)
+            try:
+                self.config = Config(parse_config(self.path))
+            except yaml.YAMLError as e:
+                raise ValueError(str(e)) from None
+        return self.config
+
+    def poll(self):
+        """
+        Checks the file for changes.
+
+        Output: Config (new configuration) or None (file unchanged)
+        Raises: ValueError if the changed file is invalid (reported once per version)
+        """
+        stamp = file_stamp(self.path)
+        if stamp == self.stamp or stamp is None:
+            return None  # Unchanged (or deleted while it is being saved)
+        self.stamp = stamp
+        try:
+            config = Config(parse_config(self.path))
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(str(e)) from None
+        self.config = config
+        return config
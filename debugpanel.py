@@ -0,0 +1,133 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'debugpanel.py' is the hidden debug window of the
+GUI (Ctrl+Shift+D). It switches the instrumentation of 'instrumentation.py',
+cProfile and tracemalloc on and off and shows the timings of the hot paths, the
+gauges and the profiler reports.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import tkinter as tk
+from tkinter import ttk
+
+
+##############################################################################
+# DEBUG PANEL
+##############################################################################
+class DebugPanel:
+    """
+    +++ Responsibilities of the debug panel +++
+
+    1. Toggle timing probes, cProfile and tracemalloc
+    2. Show one row per probe point (calls, mean, p50, p99, max, total) and the
+       gauges, refreshed every 'refresh_ms'
+    3. Show the report of cProfile / tracemalloc when they are switched off
+    """
+    COLUMNS = ("calls", "mean", "p50", "p99", "max", "total")
+
+    def __init__(self, root, instrumentation, refresh_ms=1000, dump_path=None):
+        """
+        Input:
+            root: Tkinter root window
+            instrumentation (Instrumentation)
+            refresh_ms (int): refresh cadence of the table
+            dump_path (str): file of the 'Dump JSON' button (optional)
+        Output: None
+        """
+        self.root = root
+        self.instrumentation = instrumentation
+        self.refresh_ms = refresh_ms
+        self.dump_path = dump_path
+        self.rows = {}  # probe / gauge name -> row id
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Debug")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = ttk.Frame(self.window, padding=5)
+        controls.pack(fill="x")
+        self.probes = tk.BooleanVar(value=instrumentation.enabled)
+        self.profiling = tk.BooleanVar(value=instrumentation.profiler is not None)
+        self.tracing = tk.BooleanVar(value=instrumentation.tracing)
+        ttk.Checkbutton(controls, text="Timing probes", variable=self.probes, command=self.toggle_probes).pack(side="left", padx=5)
+        ttk.Checkbutton(controls, text="cProfile", variable=self.profiling, command=self.toggle_profiler).pack(side="left", padx=5)
+        ttk.Checkbutton(controls, text="tracemalloc", variable=self.tracing, command=self.toggle_tracemalloc).pack(side="left", padx=5)
+        ttk.Button(controls, text="Reset", command=instrumentation.reset).pack(side="left", padx=5)
+        if dump_path:
+            ttk.Button(controls, text="Dump JSON", command=self.dump).pack(side="left", padx=5)
+
+        self.tree = ttk.Treeview(self.window, columns=self.COLUMNS, height=12)
+        self.tree.heading("#0", text="Probe")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=75, anchor="e")
+        self.tree.column("#0", width=200)
+        self.tree.pack(fill="x", padx=5)
+
+        self.report = tk.Text(self.window, wrap="none", width=110, height=20, state=tk.DISABLED)
+        self.report.pack(fill="both", expand=True, padx=5, pady=5)
+        self.after_id = None
+        self.refresh()
+
+    def toggle_probes(self):
+        if self.probes.get():
+            self.instrumentation.enable()
+        else:
+            self.instrumentation.disable()
+
+    def toggle_profiler(self):
+        if self.profiling.get():
+            self.instrumentation.start_profiler()
+        else:
+            self.show_report(self.instrumentation.stop_profiler())
+
+    def toggle_tracemalloc(self):
+        if self.tracing.get():
+            self.instrumentation.start_tracemalloc()
+        else:
+            self.show_report(self.instrumentation.stop_tracemalloc())
+
+    def show_report(self, text):
+        self.report.config(state=tk.NORMAL)
+        self.report.delete("1.0", "end")
+        self.report.insert("end", text)
+        self.report.config(state=tk.DISABLED)
+
+    def dump(self):
+        self.instrumentation.dump(self.dump_path)
+
+    def refresh(self):
+        """
+        Updates the rows with the current snapshot and schedules the next refresh.
+        """
+        snapshot = self.instrumentation.snapshot()
+        for name, timing in snapshot["timings"].items():
+            self.update_row(name, (
+                timing["count"],
+                f"{timing['mean_us']:.1f} us",
+                f"<{timing['p50_us']} us",
+                f"<{timing['p99_us']} us",
+                f"{timing['max_us']:.0f} us",
+                f"{timing['total_ms']:.0f} ms",
+            ))
+        for name, value in snapshot["gauges"].items():
+            self.update_row(name, (value, "", "", "", "", ""))
+        self.after_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def update_row(self, name, values):
+        row = self.rows.get(name)
+        if row is None:
+            self.rows[name] = self.tree.insert("", "end", text=name, values=values)
+        else:
+            self.tree.item(row, values=values)
+
+    def close(self):
+        """
+        Closes the window; probes and profilers keep their state.
+        """
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.window.destroy()
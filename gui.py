@@ -9,17 +9,37 @@ the MQTT message flow.
 #############################################################################
 # IMPORTS
 #############################################################################
+import functools
+import math
+import time
+import traceback
 import tkinter as tk  # Basic structure of the GUI
 from tkinter import *  # Import everything from tkinter
 from tkinter import ttk  # Responsible for widgets
 import ttkbootstrap as tb  # For GUI styling
 from tkinter import Canvas
-import paho.mqtt.client as mqtt  # MQTT library
-import yaml
 
 
 import label_name
-from mqttclient import MQTTClient #Importing the MQTT client class for communication
+from ingest import IngestQueue, IngestPump, FLAG_TRUNCATED # Thread-safe hand-off from the network thread
+from logview import LogView # Bounded, coalesced message log
+from searchindex import SearchIndex # Word index of the log lines
+from searchview import SearchBar # Search/filter bar above the log
+from scene import Scene, HIDDEN, NORMAL # Named canvas items, updated only when changed
+from animation import AnimationEngine, LevelOfDetail # Concurrent envelope animations, adaptive detail
+from assets import AssetCache # Images are decoded once at startup
+from routing import FlowRouter # Topic -> flow (topic filters from config.yaml)
+from rules import RuleEngine # Payload rules -> flow (e.g. message kinds on one subtopic)
+from pipeline import EventPipeline # GUI-independent classification + counters
+from latency import load_latency # End-to-end latency per flow (publish time -> reception)
+from metrics import MetricsRegistry # Rolling windows per topic
+from metricspanel import MetricsPanel # Table with the live metrics
+from recorder import Replayer # Replay of recorded message sessions
+from instrumentation import Instrumentation # Optional timing probes of the hot paths
+from payload import preview_payload, format_payload, CutPayload # Payloads are decoded only for display
+import config
+# Imported after the first paint (see 'load_deferred'): mqttclient (paho), network,
+# aiocore (asyncio), procingest (ingest process), history (sqlite3); historyview / debugpanel when the window is opened
 #############################################################################
 
 
@@ -33,38 +53,230 @@ class MQTTVisualizerGUI:
     The class manages the entire GUI and provides methods for MQTT connections and 
     animations.
     """
-    def __init__(self):
-        self.root = tb.Window(themename="superhero")  # Main window with Bootstrap design
-        self.root.title(label_name.PROGRAM_NAME)  # Set GUI title
-        self.root.iconphoto(False, tk.PhotoImage(file = "pictures/mqtt.png")) # Icon 
+    def __init__(self, root=None, assets=None, canvas=None, log_text=None, app_config=None):
+        """
+        Startup is staged: the window with the diagram is painted first, then the
+        images, the MQTT stack and the message history are loaded ('load_deferred').
+
+        Input (all optional; stand-ins are passed by 'bench/bench_throughput.py'):
+            root: Tkinter root (None -> ttkbootstrap main window)
+            assets: image cache (None -> AssetCache)
+            canvas, log_text: diagram canvas and log text widget (None -> all widgets
+                              are created; otherwise only diagram and log, no input widgets)
+            app_config (Config): configuration (None -> 'config.yaml')
+        """
+        self.startup = {"init": time.time()}  # Startup milestones (see 'bench/bench_startup.py')
+        if root is None:
+            root = tb.Window(themename="superhero")  # Main window with Bootstrap design (styles are built on first use)
+            root.title(label_name.PROGRAM_NAME)  # Set GUI title
+        self.root = root
+        self.assets = assets if assets is not None else AssetCache()  # Loads and resizes all images once (after the first paint)
 
         # If 'load_config' does not exist -> load default values ​​for broker, port and topic
-        self.config = self.load_config() or {"broker": "", "port": 1883, "topic": ""}
+        self.config_watcher = config.ConfigWatcher() # Cached, validated 'config.yaml', polled for changes
+        if app_config is None:
+            app_config = self.load_config() or config.Config({"broker": "", "port": 1883, "topic": ""})
+        self.config = app_config
+        self.connect_requested = False # 'Connect' was clicked -> config changes resubscribe
+
+        # Ingest stage: MQTT callbacks fill the queue, the pump drains it on the main loop
+        self.ingest = IngestQueue(self.config.queue_size)
+        self.ingest_pump = IngestPump(
+            self.root, self.ingest, self.handle_event,
+            max_batch=self.config.max_batch,
+            frame_budget_ms=self.config.frame_budget_ms,
+            interval_ms=self.config.pump_interval_ms,
+            on_frame=self.on_frame, # Frame time + backlog -> level of detail
+        )
        
-        self.mqtt_client = MQTTClient(self) #Reference to MQTT client class
-        self.broker = self.config.get("broker", "broker.hivemq.com")  # 
-        self.port = self.config.get("port", 1883)
-        self.topic = self.config.get("topic")
+        # Routing table: topic filters of the flows -> precompiled topic trie
+        self.router = FlowRouter(self.config.flows)
+        metrics_config = self.config.get("metrics") or {}
+        self.metrics = MetricsRegistry(metrics_config.get("window_s", 60), metrics_config.get("max_topics", 200))
+        self.rules = RuleEngine(*self.config.rules)
+        self.pipeline = EventPipeline(self.router, self.metrics, self.rules, load_latency(self.config.get("latency")),
+                                      metrics_config.get("max_topics", 200))
+
+        self.lanes = {} # Plant name -> lane (plants are loaded with the MQTT stack)
+        self.lane_spacing = (self.config.get("animation") or {}).get("lane_spacing", 10)
+        self.lane_paths = {} # (flow name, lane) -> waypoints shifted to the lane
+        self.replayer = None # Replay of a recording (optional)
+        self.worker = None # Ingest process ('connection: core: process')
+        self.broker = self.config.broker
+        self.port = self.config.port
+        self.topic = self.config.topic
+
+        self.connection_arrows = {}  # Connection arrows for message flow diagram (name -> canvas item)
+        self.arrow_widths = {}  # Original width of the arrows (restored after the aggregated display)
+        if canvas is None:
+            self.create_widgets()  # Create widgets
+        else:
+            self.create_diagram(canvas)
+            self.create_log(log_text)
+
+        self.root.update()  # First paint: the window appears before the MQTT stack is loaded
+        self.startup["first_paint"] = time.time()
+        self.load_deferred()
+        self.startup["ready"] = time.time()
+
+    def load_deferred(self):
+        """
+        Second startup stage, after the first paint: images, message history, network
+        core and MQTT clients. 'paho', 'asyncio' and 'sqlite3' are imported here.
+
+        Input: None
+        Output: None
+        """
+        from mqttclient import MQTTClient, BrokerFanIn #Importing the MQTT client class for communication
+        from history import HistoryStore # Message history (SQLite, written on its own thread)
+
+        self.assets.load()
+        self.root.iconphoto(False, self.assets.get("mqtt")) # Icon 
+        self.scene.configure("sap_logo", image=self.assets.get("sap_logo"))
+
+        # Message history: batches are written on a writer thread, never on the receive path
+        history_config = self.config.get("history") or {}
+        self.history = None
+        if history_config.get("enabled", True):
+            self.history = HistoryStore(
+                config.resolve_path(history_config.get("path", "history.db")),
+                batch_size=history_config.get("batch_size", 500),
+                flush_interval=history_config.get("flush_interval", 0.5),
+                retention_hours=self.config.retention_hours,
+            )
+
+        # Network core: selector loop (default) or asyncio loop, one thread for all brokers;
+        # or an own ingest process (paho + classification) writing into a shared-memory ring
+        core = self.config.core
+        if core == "process":
+            from procingest import IngestProcess, ORDERED_STORES # Ingest process + shared ring (optional)
+            if not ORDERED_STORES:
+                self.log("+++ 'core: process' needs an x86-64 CPU (shared-memory ring) - using the selector core. +++")
+                core = "selector"
+        if core == "process":
+            process_config = (self.config.get("ingest") or {}).get("process") or {}
+            self.worker = self.network = self.mqtt_client = IngestProcess(
+                self.config.data, self.router.flows, list(self.config.plants),
+                slots=process_config.get("slots", 8192),
+                topic_bytes=process_config.get("topic_bytes", 256),
+                payload_bytes=process_config.get("payload_bytes", 1024),
+            )
+            self.ingest = self.ingest_pump.queue = self.worker.reader # The pump drains the ring
+            self.bridge = None
+            self.plants = self.worker.plants # Connected inside the ingest process
+            self.lanes = self.plants.lanes
+            self.setup_instrumentation()
+            return
+        if core == "asyncio":
+            from aiocore import AsyncCore, EventStream, forward # asyncio-based core (optional)
+            self.network = AsyncCore()
+            self.network.start()
+            events = EventStream(self.network, self.config.queue_size)
+            self.bridge = self.network.submit(forward(events, self.ingest)) # Stream -> ingest queue (Tk pump)
+        else:
+            from network import NetworkLoop # Selector-based network thread (default core)
+            self.network = NetworkLoop()
+            events = self.ingest
+            self.bridge = None
+        self.mqtt_client = MQTTClient(events, self.config, self.log, network=self.network) #Reference to MQTT client class
+        # Further plants (brokers from 'config.yaml'), same network thread, own diagram lane
+        self.plants = BrokerFanIn(self.mqtt_client, list(self.config.plants))
+        self.lanes = self.plants.lanes # Plant name -> lane
+        self.setup_instrumentation()
 
-        self.create_widgets()  # Create widgets
-        self.connection_arrows = {}  # Connection arrows for message flow diagram
+    def setup_instrumentation(self):
+        """
+        Registers the probe points of the hot paths and the gauges (see 'instrumentation.py').
+        The probes only cost time while they are enabled (config or debug panel).
+
+        Input: None
+        Output: None
+        """
+        debug_config = self.config.get("debug") or {}
+        self.instrumentation = probes = Instrumentation()
+        self.probe_clients()
+        probes.add_point(self.ingest_pump, "pump", "ingest.pump")
+        probes.add_point(self.log_view, "append", "log.append")
+        probes.add_point(self.log_view, "flush", "log.flush")
+        probes.add_point(self, "start_animation", "gui.start_animation")
+        probes.add_point(self.animation, "spawn", "animation.spawn")
+        probes.add_point(self.animation, "tick", "animation.tick")
+        probes.add_gauge("ingest.queued", lambda: len(self.ingest))
+        probes.add_gauge("ingest.dropped", lambda: self.ingest.dropped)
+        probes.add_gauge("animation.in_flight", lambda: len(self.animation.envelopes))
+        probes.add_gauge("animation.skipped_frames", lambda: self.animation.skipped_frames)
+        probes.add_gauge("log.pending", lambda: len(self.log_view.pending))
+        if debug_config.get("enabled", False):
+            probes.enable()
+
+        self.debug_panel = None
+        self.dump_path = debug_config.get("dump_path")
+        self.dump_interval_ms = int(debug_config.get("dump_interval_s", 10) * 1000)
+        if self.dump_path:
+            self.dump_path = config.resolve_path(self.dump_path)
+            self.root.after(self.dump_interval_ms, self.dump_instrumentation)
+        self.root.bind("<Control-Shift-D>", self.show_debug_panel) # Hidden debug panel
+
+    def probe_clients(self):
+        """
+        Registers 'on_message' of the primary client and of every plant client as probe
+        point. Called again after the plants changed: new clients are probed, the probes
+        of removed plants are unregistered.
+        """
+        if self.worker is not None:
+            return # Ingest process: the clients are not in this process
+        probes = self.instrumentation
+        clients = [self.mqtt_client] + self.plants.clients
+        probed = probes.owners("mqtt.on_message")
+        for client in probed:
+            if client not in clients:
+                probes.remove_point(client, "on_message")
+        for client in clients:
+            if client not in probed:
+                probes.add_point(client, "on_message", "mqtt.on_message", functools.partial(self.rebind_on_message, client))
+
+    def rebind_on_message(self, client):
+        """
+        paho keeps a reference to the callback -> hand it the (un)wrapped method again.
+        """
+        if client.client is not None:
+            client.client.on_message = client.on_message
+
+    def dump_instrumentation(self):
+        """
+        Appends a snapshot of the instrumentation to the dump file (only while enabled).
+        """
+        if self.instrumentation.enabled:
+            self.instrumentation.dump(self.dump_path)
+        self.root.after(self.dump_interval_ms, self.dump_instrumentation)
+
+    def show_debug_panel(self, event=None):
+        """
+        Opens the hidden debug panel (Ctrl+Shift+D, see 'debugpanel.py').
+        """
+        from debugpanel import DebugPanel
+        if self.debug_panel is not None and self.debug_panel.window.winfo_exists():
+            self.debug_panel.window.lift()
+            return
+        self.debug_panel = DebugPanel(self.root, self.instrumentation, dump_path=self.dump_path)
 
     #############################################################################
     # LOADING CONFIG YAML FILE (HIVEMQ)
     #############################################################################
     def load_config(self):
         """
-        Loads the YAML file and returns the data
+        Loads and validates the YAML file (see 'config.py'). The watcher keeps it
+        cached; later changes are applied by 'watch_config'.
+
+        Output: Config or None (file missing or invalid)
         """
         try:
-            with open("config.yaml", "r") as file:
-                config = yaml.safe_load(file)
-                return config["data"]
-        except FileNotFoundError:
-            print("Error: 'config.yaml' had not been found.")
-        except yaml.YAMLError as e:
-            print(f"Error: parsing YAML file: '{e}'.")
-            return None
+            return self.config_watcher.load()
+        except OSError as e:
+            print(f"Error: '{self.config_watcher.path}' could not be read: {e}")
+        except ValueError as e:
+            print(f"Error: invalid configuration: {e}")
+        return None
 
     #############################################################################
     # GUI-DESIGN
@@ -101,6 +313,11 @@ class MQTTVisualizerGUI:
         # Connect Button - Establishes connection to the broker
         self.connect_button = ttk.Button(self.top_frame, text=label_name.CONNECT_BUTTON, command=self.connect_to_broker)
         self.connect_button.pack(side="left", padx=5)
+        self.connect_button_style = self.connect_button.cget("style") # Restored after a disconnect
+
+        # History Button - Opens the timeline of the message history
+        self.history_button = ttk.Button(self.top_frame, text=label_name.HISTORY_BUTTON, command=self.show_history)
+        self.history_button.pack(side="left", padx=5)
        
         # WebSockets Checkbox
         self.websocket_enabled = tk.BooleanVar(value = False) # Stores checkbox state
@@ -113,285 +330,583 @@ class MQTTVisualizerGUI:
         self.tls_button.pack(side = "left", padx = 5)
 
         # Representation of the message flow between the components (SAP, MQTT broker, MES)
-        self.canvas_frame = ttk.LabelFrame(self.root, text=label_name.FRAME_NAME, padding=10)
-        self.canvas_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.middle_frame = ttk.Frame(self.root)
+        self.middle_frame.pack(fill="both", expand=True)
 
-        self.canvas = Canvas(self.canvas_frame, bg="white", height=400)
-        self.canvas.pack(fill="both", expand=True)
+        self.canvas_frame = ttk.LabelFrame(self.middle_frame, text=label_name.FRAME_NAME, padding=10)
+        self.canvas_frame.pack(side="left", fill="both", expand=True, padx=10, pady=10)
 
-        self.draw_static_diagram() # Draws the fixed structure of the components
+        canvas = Canvas(self.canvas_frame, bg="white", height=400)
+        canvas.pack(fill="both", expand=True)
+        self.create_diagram(canvas)
+
+        # Live metrics per topic beside the diagram (refreshed at a fixed cadence)
+        self.metrics_panel = MetricsPanel(self.middle_frame, self.root, self.metrics,
+                                          refresh_ms=(self.config.get("metrics") or {}).get("refresh_ms", 1000))
+        self.metrics_panel.frame.pack(side="right", fill="y", padx=10, pady=10)
 
         # Output all messages (message field in GUI)
         self.log_frame = ttk.LabelFrame(self.root, text="Messages", padding=10)
         self.log_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        self.log_text = tk.Text(self.log_frame, wrap="word", height=10, state=tk.DISABLED)
-        self.log_text.pack(fill="both", expand=True)
-        self.log_text.insert("end", "Currently no connections.\n")
+        log_text = tk.Text(self.log_frame, wrap="word", height=10, state=tk.DISABLED)
+        log_text.pack(fill="both", expand=True)
+        log_text.bind("<Double-Button-1>", self.expand_message) # Full payload on demand
+        self.create_log(log_text)
+
+        # Search/filter bar above the log (results replace the log while a query is entered)
+        self.search_bar = SearchBar(self.log_frame, self.root, self.search_index, self.log_text,
+                                    limit=(self.config.get("log") or {}).get("search_results", 500))
+        self.search_bar.results.bind("<Double-Button-1>", self.expand_search_result)
+        self.log("Currently no connections.")
+
+    def create_diagram(self, canvas):
+        """
+        Diagram on the canvas: scene with the static items, animation engine and level
+        of detail.
+
+        Input: canvas (Tkinter Canvas)
+        Output: None
+        """
+        self.canvas = canvas
+        self.scene = Scene(self.canvas) # Diagram items are created once, then only updated
+
+        self.draw_static_diagram() # Draws the fixed structure of the components
+
+        # Animation engine: many envelopes in flight, moved by one frame clock
+        animation_config = self.config.get("animation") or {}
+        self.animation = AnimationEngine(
+            self.root, self.canvas,
+            max_sprites=animation_config.get("max_sprites", 25),
+            step_ms=animation_config.get("step_ms", 1500),
+            frame_rate=animation_config.get("frame_rate", 30),
+        )
+        # Level of detail: every message -> sampled envelopes -> arrow intensity only
+        lod_config = animation_config.get("lod") or {}
+        self.lod = LevelOfDetail(
+            frame_budget_ms=self.config.frame_budget_ms,
+            full_max_rate=lod_config.get("full_max_rate", 5),
+            sampled_max_rate=lod_config.get("sampled_max_rate", 200),
+            backlog_low=lod_config.get("backlog_low", 50),
+            backlog_high=lod_config.get("backlog_high", 1000),
+            calm_periods=lod_config.get("calm_periods", 3),
+        )
+        self.render_level = self.lod.level  # Level currently shown on the canvas
+
+    def create_log(self, log_text):
+        """
+        Message log: ring buffer in front of the text widget and its search index.
+
+        Input: log_text (Tkinter Text)
+        Output: None
+        """
+        self.log_text = log_text
+        # Ring buffer in front of the text widget -> only the last N lines are kept
+        log_config = self.config.get("log") or {}
+        self.preview_bytes = log_config.get("preview_bytes", 200) # Payload bytes shown per log line
+        # Full-text index of the log: same retention, updated once per refresh tick
+        self.search_index = SearchIndex(
+            capacity=log_config.get("capacity", 1000),
+            max_bytes=log_config.get("search_max_bytes", 512),
+            preview_bytes=self.preview_bytes,
+        )
+        self.log_view = LogView(
+            self.root, self.log_text,
+            capacity=log_config.get("capacity", 1000),
+            refresh_ms=log_config.get("refresh_ms", 100),
+            index=self.search_index,
+        )
 
     def draw_static_diagram(self):
-        self.canvas.delete("all")
         """
         Draws the static diagram representing the MQTT message flow.
         This includes visualizing SAP, MES, the MQTT broker, data interfaces,
-        and connection arrows.
+        and connection arrows. The items are created once in the scene (see 'scene.py');
+        later changes only update or hide them.
 
         Input: None
         Output: None
         """
+        scene = self.scene
+        if "broker" in scene:
+            return # Already built
+
         # SAP
-        self.sap_img = PhotoImage(file="pictures/sap-logo.png")
-        resized_sap_img = self.sap_img.subsample(7, 7)
-        self.canvas.create_image(115, 180, image=resized_sap_img)
-        self.sap_img_resized = resized_sap_img
+        scene.add("sap_logo", "image", (115, 180), tags="sap_logo") # Image is set after the first paint ('load_deferred')
     
         # MQTT Broker as a rectangle
-        self.canvas.create_rectangle(200, 100, 500, 300, fill="#FFD700", outline="black", width=2, tags="broker")
-        self.canvas.create_text(350, 130, text=label_name.BROKER, font=("Arial", 12, "bold"))
+        scene.add("broker", "rectangle", (200, 100, 500, 300), fill="#FFD700", outline="black", width=2, tags="broker")
+        scene.add("broker_label", "text", (350, 130), text=label_name.BROKER, font=("Arial", 12, "bold"))
 
         # Topics within the MQTT Broker (represented as smaller rectangles)
-        self.canvas.create_rectangle(310, 160, 390, 190, fill="#FF9966", outline="black", width=1, tags="ucc")
-        self.canvas.create_text(350, 175, text=label_name.UCC, font=("Arial", 10))
+        scene.add("ucc", "rectangle", (310, 160, 390, 190), fill="#FF9966", outline="black", width=1, tags="ucc")
+        scene.add("ucc_label", "text", (350, 175), text=label_name.UCC, font=("Arial", 10))
 
-        self.canvas.create_rectangle(310, 195, 390, 220, fill="#FF9966", outline="black", width=1, tags="toMES")
-        self.canvas.create_text(350, 209, text=label_name.toMES, font=("Arial", 10))
+        scene.add("toMES", "rectangle", (310, 195, 390, 220), fill="#FF9966", outline="black", width=1, tags="toMES")
+        scene.add("toMES_label", "text", (350, 209), text=label_name.toMES, font=("Arial", 10))
 
-        self.canvas.create_rectangle(310, 225, 390, 250, fill="#FF9966", outline="black", width=1, tags="toERP")
-        self.canvas.create_text(350, 239, text=label_name.toERP, font=("Arial", 10))
+        scene.add("toERP", "rectangle", (310, 225, 390, 250), fill="#FF9966", outline="black", width=1, tags="toERP")
+        scene.add("toERP_label", "text", (350, 239), text=label_name.toERP, font=("Arial", 10))
 
         # Data Interface 
-        self.canvas.create_rectangle(275, 320, 430, 380, fill="lightblue", outline="black", width=2, tags="data_interface")
-        self.canvas.create_text(350, 350, text=label_name.DATAINTERFACE, font=("Arial", 12, "bold"))
+        scene.add("data_interface", "rectangle", (275, 320, 430, 380), fill="lightblue", outline="black", width=2, tags="data_interface")
+        scene.add("data_interface_label", "text", (350, 350), text=label_name.DATAINTERFACE, font=("Arial", 12, "bold"))
 
         # MES
-        self.canvas.create_rectangle(550, 150, 650, 210, fill="lightgreen", outline="black", width=2, tags="mes")
-        self.canvas.create_text(600, 180, text=label_name.MES, font=("Arial", 12, "bold"))
+        scene.add("mes", "rectangle", (550, 150, 650, 210), fill="lightgreen", outline="black", width=2, tags="mes")
+        scene.add("mes_label", "text", (600, 180), text=label_name.MES, font=("Arial", 12, "bold"))
+
+        # Connection Arrows (named, so flows can highlight their arrows; names listed in routing.ARROWS)
+        self.draw_arrow("sap_to_ucc", 155, 170, 310, 170, "last", 4)  # SAP ---> UCC (SAP)
+        self.draw_arrow("interface_to_sap", 100, 210, 100, 350, "first", 6)  # SAP vertical arrow
+        self.draw_arrow("sap_to_interface", 100, 350, 275, 350, "last", 6)  # SAP horizontal to Data Interface
+
+        self.draw_arrow("ucc_left", 310, 180, 279, 180, "last", 4)  # Horizontal from SAP (UCC) (left side)
+        self.draw_arrow("ucc_to_interface", 280, 180, 280, 320, "last", 4)  # Vertical arrow down from SAP UCC to Data Interface
 
-        # Connection Arrows
-        self.canvas.create_line(155, 170, 310, 170, arrow="last", width=4)  # SAP ---> UCC (SAP)
-        self.canvas.create_line(100, 210, 100, 350, arrow="first", width=6)  # SAP vertical arrow
-        self.canvas.create_line(100, 350, 275, 350, arrow="last", width=6)  # SAP horizontal to Data Interface
+        self.draw_arrow("mes_to_toerp", 390, 240, 600, 240, "first", 4)  # Horizontal arrows to toERP
+        self.draw_arrow("mes_down", 600, 240, 600, 210, "first", 4)  # Vertical arrow from MES 
 
-        self.canvas.create_line(310, 180, 279, 180, arrow="last", width=4)  # Horizontal from SAP (UCC) (left side)
-        self.canvas.create_line(280, 180, 280, 320, arrow="last", width=4)  # Vertical arrow down from SAP UCC to Data Interface
+        self.draw_arrow("interface_up", 300, 320, 300, 205, "last", 4)  # Vertical from Data Interface
+        self.draw_arrow("interface_to_tomes", 300, 208, 315, 208, "last", 4)  # Horizontal to MES
 
-        self.canvas.create_line(390, 240, 600, 240, arrow="first", width=4)  # Horizontal arrows to toERP
-        self.canvas.create_line(600, 240, 600, 210, arrow="first", width=4)  # Vertical arrow from MES 
+        self.draw_arrow("tomes_to_mes", 390, 200, 550, 200, "last", 4)  # Connection from toMES to MES
+        self.draw_arrow("toerp_to_interface", 350, 250, 350, 320, "last", 4)  # Vertical arrows from toERP to Data Interface       
 
-        self.canvas.create_line(300, 320, 300, 205, arrow="last", width=4)  # Vertical from Data Interface
-        self.canvas.create_line(300, 208, 315, 208, arrow="last", width=4)  # Horizontal to MES
+        # Text labels on the arrows, shown once connected ('draw_connection_arrows')
+        label_font = ("Arial", 8, "bold")
+        # SAP to Data Interface
+        scene.add("retrieve_label", "text", (190, 335), group="arrow_labels", hidden=True, text=label_name.RETRIEVE_PRODUCTION_ORDER, font=label_font, fill="white", tags="arrow_label")
+        # Data Interface to SAP
+        scene.add("update_label", "text", (105, 260), group="arrow_labels", hidden=True, text=label_name.UPDATE_PRODUCTION_ORDER, font=label_font, anchor="w", fill="white", tags="arrow_label")
+        # MES to Data Interface
+        scene.add("update_label2", "text", (470, 250), group="arrow_labels", hidden=True, text=label_name.UPDATE_PRODUCTION_ORDER2, font=label_font, fill="white", tags="arrow_label")
+        # Data Interface to MES
+        scene.add("new_order_label", "text", (400, 190), group="arrow_labels", hidden=True, text=label_name.NEW_PRODUCTION_ORDER, font=label_font, anchor="w", fill="white", tags="arrow_label")
+
+        self.draw_latency_labels()
 
-        self.canvas.create_line(390, 200, 550, 200, arrow="last", width=4)  # Connection from toMES to MES
-        self.canvas.create_line(350, 250, 350, 320, arrow="last", width=4)  # Vertical arrows from toERP to Data Interface       
-        
         # Message indicating "No Current Connections"
-        self.canvas.create_rectangle(200, 10, 500, 50, fill="grey", outline="black", width=2, tags="no_connection2") 
-        self.no_connection_text = self.canvas.create_text(350, 30, text=label_name.NO_CONNECTIONS, font=("Arial", 15, "italic"), fill="black", tags="no_connection")
+        scene.add("no_connection2", "rectangle", (200, 10, 500, 50), group="no_connection", fill="grey", outline="black", width=2, tags="no_connection2") 
+        self.no_connection_text = scene.add("no_connection", "text", (350, 30), group="no_connection", text=label_name.NO_CONNECTIONS, font=("Arial", 15, "italic"), fill="black", tags="no_connection")
+
+    def draw_latency_labels(self):
+        """
+        End-to-end latency of every flow below its destination, shown with the first
+        samples ('show_latency'). Labels of flows which no longer exist are hidden, labels
+        of flows whose path changed are moved to the new destination.
+        """
+        names = set()
+        for flow in self.router.flows:
+            name = f"latency:{flow.name}"
+            names.add(name)
+            x, y = flow.path[-1]
+            if name in self.scene:
+                self.scene.place(name, (x, y + 12))
+            else:
+                self.scene.add(name, "text", (x, y + 12), group="latency_labels", hidden=True, text="",
+                               font=("Arial", 8), anchor="n", fill="#8B0000", tags="latency_label")
+        for name in self.scene.groups.get("latency_labels", ()):
+            if name not in names:
+                self.scene.configure(name, state=HIDDEN)
+
+    def draw_arrow(self, name, x1, y1, x2, y2, arrow, width):
+        """
+        Draws one connection arrow and registers it under its name.
+        """
+        self.connection_arrows[name] = self.scene.add(name, "line", (x1, y1, x2, y2), arrow=arrow, width=width, fill="black")
+        self.arrow_widths[name] = width
 
     def draw_connection_arrows(self):
         """
-        Draws text labels on the arrows to visually represent the message flow between components.
+        Shows the text labels on the arrows to visually represent the message flow between components.
+        The labels are part of the static diagram, repeated connects only keep them visible.
 
         Input: None
         Output: None
         """
-        # SAP to Data Interface
-        self.canvas.create_text(190, 335, text=label_name.RETRIEVE_PRODUCTION_ORDER, font=("Arial", 8, "bold"), fill="white")
-        # Data Interface to SAP
-        self.canvas.create_text(105, 260, text=label_name.UPDATE_PRODUCTION_ORDER, font=("Arial", 8, "bold"), anchor="w", fill="white")
-        # MES to Data Interface
-        self.canvas.create_text(470, 250, text=label_name.UPDATE_PRODUCTION_ORDER2, font=("Arial", 8, "bold"), fill="white")
-        # Data Interface to MES
-        self.canvas.create_text(400, 190, text=label_name.NEW_PRODUCTION_ORDER, font=("Arial", 8, "bold"), anchor="w", fill="white")
+        self.scene.show("arrow_labels")
+
+    def log(self, text):
+        """
+        Writes text into the message field of the GUI (only from the main loop).
+
+        Input: text (str)
+        Output: None
+        """
+        self.log_view.append(text)
+
+    def expand_message(self, event):
+        """
+        Shows the full payload of the double-clicked message in a separate window.
+
+        Input: event (Tkinter event) - position of the double-click
+        Output: None
+        """
+        self.show_payload(self.log_view.payload_at(self.log_text.index(f"@{event.x},{event.y}")))
+
+    def expand_search_result(self, event):
+        """
+        Shows the full payload of the double-clicked search result.
+        """
+        self.show_payload(self.search_bar.payload_at(self.search_bar.results.index(f"@{event.x},{event.y}")))
+
+    def show_payload(self, payload):
+        """
+        Opens a window with the full (formatted) payload.
+
+        Input: payload (bytes or None -> status line, nothing is shown)
+        Output: None
+        """
+        if payload is None:
+            return
+
+        window = tk.Toplevel(self.root)
+        if isinstance(payload, CutPayload):
+            window.title(f"Message (first {len(payload)} of {payload.size} bytes, cut by the ingest process)")
+        else:
+            window.title(f"Message ({len(payload)} bytes)")
+        text = tk.Text(window, wrap="word", width=100, height=30)
+        scrollbar = ttk.Scrollbar(window, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        text.pack(fill="both", expand=True)
+        text.insert("end", format_payload(payload))
+        text.config(state=tk.DISABLED)
+
+    def show_history(self):
+        """
+        Opens the timeline of the message history (see 'historyview.py').
+        """
+        if self.history is None:
+            self.log("Message history is disabled ('history: enabled' in config.yaml).")
+            return
+        from historyview import HistoryView # Timeline of the message history
+        HistoryView(self.root, self.history, preview_bytes=self.preview_bytes)
 
     def websocket_status_message(self):
         """
         Logs a message when the WebSocket checkbox is activated or deactivated.
         """
-        self.log_text.config(state=tk.NORMAL)
         if self.websocket_enabled.get():
-            self.log_text.insert("end", "\nEnabled WebSocket service.\n")
+            self.log("Enabled WebSocket service.")
         else:
-            self.log_text.insert("end", "\nDisabled WebSocket service.\n")
-        self.log_text.config(state=tk.DISABLED)
+            self.log("Disabled WebSocket service.")
 
     def tls_status_message(self):
         """
         Logs a message when the TLS checkbox is activated or deactivated.
         """
-        self.log_text.config(state=tk.NORMAL)
         if self.tls_enabled.get():
-            self.log_text.insert("end", "\nEnabled TLS service.\n")
+            self.log("Enabled TLS service.")
         else:
-            self.log_text.insert("end", "\nDisabled TLS service.\n")
-        self.log_text.config(state=tk.DISABLED)
+            self.log("Disabled TLS service.")
 
     ##############################################################################
     # MQTT METHOD: REFERENCE TO MQTT CLIENT METHOD
     ##############################################################################
     def connect_to_broker(self): # Establishes the connection with the broker
-        self.mqtt_client.connect_to_broker()
-
-    ##############################################################################
-    # ANIMATIONS
-    ##############################################################################
-    def start_animation(self, topic):
         """
-        Starts the message flow animation depending on the given topic. 
-        The animation is executed in steps and visualizes the message direction.
+        Called when the user clicks the 'Connect' button: passes the input fields 
+        to the MQTT client.
+        """
+        if self.connect_primary():
+            self.connect_requested = True
+            self.plants.connect() # Declared plants connect together with the primary broker
 
-        Supported topics: 'toERP', 'toMES'
+    def connect_primary(self):
+        """
+        Connects the primary broker of the input fields (an existing connection to the
+        same broker only changes its subscription).
 
-        Input:
-            topic (str): The MQTT topic that triggers the corresponding animation
-            
-        Output:
-            None
+        Output: bool - False if the port is invalid
         """
-        self.current_image_id = None
+        try:
+            port = int(self.port_entry.get()) # Port as int
+        except ValueError:
+            self.log(f"Error: Invalid port '{self.port_entry.get()}'.")
+            return False
+        self.mqtt_client.connect(
+            self.broker_entry.get(), # Broker address (HIVEMQ)
+            port,
+            self.topic_entry.get(),
+            websocket=self.websocket_enabled.get(),
+            tls=self.tls_enabled.get(),
+        )
+        return True
 
-        if topic == 'toERP':
-            self.animate_to_erp()
-        elif topic == 'toMES':
-            self.animate_sap_to_ucc()
-        else:
-            print(f"Unknown topic: '{topic}'.")
     ##############################################################################
-    # Animation 'toMES'-Topic - BEGINNING
-    ############################################################################## 
-    def animate_sap_to_ucc(self):
+    # LIVE CONFIGURATION: CHANGES OF 'config.yaml' ARE APPLIED WHILE RUNNING
+    ##############################################################################
+    def watch_config(self):
+        """
+        Polls 'config.yaml' (one 'stat' per poll) and applies a changed, valid file.
+        An invalid file is reported once, the current configuration stays active.
         """
-        Starts the animation of the message flow from SAP to UCC.
+        try:
+            new_config = self.config_watcher.poll()
+            if new_config is not None:
+                self.apply_config(new_config)
+        except ValueError as e:
+            self.log(f"+++ Invalid 'config.yaml', the current configuration stays active: {e} +++")
+        except Exception as e: # Partly applied change -> reported, polling goes on
+            self.log(f"+++ Error: Configuration change could not be applied! - '{e}' +++")
+            self.log(f"+++ ERROR-TRACEBACK: {traceback.format_exc()} +++")
+        finally:
+            self.config_poll_id = self.root.after(self.config_poll_ms, self.watch_config)
+
+    def apply_config(self, new_config):
+        """
+        Applies only the settings which changed: flows and rules are rerouted (counters
+        and connections stay), changed plants and a changed topic / QoS are resubscribed
+        (a new connection only for another broker, port or protocol), retention and
+        ingest limits are set on the running objects. Other settings need a restart.
+
+        Input: new_config (Config) - validated by the watcher
+        Output: None
+        """
+        changed = config.changed_keys(self.config, new_config)
+        self.config = new_config
+        if not changed:
+            return
+
+        def changes(*names):
+            return {key for key in changed if key in names or key.split(".")[0] in names}
+
+        applied = set()
+        # Topic -> flow mappings and payload rules: no canvas rebuild, only new latency labels
+        routing = changes("flows", "rules")
+        if routing:
+            self.router = FlowRouter(new_config.flows)
+            self.rules = RuleEngine(*new_config.rules)
+            self.pipeline.set_routing(self.router, self.rules)
+            self.lane_paths.clear()
+            if self.render_level == LevelOfDetail.AGGREGATED:
+                self.reset_arrows()
+            self.draw_latency_labels()
+            applied |= routing
+        latency = changes("latency")
+        if latency:
+            self.pipeline.latency = load_latency(new_config.get("latency"))
+            if self.pipeline.latency is None:
+                self.scene.show("latency_labels", False)
+            applied |= latency
+
+        # Plants and primary broker: only what changed is (re)subscribed
+        if self.worker is not None:
+            self.worker.reload(new_config.data, self.router.flows, list(new_config.plants))
+            self.plants.update(list(new_config.plants)) # Lanes; the ingest process connects the plants
+        else:
+            self.mqtt_client.config = new_config
+            plants = self.plants.update(list(new_config.plants))
+            self.probe_clients() # Clients of new plants are probed, removed ones unregistered
+            if changed & {"connection.qos", "connection.protocol"}:
+                plants = self.plants.plants # Inherited QoS -> resubscribe, inherited protocol -> reconnect
+            if self.connect_requested and plants:
+                self.plants.connect(plants)
+        applied |= changes("brokers")
+        primary = changes("broker", "port", "topic", "connection.qos", "connection.protocol")
+        if primary:
+            for entry, key, value in ((self.broker_entry, "broker", new_config.broker),
+                                      (self.port_entry, "port", new_config.port),
+                                      (self.topic_entry, "topic", new_config.topic)):
+                if key in changed: # Input fields edited by the user are only replaced by changed values
+                    entry.delete(0, "end")
+                    entry.insert(0, str(value))
+            if self.connect_requested:
+                self.connect_primary()
+            applied |= primary
+
+        # Retention and rate limits of the running objects
+        if "history.retention_hours" in changed and self.history is not None:
+            self.history.retention = new_config.retention_hours * 3600
+            applied.add("history.retention_hours")
+        limits = changes("ingest.max_batch", "ingest.frame_budget_ms", "ingest.pump_interval_ms")
+        if limits:
+            self.ingest_pump.max_batch = new_config.max_batch
+            self.ingest_pump.frame_budget = new_config.frame_budget_ms / 1000.0
+            self.ingest_pump.interval_ms = new_config.pump_interval_ms
+            self.lod.frame_budget = new_config.frame_budget_ms / 1000.0
+            applied |= limits
+
+        self.log(f"Configuration changed: {', '.join(sorted(applied)) or '-'}")
+        pending = changed - applied
+        if pending:
+            self.log(f"Applied after a restart: {', '.join(sorted(pending))}")
 
-        Workflow:
-            - Loads an image from file
-            - Resizes the image to specified dimensions
-            - Places it at the defined start position
-            - Schedules the next animation step after a delay (1.5 seconds)
+    ##############################################################################
+    # INGEST: EVENTS FROM THE NETWORK THREAD (HANDLED ON THE MAIN LOOP)
+    ##############################################################################
+    def handle_event(self, event):
+        """
+        Handles one event from the ingest queue. Called by the ingest pump on the 
+        Tkinter main loop, therefore widgets may be accessed here.
 
         Input:
-            None
-
+            event (IngestEvent): 'connect' or 'message' event
         Output:
             None
         """
-        self.image = PhotoImage(file="pictures/yellow-envelope.png")
-        resized_image = self.image.subsample(9, 9) #Verkleinerung des Bildes (Stauchung, Streckung)
-        self.current_image_id = self.canvas.create_image(225, 150, image=resized_image) #Startposition vom Bild
-        self.image_resized = resized_image #Neues Bild wird vorläufig gespeichert
-        self.root.after(1500, self.animate_below_retrieve) #geht zur nächsten Animation über
+        if event.kind == "message":
+            self.handle_message(event)
+        elif event.kind == "connect":
+            self.handle_connect(event.info, event.source)
+        elif event.kind == "disconnect":
+            self.handle_disconnect(event.info, event.source)
+        elif event.kind == "connect_fail":
+            self.handle_connect_fail(event.source)
+        elif event.kind == "status":
+            self.log(event.info) # Status text of the ingest process
 
-    def animate_below_retrieve(self):
+    def source_prefix(self, source):
         """
-        Moves the image from its current coordinates to a new position to visually 
-        represent the message flow from SAP to the next step (Retrieve Production Order).
-
-        Input:
-            None
-
-        Output:
-            None
+        Prefix of log lines of a plant ('[<plant>] ', empty for the primary broker).
         """
-        if self.current_image_id:
-            self.canvas.coords(self.current_image_id, 190, 315) # Move image to a new position
-        self.root.after(1500, self.animate_to_mes) # Schedule the next animation step
+        return f"[{source}] " if source else ""
 
-    def animate_to_mes(self):
+    def handle_connect(self, rc, source=None):
         """
-        Moves the image further to visually indicate the message flow 
-        from the current position to the 'toMES' topic.
+        Logs the result of a connection attempt (rc = 0 -> success).
 
-        Input:
-            None
-        Output:
-            None
+        On success the 'Connect' button turns green (as long as the connection to the
+        primary broker is active) and the "No current connections" message is removed.
         """
-        if self.current_image_id:
-            self.canvas.coords(self.current_image_id, 318, 265)
-        self.root.after(1500, self.animate_new_po)
+        prefix = self.source_prefix(source)
+        if rc != 0:
+            self.log(f"{prefix}+++ Connection failed with error code '{rc}'. +++")
+            if source is None:
+                self.connect_button.configure(style=self.connect_button_style)
+            return
 
-    def animate_new_po(self):
+        self.log(prefix + "Successfully connected.")
+        if source is None:
+            self.connect_button.configure(style="success.TButton")
+
+        # Hides the "No current connections" message
+        self.scene.show("no_connection", False)
+        self.draw_connection_arrows()
+
+    def handle_connect_fail(self, source=None):
+        """
+        Resets the 'Connect' button when a connection attempt fails (the network loop
+        retries after the backoff delay).
         """
-        Moves the image further to reach the 'New production order' coordinates. 
-        Once the target is reached, the animation ends.
+        if source is None:
+            self.connect_button.configure(style=self.connect_button_style)
+        self.log(self.source_prefix(source) + "+++ Connection attempt failed - retrying ... +++")
 
-        Input:
-            None
-        Output:
-            None
+    def handle_disconnect(self, rc, source=None):
         """
-        if self.current_image_id:
-            self.canvas.coords(self.current_image_id, 440, 170)
-            self.root.after(1500, self.finish_animation)
+        Resets the 'Connect' button when the connection is closed or lost.
+        """
+        prefix = self.source_prefix(source)
+        if source is None:
+            self.connect_button.configure(style=self.connect_button_style)
+        if rc != 0:
+            self.log(f"{prefix}+++ Connection lost (error code '{rc}') - reconnecting ... +++")
+        else:
+            self.log(prefix + "Disconnected.")
+
+    def handle_message(self, event):
+        """
+        Logs an incoming MQTT message and triggers the animation of the flow the topic 
+        is routed to.
+        """
+        # Only a preview of the payload is decoded (full body: double-click -> 'expand_message')
+        payload = event.payload
+        truncated = event.flags & FLAG_TRUNCATED # Cut by the ingest process ('payload_bytes')
+        if truncated:
+            payload = CutPayload(payload, event.size)
+        preview = preview_payload(payload, self.preview_bytes, event.size)
+        self.log_view.append(f"{self.source_prefix(event.source)}Topic: '{event.topic}'  +++ Incoming message: '{preview}' +++", payload)
+
+        flow = self.pipeline.process(event)
+        if self.history is not None and not truncated: # The history only keeps complete payloads
+            self.history.add(event, flow)
+        if flow is not None:
+            if self.lod.admit(flow.name): # Every message, every Nth or none (level of detail)
+                self.start_animation(flow, self.lanes.get(event.source, 0))
+        else:
+            print(f"Unknown topic: '{event.topic}'.")
+
     ##############################################################################
-    # Animation 'toMES'-Topic - END
-    ############################################################################## 
+    # ANIMATIONS
     ##############################################################################
-    # Animation 'toERP'-Topic - BEGINNING
-    ############################################################################## 
-    def animate_to_erp(self):
+    def start_animation(self, flow, lane=0):
         """
-        Starts the animation for the message flow from MES to SAP.
-
-        Process:
-            - Loads a different image,
-            - Resizes it,
-            - Places it at the defined starting coordinates,
-            - Begins the first animation step after 1.5 seconds.
+        Starts the message flow animation of the given flow. 
+        A new envelope is handed to the animation engine, which moves all envelopes 
+        in flight with one frame clock (see 'animation.py').
 
         Input:
-            None
+            flow (Flow): flow from the routing table (envelope image + waypoints)
+            lane (int): lane of the plant; the path is shifted by 'lane_spacing' per lane
         Output:
             None
         """
-        self.image = PhotoImage(file="pictures/red-envelope.png")
-        resized_image = self.image.subsample(13, 13)
-        self.current_image_id = self.canvas.create_image(430, 220, image=resized_image)
-        self.image_resized = resized_image 
-        self.root.after(1500, self.move_to_erp) 
-   
-    def move_to_erp(self):
+        path = self.lane_paths.get((flow.name, lane))
+        if path is None:
+            offset = lane * self.lane_spacing
+            path = self.lane_paths[(flow.name, lane)] = tuple((x + offset, y + offset) for x, y in flow.path)
+        self.animation.spawn(self.assets.get(flow.sprite), path)
+
+    def on_frame(self, frame_time, backlog):
         """
-        Moves the image from the current position further toward the 'toERP' topic.
+        Called by the ingest pump after every frame. Feeds the level-of-detail 
+        controller and updates the arrow intensity once per period.
 
         Input:
-            None
+            frame_time (float): seconds spent in the frame (incl. lateness)
+            backlog (int): events left in the ingest queue
         Output:
             None
         """
-        if self.current_image_id:
-            self.canvas.coords(self.current_image_id, 370, 280)
-        self.root.after(1500, self.move_to_odata)
+        if not self.lod.update(frame_time, backlog):
+            return
+        if self.lod.level != self.render_level:
+            self.log(f"Display detail: {self.lod.level} ({backlog} events queued).")
+            if self.render_level == LevelOfDetail.AGGREGATED:
+                self.reset_arrows()
+            self.render_level = self.lod.level
+        if self.render_level == LevelOfDetail.AGGREGATED:
+            self.show_flow_intensity()
+        if self.pipeline.latency is not None:
+            self.show_latency()
 
-    def move_to_odata(self):
+    def show_latency(self):
+        """
+        Writes p50 / p99 of the end-to-end latency (and redeliveries / duplicates) of
+        every flow onto the diagram. Flows without publish times stay hidden.
         """
-        Moves the image further, showing the transition from the 'toERP' topic 
-        to the OData interface and ultimately back to SAP.
+        flows = self.router.flows
+        for name, latency in self.pipeline.latency.snapshot().items():
+            if not latency["samples"] or not any(flow.name == name for flow in flows):
+                continue
+            text = f"{name}: p50 {latency['p50_ms']:.0f} ms / p99 {latency['p99_ms']:.0f} ms"
+            if latency["redelivered"] or latency["duplicates"]:
+                text += f"\nredelivered {latency['redelivered']}, duplicates {latency['duplicates']}"
+            self.scene.configure(f"latency:{name}", text=text, state=NORMAL)
 
-        Input:
-            None
-        Output:
-            None
+    def show_flow_intensity(self):
         """
-        if self.current_image_id:
-            self.canvas.coords(self.current_image_id, 80, 250)
-        self.root.after(1500, self.finish_animation)
-  
-    def finish_animation(self):
+        Aggregated display: the arrows of every flow get thicker and redder with
+        the message rate of the flow (logarithmic scale, saturated at 'sampled_max_rate').
         """
-        Ends the animation by deleting the image from the canvas.
+        saturation = math.log1p(self.lod.sampled_max_rate)
+        for flow in self.router.flows:
+            intensity = min(1.0, math.log1p(self.lod.flow_rates.get(flow.name, 0.0)) / saturation)
+            color = f"#{int(255 * intensity):02x}0000"
+            for name in flow.arrows:
+                if name in self.connection_arrows: # Unchanged arrows are not sent to Tk
+                    self.scene.configure(name, fill=color, width=self.arrow_widths[name] + round(6 * intensity))
 
-        Input:
-            None
-        Output:
-            None
+    def reset_arrows(self):
         """
-        if self.current_image_id:
-            self.canvas.delete(self.current_image_id)
-        self.current_image_id = None
-    ##############################################################################
-    # Animation 'toERP'-Topic - END
-    ############################################################################## 
+        Restores the original color and width of all arrows.
+        """
+        for name in self.connection_arrows:
+            self.scene.configure(name, fill="black", width=self.arrow_widths[name])
+
     def highlight_flow(self):
         """
         Temporarily highlights the connection arrows in the diagram.
@@ -401,9 +916,9 @@ class MQTTVisualizerGUI:
         Output:
             None
         """
-        for arrow in self.connection_arrows.values():
-            self.canvas.itemconfig(arrow, fill="red")
-        self.root.after(500, lambda: [self.canvas.itemconfig(arrow, fill="black") for arrow in self.connection_arrows.values()])
+        for name in self.connection_arrows:
+            self.scene.configure(name, fill="red")
+        self.root.after(500, lambda: [self.scene.configure(name, fill="black") for name in self.connection_arrows])
     
     def run(self):
         """
@@ -414,8 +929,49 @@ class MQTTVisualizerGUI:
         Output:
             None
         """
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.ingest_pump.start()  # Starts draining the ingest queue
+        self.metrics_panel.start()
+        reload_config = self.config.get("reload") or {}
+        if reload_config.get("enabled", True):
+            self.config_poll_ms = int(reload_config.get("interval_s", 2) * 1000)
+            self.config_poll_id = self.root.after(self.config_poll_ms, self.watch_config)
         self.root.mainloop()
 
+    def start_replay(self, path, speed=1.0):
+        """
+        Replays a recording (see 'recorder.py') through the normal message path.
+
+        Input:
+            path (str): recording file
+            speed (float): 1 -> original speed, N -> N times faster, 0 -> maximum
+        Output: None
+        """
+        if self.worker is not None:
+            self.worker.replay(path, speed) # Fed into the clients of the ingest process
+            return
+        self.log(f"Replaying '{path}' (speed: {speed or 'max'}).")
+        self.replayer = Replayer(path, self.mqtt_client, speed)
+        self.replayer.start()
+
+    def close(self):
+        """
+        Closes the connection to the broker (stops the network thread) and the window.
+        """
+        if self.replayer is not None:
+            self.replayer.stop()
+        self.mqtt_client.stop_recording()
+        self.plants.disconnect()
+        self.mqtt_client.disconnect()
+        if self.bridge is not None:
+            self.bridge.cancel()
+        if self.network.ident is not None:
+            self.network.stop() # Sends the DISCONNECTs and ends the network thread
+        self.ingest_pump.stop()
+        if self.history is not None:
+            self.history.close() # Writes the last batch
+        self.root.destroy()
+
 if __name__ == "__main__":
     app = MQTTVisualizerGUI()
     app.run()
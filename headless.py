@@ -0,0 +1,219 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'headless.py' runs the visualizer without a GUI
+(e.g. on broker-side servers without a display). Incoming messages are classified by
+the same event pipeline as in the GUI and per-topic counts, rates and latencies are
+streamed as JSON lines (one report per interval) to stdout or a file.
+
+Neither tkinter nor ttkbootstrap are imported in this mode.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import asyncio
+import concurrent.futures
+import json
+import sys
+import time
+
+from aiocore import AsyncCore, EventStream
+from ingest import IngestQueue
+from network import NetworkLoop
+from mqttclient import MQTTClient, BrokerFanIn
+from latency import load_latency
+from pipeline import EventPipeline
+from metrics import MetricsRegistry
+from routing import FlowRouter
+from rules import RuleEngine
+from recorder import Replayer
+from history import HistoryStore
+from config import resolve_path
+
+
+##############################################################################
+# HEADLESS MODE
+##############################################################################
+def log_status(text):
+    """
+    Status messages go to stderr, so stdout only contains the JSON lines.
+    """
+    print(text, file=sys.stderr, flush=True)
+
+
+def handle_status(event):
+    """
+    Logs connection events ('connect', 'disconnect', 'connect_fail').
+    """
+    prefix = f"[{event.source}] " if event.source else ""
+    if event.kind == "connect":
+        if event.info == 0:
+            log_status(prefix + "Successfully connected.")
+        else:
+            log_status(f"{prefix}+++ Connection failed with error code '{event.info}'. +++")
+    elif event.kind == "disconnect":
+        if event.info == 0:
+            log_status(prefix + "Disconnected.")
+        else:
+            log_status(f"{prefix}+++ Connection lost (error code '{event.info}') - reconnecting ... +++")
+    elif event.kind == "connect_fail":
+        log_status(prefix + "+++ Connection attempt failed - retrying ... +++")
+
+
+def handle_event(event, pipeline, history=None):
+    """
+    Messages are classified, counted and stored in the history, all other events
+    are logged.
+    """
+    if event.kind == "message":
+        flow = pipeline.process(event)
+        if history is not None:
+            history.add(event, flow)
+    else:
+        handle_status(event)
+
+
+async def consume_stream(events, pipeline, write_report, interval, replayer=None, history=None):
+    """
+    Consumer of the asyncio core: awaits the events of the stream and writes one
+    report per interval (no polling). Ends after the replay or when cancelled.
+
+    Input:
+        events (EventStream), pipeline (EventPipeline)
+        write_report (callable): writes one report
+        interval (float): seconds between two reports
+        replayer (Replayer): running replay (optional)
+        history (HistoryStore): message history (optional)
+    Output: None
+    """
+    loop = asyncio.get_running_loop()
+    next_report = loop.time() + interval
+    while True:
+        event = events.get_nowait()
+        if event is None:
+            timeout = max(0.0, next_report - loop.time())
+            if replayer is not None:
+                timeout = min(timeout, 0.1)  # Check regularly whether the replay has ended
+            try:
+                event = await asyncio.wait_for(events.get(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if event is not None:
+            handle_event(event, pipeline, history)
+
+        finished = replayer is not None and not replayer.is_alive() and not len(events)
+        if loop.time() >= next_report or finished:
+            next_report += interval
+            write_report()
+        if finished:
+            return
+
+
+def run_headless(config, broker, port, topic, websocket=False, tls=False, interval=5.0, output=None, poll_ms=10,
+                 record=None, replay=None, speed=1.0):
+    """
+    Connects to the broker and streams one JSON report per interval until Ctrl+C.
+    With 'replay' no connection is established: the recording is fed through the
+    same message path and the mode ends after the last message.
+
+    With 'connection: core: asyncio' the events are awaited on the asyncio core
+    ('consume_stream'), otherwise the ingest queue is drained every 'poll_ms'.
+
+    Input:
+        config (Config): validated 'config.yaml' (see 'config.py')
+        broker, port, topic, websocket, tls: connection settings
+        interval (float): seconds between two reports
+        output (str): JSONL file (None -> stdout)
+        poll_ms (int): delay between two drains of the ingest queue
+        record (str): record all messages to this file (optional)
+        replay (str): replay this recording instead of connecting (optional)
+        speed (float): replay speed (1 -> original, N -> N times faster, 0 -> maximum)
+    Output: None
+    """
+    metrics_config = config.get("metrics") or {}
+    metrics = MetricsRegistry(metrics_config.get("window_s", 60), metrics_config.get("max_topics", 200))
+    router = FlowRouter(config.flows)
+    rules = RuleEngine(*config.rules)
+    pipeline = EventPipeline(router, metrics, rules, load_latency(config.get("latency")),
+                             metrics_config.get("max_topics", 200))
+    history_config = config.get("history") or {}
+    history = None
+    if history_config.get("enabled", True):
+        history = HistoryStore(
+            resolve_path(history_config.get("path", "history.db")),
+            batch_size=history_config.get("batch_size", 500),
+            flush_interval=history_config.get("flush_interval", 0.5),
+            retention_hours=config.retention_hours,
+        )
+
+    # Network core: selector loop (default) or asyncio loop, one thread for all brokers
+    if config.core == "asyncio":
+        network = AsyncCore()
+        network.start()
+        events = EventStream(network, config.queue_size)
+    else:
+        network = NetworkLoop()
+        events = IngestQueue(config.queue_size)
+    client = MQTTClient(events, config, log_status, network=network)
+    plants = BrokerFanIn(client, list(config.plants))  # Further brokers, same network thread
+
+    stream = open(output, "a", buffering=1) if output else sys.stdout  # Line buffered
+
+    def write_report():
+        report = {"time": round(time.time(), 3), "dropped": events.dropped, "topics": pipeline.report()}
+        if pipeline.latency is not None:
+            report["latency"] = pipeline.latency.snapshot()  # End-to-end latency per flow
+        stream.write(json.dumps(report) + "\n")
+        stream.flush()
+
+    if record:
+        client.start_recording(record)
+    replayer = None
+    if replay:
+        log_status(f"Replaying '{replay}' (speed: {speed or 'max'}).")
+        replayer = Replayer(replay, client, speed)
+        replayer.start()
+    else:
+        client.connect(broker, port, topic, websocket=websocket, tls=tls)
+        plants.connect()
+
+    consumer = None
+    try:
+        if isinstance(events, EventStream):
+            consumer = network.submit(consume_stream(events, pipeline, write_report, interval, replayer, history))
+            while not consumer.done():
+                concurrent.futures.wait([consumer], timeout=1.0)  # Short waits -> Ctrl+C stays responsive
+            consumer.result()
+        else:
+            next_report = time.monotonic() + interval
+            finished = False
+            while not finished:
+                finished = replayer is not None and not replayer.is_alive()  # Last drain after the replay
+                event = events.get()
+                while event is not None:
+                    handle_event(event, pipeline, history)
+                    event = events.get()
+
+                now = time.monotonic()
+                if now >= next_report or finished:
+                    next_report += interval
+                    write_report()
+                time.sleep(poll_ms / 1000.0)
+    except KeyboardInterrupt:
+        if consumer is not None:
+            consumer.cancel()
+    finally:
+        if replayer is not None:
+            replayer.stop()
+            log_status(f"Replay finished ({replayer.count} messages).")
+        client.stop_recording()
+        plants.disconnect()
+        client.disconnect()
+        if network.ident is not None:
+            network.stop()
+            network.join(3.0)  # Let the DISCONNECTs go out before the process ends
+        if history is not None:
+            history.close()
+        if stream is not sys.stdout:
+            stream.close()
@@ -0,0 +1,189 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'history.py' keeps the message history in a local
+SQLite database (WAL mode), so the traffic is still available after the window was
+closed. Messages are only appended to an in-memory batch on the processing path; a
+writer thread inserts each batch in one transaction. Queries (time range, topic,
+message counts per time bucket) are indexed by topic and time.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import collections
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+#############################################################################
+# SCHEMA
+#############################################################################
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    source TEXT,
+    topic TEXT NOT NULL,
+    qos INTEGER NOT NULL,
+    flow TEXT,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (time);
+CREATE INDEX IF NOT EXISTS messages_topic_time ON messages (topic, time);
+"""
+INSERT = "INSERT INTO messages (time, source, topic, qos, flow, payload) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def connect(path):
+    """
+    Opens the database in WAL mode (readers do not block the writer and vice versa).
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # WAL: durable except for the last transactions on power loss
+    return connection
+
+
+##############################################################################
+# HISTORY STORE
+##############################################################################
+class HistoryStore:
+    """
+    +++ Responsibilities of the history store +++
+
+    1. Collect messages in memory ('add' never waits on the disk)
+    2. Insert them in batches, one transaction per batch, on a writer thread
+    3. Delete messages older than 'retention_hours'
+    4. Answer queries for the timeline view ('counts', 'messages', 'topics')
+    """
+    def __init__(self, path, batch_size=500, flush_interval=0.5, retention_hours=24, max_pending=100000):
+        """
+        Input:
+            path (str): database file (created if missing)
+            batch_size (int): messages per transaction (a full batch is written at once)
+            flush_interval (float): maximum seconds a message waits in memory
+            retention_hours (float): age after which messages are deleted (0 -> keep)
+            max_pending (int): maximum number of messages waiting in memory
+        Output: None
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = retention_hours * 3600
+        self.pending = collections.deque(maxlen=max_pending)
+        self.dropped = 0  # Messages lost because the writer fell behind
+        self.written = 0
+        self.wakeup = threading.Event()
+        self.stopped = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with contextlib.closing(connect(path)) as connection:  # 'with connection' only commits
+            connection.executescript(SCHEMA)
+        self.reader = connect(path)  # Queries of the GUI (main loop)
+        self.writer = threading.Thread(target=self.run, name="history-writer", daemon=True)
+        self.writer.start()
+
+    def add(self, event, flow=None):
+        """
+        Appends one message to the current batch. Called on the processing path.
+
+        Input: event (IngestEvent) - 'message' event, flow (Flow or None)
+        Output: None
+        """
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        # Reception time as wall clock ('received' is a perf_counter value)
+        timestamp = time.time() - (time.perf_counter() - event.received)
+        self.pending.append((timestamp, event.source, event.topic, event.qos,
+                             flow.name if flow is not None else None, event.payload))
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    def run(self):
+        connection = connect(self.path)
+        next_cleanup = 0.0
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            stopped = self.stopped
+            self.write_pending(connection)
+            now = time.time()
+            if self.retention and now >= next_cleanup:
+                with connection:
+                    connection.execute("DELETE FROM messages WHERE time < ?", (now - self.retention,))
+                next_cleanup = now + 60
+            if stopped:
+                break
+        connection.close()
+
+    def write_pending(self, connection):
+        """
+        Writes all pending messages, 'batch_size' messages per transaction.
+        """
+        pending = self.pending
+        while pending:
+            batch = []
+            while pending and len(batch) < self.batch_size:
+                batch.append(pending.popleft())
+            with connection:  # One transaction per batch
+                connection.executemany(INSERT, batch)
+            self.written += len(batch)
+
+    def close(self):
+        """
+        Writes the remaining messages and stops the writer thread.
+        """
+        self.stopped = True
+        self.wakeup.set()
+        self.writer.join(5.0)
+        self.reader.close()
+
+    ##############################################################################
+    # QUERIES (timeline view)
+    ##############################################################################
+    def counts(self, start, end, buckets, topic=None):
+        """
+        Number of messages per time bucket.
+
+        Input: start, end (float) - time range (epoch seconds), buckets (int), topic (str, optional)
+        Output: list of int (one count per bucket)
+        """
+        width = max((end - start) / buckets, 1e-6)
+        query = "SELECT CAST((time - ?) / ? AS INTEGER) AS bucket, COUNT(*) FROM messages WHERE time >= ? AND time < ?"
+        parameters = [start, width, start, end]
+        if topic:
+            query += " AND topic = ?"
+            parameters.append(topic)
+        counts = [0] * buckets
+        for bucket, count in self.reader.execute(query + " GROUP BY bucket", parameters):
+            if 0 <= bucket < buckets:
+                counts[bucket] = count
+        return counts
+
+    def messages(self, start, end, topic=None, limit=500):
+        """
+        Messages of a time range (oldest first).
+
+        Input: start, end (float), topic (str, optional), limit (int)
+        Output: list of (time, source, topic, qos, flow, payload)
+        """
+        query = "SELECT time, source, topic, qos, flow, payload FROM messages WHERE time >= ? AND time < ?"
+        parameters = [start, end]
+        if topic:
+            query += " AND topic = ?"
+            parameters.append(topic)
+        query += " ORDER BY time LIMIT ?"
+        parameters.append(limit)
+        return self.reader.execute(query, parameters).fetchall()
+
+    def topics(self, start, end):
+        """
+        Topics with messages in the time range.
+        """
+        rows = self.reader.execute("SELECT DISTINCT topic FROM messages WHERE time >= ? AND time < ? ORDER BY topic",
+                                   (start, end))
+        return [topic for (topic,) in rows]
@@ -0,0 +1,168 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'historyview.py' shows the message history of
+'history.py' in a separate window: a timeline with the number of messages per time
+bucket (last hours) and a slider to scrub through it. The messages of the selected
+bucket are listed below; a double-click shows the full payload.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from payload import preview_payload, format_payload
+
+RANGES = {"1 h": 3600, "6 h": 6 * 3600, "24 h": 24 * 3600}
+ALL_TOPICS = "(all topics)"
+
+
+##############################################################################
+# HISTORY VIEW
+##############################################################################
+class HistoryView:
+    """
+    +++ Responsibilities of the history view +++
+
+    1. Draw the timeline of the chosen range (messages per bucket, optional topic)
+    2. Scrub through the timeline (slider or click) and list the messages of the
+       selected bucket
+    3. Show the full payload of a listed message (double-click)
+    """
+    def __init__(self, root, store, buckets=120, preview_bytes=200):
+        """
+        Input:
+            root: Tkinter root window
+            store (HistoryStore): message history
+            buckets (int): number of bars of the timeline
+            preview_bytes (int): payload bytes shown per row
+        Output: None
+        """
+        self.store = store
+        self.buckets = buckets
+        self.preview_bytes = preview_bytes
+        self.start = self.end = 0.0
+        self.counts = []
+        self.payloads = {}  # row id -> payload
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Message history")
+
+        controls = ttk.Frame(self.window, padding=5)
+        controls.pack(fill="x")
+        ttk.Label(controls, text="Range:").pack(side="left", padx=5)
+        self.range = ttk.Combobox(controls, values=list(RANGES), width=6, state="readonly")
+        self.range.set("1 h")
+        self.range.pack(side="left", padx=5)
+        ttk.Label(controls, text="Topic:").pack(side="left", padx=5)
+        self.topic = ttk.Combobox(controls, values=[ALL_TOPICS], width=30, state="readonly")
+        self.topic.set(ALL_TOPICS)
+        self.topic.pack(side="left", padx=5)
+        ttk.Button(controls, text="Refresh", command=self.refresh).pack(side="left", padx=5)
+        self.range.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+        self.topic.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+
+        self.timeline = tk.Canvas(self.window, bg="white", height=90, width=720)
+        self.timeline.pack(fill="x", padx=5)
+        self.timeline.bind("<Button-1>", self.click_timeline)
+        self.timeline.bind("<Configure>", lambda event: self.draw_timeline())
+        self.position = tk.IntVar(value=buckets - 1)
+        self.scale = ttk.Scale(self.window, from_=0, to=buckets - 1, variable=self.position,
+                               command=lambda value: self.select(int(float(value))))
+        self.scale.pack(fill="x", padx=5)
+        self.label = ttk.Label(self.window, text="")
+        self.label.pack(fill="x", padx=5)
+
+        self.tree = ttk.Treeview(self.window, columns=("topic", "flow", "payload"), height=15)
+        self.tree.heading("#0", text="Time")
+        self.tree.heading("topic", text="Topic")
+        self.tree.heading("flow", text="Flow")
+        self.tree.heading("payload", text="Payload")
+        self.tree.column("#0", width=110)
+        self.tree.column("topic", width=200)
+        self.tree.column("flow", width=80)
+        self.tree.column("payload", width=400)
+        self.tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.tree.bind("<Double-Button-1>", self.expand)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reloads the timeline for the chosen range (ending now).
+        """
+        self.end = time.time()
+        self.start = self.end - RANGES[self.range.get()]
+        topic = self.selected_topic()
+        self.topic.configure(values=[ALL_TOPICS] + self.store.topics(self.start, self.end))
+        self.counts = self.store.counts(self.start, self.end, self.buckets, topic)
+        self.draw_timeline()
+        self.select(self.position.get())
+
+    def selected_topic(self):
+        topic = self.topic.get()
+        return None if topic == ALL_TOPICS else topic
+
+    def draw_timeline(self):
+        """
+        One bar per bucket, scaled to the busiest bucket; the selected bucket is marked.
+        """
+        self.timeline.delete("all")
+        width = max(self.timeline.winfo_width(), 1)
+        height = int(self.timeline.cget("height"))
+        bar = width / self.buckets
+        peak = max(self.counts) if self.counts else 0
+        if peak:
+            for index, count in enumerate(self.counts):
+                if count:
+                    top = height - 5 - (height - 10) * count / peak
+                    self.timeline.create_rectangle(index * bar, top, (index + 1) * bar - 1, height - 5,
+                                                   fill="steelblue", outline="")
+        x = (self.position.get() + 0.5) * bar
+        self.timeline.create_line(x, 0, x, height, fill="red", tags="marker")
+
+    def click_timeline(self, event):
+        bar = max(self.timeline.winfo_width(), 1) / self.buckets
+        self.position.set(min(self.buckets - 1, max(0, int(event.x / bar))))
+        self.select(self.position.get())
+
+    def select(self, index):
+        """
+        Lists the messages of the selected bucket.
+
+        Input: index (int) - bucket of the timeline
+        Output: None
+        """
+        width = (self.end - self.start) / self.buckets
+        start = self.start + index * width
+        end = start + width
+        self.draw_timeline()
+        self.tree.delete(*self.tree.get_children())
+        self.payloads.clear()
+        rows = self.store.messages(start, end, self.selected_topic())
+        for timestamp, source, topic, qos, flow, payload in rows:
+            name = f"[{source}] {topic}" if source else topic
+            row = self.tree.insert("", "end", text=time.strftime("%H:%M:%S", time.localtime(timestamp)),
+                                   values=(name, flow or "", preview_payload(payload, self.preview_bytes)))
+            self.payloads[row] = payload
+        count = self.counts[index] if index < len(self.counts) else 0
+        self.label.configure(text=f"{time.strftime('%H:%M:%S', time.localtime(start))} - "
+                                  f"{time.strftime('%H:%M:%S', time.localtime(end))}: {count} messages"
+                                  + (f" (first {len(rows)} shown)" if count > len(rows) else ""))
+
+    def expand(self, event):
+        """
+        Shows the full payload of the double-clicked row.
+        """
+        payload = self.payloads.get(self.tree.identify_row(event.y))
+        if payload is None:
+            return
+        window = tk.Toplevel(self.window)
+        window.title(f"Message ({len(payload)} bytes)")
+        text = tk.Text(window, wrap="word", width=100, height=30)
+        text.pack(fill="both", expand=True)
+        text.insert("end", format_payload(payload))
+        text.config(state=tk.DISABLED)
@@ -0,0 +1,180 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'ingest.py' contains the hand-off stage between
+the paho network thread and the Tkinter main loop. The MQTT callbacks only put small
+event records into a bounded queue, a single 'after' pump on the GUI side drains the
+queue in batches per frame.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import collections  # deque -> append/popleft are atomic, no explicit lock needed
+import time
+import traceback
+
+FLAG_DUP = 1  # Message flags: redelivery of a QoS 1/2 message
+FLAG_RETAIN = 2  # Retained message (sent on subscribe)
+FLAG_CLASSIFIED = 4  # Flow and publish time already set by the ingest process ('procingest.py')
+FLAG_TRUNCATED = 8  # Payload cut by the ingest process ('size' is the original size)
+
+##############################################################################
+# EVENT RECORD
+##############################################################################
+class IngestEvent:
+    """
+    Compact record which is passed from the network thread to the GUI.
+
+    Kinds:
+        'message' -> topic, payload (raw bytes), qos, flags (FLAG_DUP, FLAG_RETAIN,
+                     FLAG_TRUNCATED), properties (MQTT 5 user properties as dict, None
+                     otherwise), size (payload bytes, the payload may be cut by the
+                     ingest process -> FLAG_TRUNCATED)
+        'status' -> info = status text of the ingest process
+        'connect' -> info = result code of the connection attempt
+        'disconnect' -> info = result code (0 = closed on purpose, otherwise lost)
+        'connect_fail' -> connection attempt failed (retried automatically)
+
+    source: name of the broker (plant) the event comes from, None for the primary broker
+    flow / publish: flow and (publish time, message id), only with FLAG_CLASSIFIED
+    """
+    __slots__ = ("kind", "topic", "payload", "qos", "received", "info", "source", "flags", "properties",
+                 "size", "flow", "publish")
+
+    def __init__(self, kind, topic=None, payload=None, qos=0, info=None, source=None, flags=0, properties=None):
+        self.kind = kind
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.received = time.perf_counter()  # Timestamp of reception (network thread)
+        self.info = info
+        self.source = source
+        self.flags = flags
+        self.properties = properties
+        self.size = len(payload) if payload is not None else 0
+        self.flow = None
+        self.publish = None
+
+
+##############################################################################
+# INGEST QUEUE
+##############################################################################
+class IngestQueue:
+    """
+    +++ Responsibilities of the ingest queue +++
+
+    1. Accept events from the paho network thread without waiting on the GUI
+    2. Stay bounded: if the GUI falls behind, the oldest events are dropped
+    3. Hand out the events in batches to the GUI pump
+    """
+    def __init__(self, maxsize=10000):
+        """
+        Input: maxsize (int) - maximum number of buffered events
+        Output: None
+        """
+        self.buffer = collections.deque(maxlen=maxsize)
+        self.dropped = 0  # Number of events dropped because the queue was full
+
+    def put(self, event):
+        """
+        Adds an event to the queue. Called from the network thread.
+
+        Input: event (IngestEvent)
+        Output: None
+        """
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1  # deque(maxlen) silently discards the oldest entry
+        self.buffer.append(event)
+
+    def get(self):
+        """
+        Returns the oldest event or None if the queue is empty.
+        """
+        try:
+            return self.buffer.popleft()
+        except IndexError:
+            return None
+
+    def __len__(self):
+        return len(self.buffer)
+
+
+##############################################################################
+# GUI PUMP
+##############################################################################
+class IngestPump:
+    """
+    Drains the ingest queue on the Tkinter main loop via a single 'root.after' timer.
+
+    Per frame at most 'max_batch' events are handled and the pump stops as soon as
+    the frame budget is used up, so the GUI stays responsive at high message rates.
+    """
+    def __init__(self, root, queue, dispatch, max_batch=200, frame_budget_ms=12, interval_ms=16, on_frame=None):
+        """
+        Input:
+            root: Tkinter root window (provides 'after')
+            queue (IngestQueue): queue filled by the network thread
+            dispatch (callable): called on the main loop with every event
+            max_batch (int): maximum number of events per frame
+            frame_budget_ms (int): maximum time per frame spent on events
+            interval_ms (int): delay between two frames
+            on_frame (callable): called after every frame with (frame time, backlog),
+                                 frame time = time spent + lateness of the frame
+        Output: None
+        """
+        self.root = root
+        self.queue = queue
+        self.dispatch = dispatch
+        self.max_batch = max_batch
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.interval_ms = interval_ms
+        self.on_frame = on_frame
+        self.after_id = None
+        self.due = None  # Planned start of the next frame
+
+    def start(self):
+        """
+        Schedules the first frame (only once).
+        """
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.pump)
+            self.due = time.perf_counter() + self.interval_ms / 1000.0
+
+    def stop(self):
+        """
+        Cancels the pending frame.
+        """
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def pump(self):
+        """
+        Handles one batch of events and schedules the next frame (also if an event
+        or 'on_frame' fails, the error is printed).
+
+        Input: None
+        Output: None
+        """
+        start = time.perf_counter()
+        deadline = start + self.frame_budget
+        get = self.queue.get
+        for _ in range(self.max_batch):
+            event = get()
+            if event is None:
+                break
+            try:
+                self.dispatch(event)
+            except Exception:
+                traceback.print_exc()  # One faulty event must not stop the pump
+            if time.perf_counter() >= deadline:
+                break  # Frame budget used up -> continue in the next frame
+        end = time.perf_counter()
+        try:
+            if self.on_frame is not None:
+                lateness = max(0.0, start - self.due) if self.due is not None else 0.0  # Main loop was busy
+                self.on_frame(end - start + lateness, len(self.queue))
+        finally:
+            self.after_id = self.root.after(self.interval_ms, self.pump)
+            self.due = end + self.interval_ms / 1000.0
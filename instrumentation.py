@@ -0,0 +1,266 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'instrumentation.py' measures where the time of
+the hot paths goes (paho callback, log view, animations). Probe points are methods
+of live objects; while the instrumentation is enabled they are replaced by timed
+wrappers (call count + timing histogram), when it is disabled the original methods
+are restored -> no overhead at all when switched off.
+
+cProfile and tracemalloc can be switched on in addition (both are only imported
+when used). Opened via the hidden debug panel ('debugpanel.py', Ctrl+Shift+D).
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import io
+import json
+import time
+from array import array
+
+#############################################################################
+# TIMING HISTOGRAM: BUCKET i COUNTS DURATIONS < 2**i MICROSECONDS
+#############################################################################
+TIME_BUCKETS = 28  # Last bucket: about 2 minutes and more
+
+
+class TimingHistogram:
+    """
+    Durations of one probe point on a log2 scale (microseconds), plus count, sum and
+    maximum. Percentiles are reported as the upper bound of their bucket.
+    """
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = array("L", [0] * TIME_BUCKETS)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), TIME_BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        """
+        Input: fraction (float) - e.g. 0.99
+        Output: int - upper bound of the bucket in microseconds (0 without samples)
+        """
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return 2 ** bucket
+        return 2 ** (TIME_BUCKETS - 1)
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count * 1e6, 1) if self.count else 0.0,
+            "p50_us": self.percentile(0.50),
+            "p99_us": self.percentile(0.99),
+            "max_us": round(self.max * 1e6, 1),
+            "total_ms": round(self.total * 1000, 1),
+        }
+
+
+##############################################################################
+# INSTRUMENTATION
+##############################################################################
+class Instrumentation:
+    """
+    +++ Responsibilities of the instrumentation +++
+
+    1. Keep the probe points (object + method name) and wrap / unwrap them
+    2. Collect call counts and timing histograms per probe point
+    3. Read gauges (queue depth, dropped events, ...) for snapshots
+    4. Switch cProfile (main thread) and tracemalloc on and off
+    5. Provide snapshots as dictionary / JSON line ('snapshot', 'dump')
+    """
+    def __init__(self):
+        self.enabled = False
+        self.points = []  # (owner, attribute, probe name, callback after (un)wrapping)
+        self.timings = {}  # probe name -> TimingHistogram
+        self.gauges = {}  # name -> function returning a number
+        self.profiler = None  # cProfile.Profile while profiling
+        self.tracing = False  # tracemalloc started by 'start_tracemalloc'
+        self.since = time.time()
+
+    def add_point(self, owner, attribute, name, rebind=None):
+        """
+        Registers a probe point. Works for methods which are looked up on every call;
+        callers holding a reference (e.g. paho callbacks) are updated by 'rebind'.
+
+        Input:
+            owner: object of the method
+            attribute (str): method name
+            name (str): probe name in the snapshots
+            rebind (callable): called after wrapping / unwrapping (optional)
+        Output: None
+        """
+        self.points.append((owner, attribute, name, rebind))
+        if self.enabled:
+            self.wrap(owner, attribute, name, rebind)
+
+    def remove_point(self, owner, attribute):
+        """
+        Unregisters a probe point (e.g. of a removed client); the original method is
+        restored if it is wrapped. The collected timings are kept.
+
+        Input: owner, attribute (str) - see 'add_point'
+        Output: None
+        """
+        for point in self.points:
+            if point[0] is owner and point[1] == attribute:
+                self.points.remove(point)
+                if self.enabled:
+                    self.unwrap(*point)
+                return
+
+    def owners(self, name):
+        """
+        Input: name (str) - probe name
+        Output: list - objects whose methods are registered under this name
+        """
+        return [owner for owner, attribute, probe, rebind in self.points if probe == name]
+
+    def add_gauge(self, name, function):
+        self.gauges[name] = function
+
+    def enable(self):
+        """
+        Replaces all probe points by timed wrappers.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        for point in self.points:
+            self.wrap(*point)
+
+    def disable(self):
+        """
+        Restores the original methods (the collected timings are kept).
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        for point in self.points:
+            self.unwrap(*point)
+
+    def wrap(self, owner, attribute, name, rebind):
+        setattr(owner, attribute, self.timed(getattr(owner, attribute), name))
+        if rebind is not None:
+            rebind()
+
+    def unwrap(self, owner, attribute, name, rebind):
+        if attribute in vars(owner):
+            delattr(owner, attribute)  # Class attribute (original method) is visible again
+        if rebind is not None:
+            rebind()
+
+    def timed(self, function, name):
+        """
+        Returns a wrapper of the function which records its duration under 'name'.
+        """
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = TimingHistogram()
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+        return timed
+
+    def reset(self):
+        """
+        Clears the timings (the wrappers keep their histograms).
+        """
+        for histogram in self.timings.values():
+            histogram.__init__()
+        self.since = time.time()
+
+    ##############################################################################
+    # PROFILERS (imported on first use)
+    ##############################################################################
+    def start_profiler(self):
+        """
+        Starts cProfile for the calling thread (the Tkinter main loop).
+        """
+        import cProfile
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profiler(self, limit=30):
+        """
+        Stops cProfile.
+
+        Input: limit (int) - number of functions in the report
+        Output: str - functions sorted by cumulative time ('' if not profiling)
+        """
+        import pstats
+        if self.profiler is None:
+            return ""
+        self.profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(limit)
+        self.profiler = None
+        return report.getvalue()
+
+    def start_tracemalloc(self):
+        import tracemalloc
+        if not self.tracing:
+            tracemalloc.start()
+            self.tracing = True
+
+    def stop_tracemalloc(self, limit=30):
+        """
+        Stops tracemalloc.
+
+        Input: limit (int) - number of source lines in the report
+        Output: str - source lines with the most allocated memory still alive
+        """
+        import tracemalloc
+        if not self.tracing:
+            return ""
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        self.tracing = False
+        lines = [str(statistic) for statistic in snapshot.statistics("lineno")[:limit]]
+        return "\n".join(lines)
+
+    ##############################################################################
+    # SNAPSHOTS
+    ##############################################################################
+    def snapshot(self):
+        """
+        Output: dict - time, enabled, since, timings (probe -> histogram snapshot),
+                gauges (name -> value), profiling, tracing
+        """
+        return {
+            "time": round(time.time(), 3),
+            "enabled": self.enabled,
+            "since": round(self.since, 3),
+            "timings": {name: histogram.snapshot() for name, histogram in self.timings.items()},
+            "gauges": {name: function() for name, function in self.gauges.items()},
+            "profiling": self.profiler is not None,
+            "tracing": self.tracing,
+        }
+
+    def dump(self, path):
+        """
+        Appends the snapshot as one JSON line to the file.
+        """
+        with open(path, "a") as file:
+            file.write(json.dumps(self.snapshot()) + "\n")
@@ -10,6 +10,7 @@ MQTT_BROKER = "MQTT Broker:"
 PORT = "Port:"
 TOPIC = "Topic:"
 CONNECT_BUTTON = "Connect"
+HISTORY_BUTTON = "History"
 #############################################################################
 # COMPONENTS IN GUI
 #############################################################################
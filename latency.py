@@ -0,0 +1,374 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'latency.py' measures the end-to-end latency of
+every flow: time of reception minus the publish time set by the publisher. The
+publish time is taken from an MQTT 5 user property or from a field of the JSON
+payload (both configurable in 'config.yaml').
+
+Latencies are counted in HDR-style histograms (16 linear sub-buckets per power of
+two, about 6 % resolution from 1 microsecond up to hours) -> constant memory per
+flow, whatever the message rate. Redelivered messages (DUP flag) and duplicates
+(same message id or same publish time + payload seen again) are counted separately
+and kept out of the latencies; retained messages are skipped (their age is no latency).
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import collections
+import datetime
+import time
+import zlib
+from array import array
+
+from ingest import FLAG_DUP, FLAG_RETAIN
+from rules import parse_json
+
+#############################################################################
+# HDR HISTOGRAM: 16 SUB-BUCKETS PER POWER OF TWO (MICROSECONDS)
+#############################################################################
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+MAX_SHIFT = 32  # Values from 2**36 microseconds (about 19 hours) on share the last bucket
+LATENCY_BUCKETS = SUB_BUCKETS * (MAX_SHIFT + 2)
+
+# Publish time in seconds, milliseconds, microseconds or nanoseconds since the epoch
+UNITS = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+
+
+class LatencyHistogram:
+    """
+    Latencies of one flow in microseconds. Values below 16 us have their own bucket,
+    above that every power of two is split into 16 buckets.
+    """
+    __slots__ = ("count", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.max = 0
+        self.buckets = array("L", [0] * LATENCY_BUCKETS)
+
+    @staticmethod
+    def bucket(value):
+        if value < SUB_BUCKETS:
+            return value
+        shift = min(value.bit_length() - SUB_BITS - 1, MAX_SHIFT)
+        return min(SUB_BUCKETS * (shift + 1) + (value >> shift) - SUB_BUCKETS, LATENCY_BUCKETS - 1)
+
+    @staticmethod
+    def bucket_value(bucket):
+        """
+        Middle of the bucket in microseconds.
+        """
+        if bucket < SUB_BUCKETS:
+            return bucket
+        shift = bucket // SUB_BUCKETS - 1
+        low = (bucket % SUB_BUCKETS + SUB_BUCKETS) << shift
+        return low + ((1 << shift) - 1) / 2
+
+    def record(self, microseconds):
+        self.count += 1
+        if microseconds > self.max:
+            self.max = microseconds
+        self.buckets[self.bucket(microseconds)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.max = max(self.max, other.max)
+        buckets = self.buckets
+        for index, count in enumerate(other.buckets):
+            if count:
+                buckets[index] += count
+
+    def percentile(self, fraction):
+        """
+        Input: fraction (float) - e.g. 0.99
+        Output: float - latency in microseconds (0 without samples)
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_value(bucket), self.max)
+        return float(self.max)
+
+
+##############################################################################
+# PUBLISH TIME
+##############################################################################
+def to_epoch(value, unit="auto"):
+    """
+    Converts a publish time into seconds since the epoch.
+
+    Input:
+        value: number, numeric string or ISO 8601 string ('2024-05-01T12:00:00.123Z')
+        unit (str): 's', 'ms', 'us', 'ns', 'iso' or 'auto' (numbers: unit by magnitude)
+    Output: float or None (no valid time)
+    """
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if isinstance(value, str) and unit != "iso":
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    if isinstance(value, str):
+        try:
+            moment = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return moment.timestamp()  # Without offset: local time
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if unit in UNITS:
+        return value * UNITS[unit]
+    if value > 1e17:
+        return value * 1e-9
+    if value > 1e14:
+        return value * 1e-6
+    if value > 1e11:
+        return value * 1e-3
+    return float(value)
+
+
+##############################################################################
+# FLOW LATENCY RECORD
+##############################################################################
+class FlowLatency:
+    """
+    Latency histograms and delivery counters of one flow.
+
+    current / previous: histograms of the running and the last window
+    """
+    __slots__ = ("messages", "timed", "missing", "redelivered", "duplicates", "retained",
+                 "skewed", "current", "previous")
+
+    def __init__(self):
+        self.messages = 0
+        self.timed = 0  # Messages with a publish time (-> latency recorded)
+        self.missing = 0  # Messages without (valid) publish time
+        self.redelivered = 0  # DUP flag set by the broker
+        self.duplicates = 0  # Message seen before (message id / publish time + payload)
+        self.retained = 0  # Retained messages (not counted as latency)
+        self.skewed = 0  # Publish time after the reception -> clocks out of sync
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+
+
+##############################################################################
+# LATENCY TRACKER
+##############################################################################
+class LatencyTracker:
+    """
+    +++ Responsibilities of the latency tracker +++
+
+    1. Read the publish time of a message (MQTT 5 user property or payload field)
+    2. Detect redeliveries (DUP flag) and duplicates (bounded window of message keys)
+    3. Record the latency per flow in constant memory (two HDR histograms per flow,
+       rotated every 'window_s' -> percentiles over the last one to two windows)
+    4. Provide snapshots (percentiles and counters per flow) for the GUI and the
+       headless reports
+    """
+    def __init__(self, user_property="timestamp", payload_field=None, id_property="message_id",
+                 id_field=None, unit="auto", window_s=30, duplicate_window=4096):
+        """
+        Input:
+            user_property (str): MQTT 5 user property with the publish time (None -> not used)
+            payload_field (str): JSON field with the publish time, dotted path (None -> payload not parsed)
+            id_property (str): MQTT 5 user property with a message id (duplicate detection)
+            id_field (str): JSON field with a message id (dotted path)
+            unit (str): unit of numeric publish times, see 'to_epoch'
+            window_s (float): length of a histogram window in seconds
+            duplicate_window (int): number of message keys remembered for the duplicate detection
+        Output: None
+        """
+        self.user_property = user_property
+        self.payload_path = tuple(payload_field.split(".")) if payload_field else None
+        self.id_property = id_property
+        self.id_path = tuple(id_field.split(".")) if id_field else None
+        self.unit = unit
+        self.window_s = window_s
+        self.flows = {}  # flow name -> FlowLatency
+        self.seen = collections.deque(maxlen=duplicate_window)  # Message keys, oldest first
+        self.seen_keys = set()
+        self.rotated = time.monotonic()
+
+    def record(self, event, flow):
+        """
+        Records the latency of a classified message. Called for every message.
+
+        Input: event (IngestEvent) - 'message' event, flow (Flow or None -> ignored)
+        Output: None
+        """
+        if flow is None:
+            return
+        stats = self.flows.get(flow.name)
+        if stats is None:
+            stats = self.flows[flow.name] = FlowLatency()
+        stats.messages += 1
+        if event.flags & FLAG_RETAIN:
+            stats.retained += 1
+            return
+        if event.flags & FLAG_DUP:
+            stats.redelivered += 1
+
+        if event.publish is not None:
+            sent, message_id = event.publish  # Already extracted by the ingest process ('procingest.py')
+        else:
+            sent, message_id = self.publish_info(event)
+
+        # Duplicate: same id, or same publish time and payload (without either, equal
+        # payloads may be regular repetitions and are not treated as duplicates)
+        if message_id is not None:
+            key = (event.source, event.topic, message_id)
+        elif sent is not None:
+            key = (event.source, event.topic, sent, zlib.crc32(event.payload))  # Digest -> window size independent of payloads
+        else:
+            key = None
+        if key is not None:
+            if self.is_duplicate(key):
+                stats.duplicates += 1
+                return
+
+        if sent is None:
+            stats.missing += 1
+            return
+        received = time.time() - (time.perf_counter() - event.received)  # Reception on the network thread
+        latency = received - sent
+        if latency < 0:
+            stats.skewed += 1
+            latency = 0.0
+        stats.timed += 1
+        stats.current.record(int(latency * 1e6))
+
+    def publish_info(self, event):
+        """
+        Reads publish time and message id of a message (user properties first, then
+        the payload, which is only parsed if a payload field is configured).
+
+        Input: event (IngestEvent) - 'message' event
+        Output: tuple (publish time in seconds since the epoch or None, message id or None)
+        """
+        properties = event.properties
+        sent = message_id = None
+        if properties:
+            if self.user_property is not None and self.user_property in properties:
+                sent = to_epoch(properties[self.user_property], self.unit)
+            message_id = properties.get(self.id_property)
+        if (sent is None and self.payload_path is not None) or (message_id is None and self.id_path is not None):
+            document = self.parse(event.payload)
+            if document is not None:
+                if sent is None and self.payload_path is not None:
+                    sent = to_epoch(lookup(document, self.payload_path), self.unit)
+                if message_id is None and self.id_path is not None:
+                    message_id = lookup(document, self.id_path)
+        if isinstance(message_id, (dict, list)):
+            message_id = None  # Only scalar ids can be compared
+        return sent, message_id
+
+    @staticmethod
+    def parse(payload):
+        if payload[:1] != b"{" and payload.lstrip()[:1] != b"{":
+            return None  # No JSON object -> not parsed at all
+        try:
+            document = parse_json(payload)
+        except ValueError:  # Also orjson.JSONDecodeError
+            return None
+        return document if isinstance(document, dict) else None
+
+    def is_duplicate(self, key):
+        """
+        Checks the key against the last 'duplicate_window' keys and remembers it.
+        """
+        if key in self.seen_keys:
+            return True
+        seen = self.seen
+        if len(seen) == seen.maxlen:
+            self.seen_keys.discard(seen[0])  # Evicted by the append below
+        seen.append(key)
+        self.seen_keys.add(key)
+        return False
+
+    def rotate(self, now=None):
+        """
+        Starts a new window once 'window_s' has passed (the oldest window is dropped).
+        """
+        now = time.monotonic() if now is None else now
+        if now - self.rotated < self.window_s:
+            return
+        self.rotated = now
+        for stats in self.flows.values():
+            stats.previous, stats.current = stats.current, stats.previous
+            stats.current.__init__()
+
+    def snapshot(self):
+        """
+        Output: dict - flow name -> percentiles in ms (last one to two windows) and
+                counters since the start
+        """
+        self.rotate()
+        snapshot = {}
+        for name, stats in self.flows.items():
+            histogram = LatencyHistogram()
+            histogram.merge(stats.previous)
+            histogram.merge(stats.current)
+            snapshot[name] = {
+                "messages": stats.messages,
+                "timed": stats.timed,
+                "missing": stats.missing,
+                "redelivered": stats.redelivered,
+                "duplicates": stats.duplicates,
+                "retained": stats.retained,
+                "skewed": stats.skewed,
+                "samples": histogram.count,
+                "p50_ms": round(histogram.percentile(0.50) / 1000, 3),
+                "p90_ms": round(histogram.percentile(0.90) / 1000, 3),
+                "p99_ms": round(histogram.percentile(0.99) / 1000, 3),
+                "max_ms": round(histogram.max / 1000, 3),
+            }
+        return snapshot
+
+
+def lookup(document, path):
+    """
+    Value of a dotted field path in a JSON object (None if missing).
+    """
+    value = document
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def load_latency(declaration):
+    """
+    Creates the latency tracker from the 'latency' section of 'config.yaml'.
+
+    Input: declaration (dict or None)
+    Output: LatencyTracker or None (disabled)
+    Raises: ValueError if the unit is unknown or a window is not positive
+    """
+    declaration = declaration or {}
+    if not declaration.get("enabled", True):
+        return None
+    unit = declaration.get("unit", "auto")
+    if unit not in UNITS and unit not in ("auto", "iso"):
+        raise ValueError(f"Unknown latency unit '{unit}' (s, ms, us, ns, iso or auto).")
+    window_s = float(declaration.get("window_s", 30))
+    duplicate_window = int(declaration.get("duplicate_window", 4096))
+    if window_s <= 0 or duplicate_window <= 0:
+        raise ValueError("'window_s' and 'duplicate_window' of the latency must be positive.")
+    return LatencyTracker(
+        user_property=declaration.get("user_property", "timestamp"),
+        payload_field=declaration.get("payload_field"),
+        id_property=declaration.get("id_property", "message_id"),
+        id_field=declaration.get("id_field"),
+        unit=unit,
+        window_s=window_s,
+        duplicate_window=duplicate_window,
+    )
@@ -0,0 +1,120 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'logview.py' contains the message log of the GUI.
+The log keeps only the last N lines in a ring buffer and writes new lines to the
+Tkinter text widget in one coalesced insert per refresh tick, so memory use and cost
+per message stay constant over long runs.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import collections
+import tkinter as tk
+
+
+##############################################################################
+# LOG VIEW
+##############################################################################
+class LogView:
+    """
+    +++ Responsibilities of the log view +++
+
+    1. Keep the last 'capacity' log lines in a fixed-size ring buffer
+    2. Collect new lines and write them to the widget once per refresh tick
+    3. Trim old lines of the widget in bulk, so it never grows beyond 'capacity'
+    4. Keep the raw payload of message lines for the "expand" view ('payload_at')
+    5. Feed the search index (optional), one batch per refresh tick
+    """
+    def __init__(self, root, text_widget, capacity=1000, refresh_ms=100, index=None):
+        """
+        Input:
+            root: Tkinter root window (provides 'after')
+            text_widget (tk.Text): read-only text widget showing the log
+            capacity (int): maximum number of lines kept
+            refresh_ms (int): delay between appending and writing to the widget
+            index (SearchIndex): full-text index of the log lines (optional)
+        Output: None
+        """
+        self.root = root
+        self.text = text_widget
+        self.capacity = capacity
+        self.refresh_ms = refresh_ms
+        self.entries = collections.deque(maxlen=capacity)  # Ring buffer of the last N (line, payload)
+        self.pending = collections.deque(maxlen=capacity)  # Lines not yet written to the widget
+        self.widget_lines = 0  # Number of lines currently in the widget
+        self.index = index
+        self.after_id = None
+
+    def append(self, text, payload=None):
+        """
+        Adds text to the log. Every line of the text becomes one entry.
+        The widget is updated with the next refresh tick.
+
+        Input:
+            text (str)
+            payload (bytes): raw payload of a message line (optional, for 'payload_at')
+        Output: None
+        """
+        for line in text.splitlines():
+            if line:
+                self.entries.append((line, payload))
+                self.pending.append(line)
+                if self.index is not None:
+                    self.index.add(line, payload)
+        if self.pending and self.after_id is None:
+            self.after_id = self.root.after(self.refresh_ms, self.flush)
+
+    def flush(self):
+        """
+        Writes all pending lines in one insert and trims the oldest lines in bulk.
+
+        Input: None
+        Output: None
+        """
+        self.after_id = None
+        if not self.pending:
+            return
+        lines = list(self.pending)
+        self.pending.clear()
+
+        self.text.config(state=tk.NORMAL)
+        self.text.insert("end", "\n".join(lines) + "\n")
+        self.widget_lines += len(lines)
+
+        excess = self.widget_lines - self.capacity
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")  # Removes the oldest lines at once
+            self.widget_lines = self.capacity
+        self.text.see("end")
+        self.text.config(state=tk.DISABLED)
+        if self.index is not None:
+            self.index.update()
+
+    def payload_at(self, index):
+        """
+        Returns the raw payload of the message shown in the given widget line.
+
+        Input: index (str) - text widget index, e.g. '12.5'
+        Output: bytes or None (status line or line no longer in the buffer)
+        """
+        line = int(str(index).split(".")[0])
+        # Widget lines are the oldest entries, the pending lines follow at the end
+        position = len(self.entries) - len(self.pending) - self.widget_lines + line - 1
+        if not 0 <= position < len(self.entries) or line > self.widget_lines:
+            return None
+        return self.entries[position][1]
+
+    def clear(self):
+        """
+        Removes all lines from the buffer and the widget.
+        """
+        self.entries.clear()
+        self.pending.clear()
+        self.widget_lines = 0
+        if self.index is not None:
+            self.index.clear()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", "end")
+        self.text.config(state=tk.DISABLED)
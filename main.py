@@ -2,14 +2,91 @@
 # DESCRIPTION
 #############################################################################
 """
-Brief explanation of the function: An instance of the GUI is created and then the 
+Brief explanation of the function: An instance of the GUI is created and then the
 main loop of Tkinter is started, which keeps the application running.
+
+With '--headless' no GUI is created: the messages are classified and per-topic
+counts, rates and latencies are streamed as JSON lines (see 'headless.py').
 """
 #############################################################################
 # IMPORTS
 #############################################################################
-from gui import MQTTVisualizerGUI
+import argparse
+import sys
+
+import yaml
+
+from config import Config, parse_config
+
+
+def parse_arguments():
+    """
+    Command line options (all optional, defaults from 'config.yaml').
+    """
+    parser = argparse.ArgumentParser(description="MQTT Message Flow Visualizer")
+    parser.add_argument("--headless", action="store_true", help="run without GUI and stream statistics as JSON lines")
+    parser.add_argument("--broker", help="broker address (headless mode)")
+    parser.add_argument("--port", type=int, help="broker port (headless mode)")
+    parser.add_argument("--topic", help="topic to subscribe to (headless mode)")
+    parser.add_argument("--websocket", action="store_true", help="use WebSocket transport (headless mode)")
+    parser.add_argument("--tls", action="store_true", help="enable TLS (headless mode)")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between two reports (headless mode)")
+    parser.add_argument("--output", help="append the reports to this JSONL file instead of stdout (headless mode)")
+    parser.add_argument("--record", help="record all incoming messages to this file")
+    parser.add_argument("--replay", help="replay a recorded file through the message path")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed: 1 = original, N = N times faster, 0 = maximum")
+    return parser.parse_args()
+
+
+def headless_config(args):
+    """
+    Validated configuration of the headless mode: 'config.yaml' (defaults if it is
+    missing) with broker, port and topic of the command line.
+
+    Output: Config
+    Raises: SystemExit with all problems found if the configuration is invalid
+    """
+    try:
+        data = dict(parse_config())
+    except FileNotFoundError:
+        data = {}
+    except (OSError, yaml.YAMLError, ValueError) as e:
+        sys.exit(f"Error: 'config.yaml' could not be loaded: {e}")
+    for key, value in (("broker", args.broker), ("port", args.port), ("topic", args.topic)):
+        if value is not None:
+            data[key] = value
+    try:
+        return Config(data)
+    except ValueError as e:
+        sys.exit(f"Error: invalid configuration: {e}")
+
 
 if __name__ == "__main__":
-    app = MQTTVisualizerGUI() #Creates an instance of the GUI
-    app.run() #Starts Tkinter's main loop -> application becomes active
+    args = parse_arguments()
+
+    if args.headless:
+        from headless import run_headless # No tkinter/ttkbootstrap import in this mode
+
+        config = headless_config(args)
+        run_headless(
+            config,
+            config.broker,
+            config.port,
+            config.topic,
+            websocket=args.websocket,
+            tls=args.tls,
+            interval=args.interval,
+            output=args.output,
+            record=args.record,
+            replay=args.replay,
+            speed=args.speed,
+        )
+    else:
+        from gui import MQTTVisualizerGUI
+
+        app = MQTTVisualizerGUI() #Creates an instance of the GUI
+        if args.record:
+            app.mqtt_client.start_recording(args.record)
+        if args.replay:
+            app.start_replay(args.replay, args.speed)
+        app.run() #Starts Tkinter's main loop -> application becomes active
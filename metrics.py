@@ -0,0 +1,143 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'metrics.py' keeps live metrics per topic in rolling
+windows of fixed size (messages/s, bytes/s, inter-arrival jitter, payload size
+histogram). All counters are stored in preallocated arrays (one slot per second), so
+the memory use does not grow with the number of messages.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+from array import array
+
+#############################################################################
+# PAYLOAD SIZE HISTOGRAM: BUCKET i COUNTS SIZES < 2**i BYTES
+#############################################################################
+SIZE_BUCKETS = 24  # Last bucket: 8 MB and more
+OTHER_TOPICS = "(other)"  # Collects all topics above 'max_topics'
+EMPTY_HISTOGRAM = array("L", [0] * SIZE_BUCKETS)
+
+
+def size_bucket(size):
+    """
+    Returns the histogram bucket of a payload size (log2 scale).
+    """
+    return min(size.bit_length(), SIZE_BUCKETS - 1)
+
+
+##############################################################################
+# TOPIC METRICS
+##############################################################################
+class TopicMetrics:
+    """
+    Rolling window of one topic: one slot per second, 'window' slots in a ring.
+    Jitter is the smoothed difference of consecutive inter-arrival times (RFC 3550).
+    """
+    __slots__ = ("window", "seconds", "counts", "sizes", "histogram",
+                 "last_arrival", "last_interval", "jitter")
+
+    def __init__(self, window):
+        self.window = window
+        self.seconds = array("q", [-1] * window)  # Second (int) stored in the slot
+        self.counts = array("L", [0] * window)
+        self.sizes = array("Q", [0] * window)
+        self.histogram = array("L", [0] * (window * SIZE_BUCKETS))
+        self.last_arrival = None
+        self.last_interval = None
+        self.jitter = 0.0
+
+    def record(self, size, now):
+        """
+        Adds one message of 'size' bytes received at time 'now' (seconds).
+        """
+        second = int(now)
+        slot = second % self.window
+        if self.seconds[slot] != second:  # Slot belongs to an old second -> reuse it
+            self.seconds[slot] = second
+            self.counts[slot] = 0
+            self.sizes[slot] = 0
+            start = slot * SIZE_BUCKETS
+            self.histogram[start:start + SIZE_BUCKETS] = EMPTY_HISTOGRAM
+        self.counts[slot] += 1
+        self.sizes[slot] += size
+        self.histogram[slot * SIZE_BUCKETS + size_bucket(size)] += 1
+
+        if self.last_arrival is not None:
+            interval = now - self.last_arrival
+            if self.last_interval is not None:
+                self.jitter += (abs(interval - self.last_interval) - self.jitter) / 16.0
+            self.last_interval = interval
+        self.last_arrival = now
+
+    def snapshot(self, now):
+        """
+        Returns the metrics of the last 'window' seconds.
+
+        Input: now (float) - current time in seconds
+        Output: dict - rate, bytes_rate, jitter_ms, histogram (list), count
+        """
+        oldest = int(now) - self.window
+        count = 0
+        size = 0
+        histogram = [0] * SIZE_BUCKETS
+        for slot in range(self.window):
+            if self.seconds[slot] > oldest:
+                count += self.counts[slot]
+                size += self.sizes[slot]
+                start = slot * SIZE_BUCKETS
+                for bucket in range(SIZE_BUCKETS):
+                    histogram[bucket] += self.histogram[start + bucket]
+        return {
+            "count": count,
+            "rate": count / self.window,
+            "bytes_rate": size / self.window,
+            "jitter_ms": self.jitter * 1000,
+            "histogram": histogram,
+        }
+
+
+##############################################################################
+# METRICS REGISTRY
+##############################################################################
+class MetricsRegistry:
+    """
+    +++ Responsibilities of the metrics registry +++
+
+    1. Keep one rolling window per topic
+    2. Limit the number of topics ('max_topics'); further topics share one window
+    3. Provide snapshots of all topics for the metrics panel / headless reports
+    """
+    def __init__(self, window=60, max_topics=200):
+        """
+        Input:
+            window (int): length of the rolling windows in seconds
+            max_topics (int): maximum number of topics with their own window
+        Output: None
+        """
+        self.window = window
+        self.max_topics = max_topics
+        self.topics = {}  # topic -> TopicMetrics
+
+    def record(self, topic, size, now):
+        """
+        Adds one message to the window of its topic.
+
+        Input: topic (str), size (int) - payload size in bytes, now (float) - seconds
+        Output: None
+        """
+        metrics = self.topics.get(topic)
+        if metrics is None:
+            if len(self.topics) >= self.max_topics:
+                topic = OTHER_TOPICS
+                metrics = self.topics.get(topic)
+            if metrics is None:
+                metrics = self.topics[topic] = TopicMetrics(self.window)
+        metrics.record(size, now)
+
+    def snapshot(self, now):
+        """
+        Returns the snapshots of all topics (topic -> dict, see 'TopicMetrics.snapshot').
+        """
+        return {topic: metrics.snapshot(now) for topic, metrics in self.topics.items()}
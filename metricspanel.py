@@ -0,0 +1,109 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'metricspanel.py' shows the live metrics per topic
+(see 'metrics.py') in a compact table beside the message flow diagram. The table is
+refreshed at a fixed cadence, not per message.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import time
+from tkinter import ttk
+
+#############################################################################
+# SPARKLINE FOR THE PAYLOAD SIZE HISTOGRAM
+#############################################################################
+BARS = " ▁▂▃▄▅▆▇█"
+
+
+def sparkline(histogram):
+    """
+    Returns the histogram as a short bar string (only the range of used buckets).
+    """
+    used = [index for index, count in enumerate(histogram) if count]
+    if not used:
+        return ""
+    values = histogram[used[0]:used[-1] + 1]
+    peak = max(values)
+    return "".join(BARS[max(1, count * (len(BARS) - 1) // peak)] if count else BARS[0] for count in values)
+
+
+def human_bytes(value):
+    """
+    Formats a number of bytes (B, kB, MB).
+    """
+    if value >= 2**20:
+        return f"{value / 2**20:.1f} MB"
+    if value >= 1024:
+        return f"{value / 1024:.1f} kB"
+    return f"{value:.0f} B"
+
+
+##############################################################################
+# METRICS PANEL
+##############################################################################
+class MetricsPanel:
+    """
+    +++ Responsibilities of the metrics panel +++
+
+    1. Show one row per topic: messages/s, bytes/s, jitter, payload size histogram
+    2. Refresh all rows every 'refresh_ms' (rows are updated in place)
+    """
+    COLUMNS = ("rate", "bytes", "jitter", "sizes")
+
+    def __init__(self, parent, root, registry, refresh_ms=1000):
+        """
+        Input:
+            parent: frame the panel is placed in
+            root: Tkinter root window (provides 'after')
+            registry (MetricsRegistry): rolling windows per topic
+            refresh_ms (int): refresh cadence of the table
+        Output: None
+        """
+        self.root = root
+        self.registry = registry
+        self.refresh_ms = refresh_ms
+        self.rows = {}  # topic -> row id of the table
+
+        self.frame = ttk.LabelFrame(parent, text=f"Metrics (last {registry.window} s)", padding=10)
+        self.tree = ttk.Treeview(self.frame, columns=self.COLUMNS, height=12)
+        self.tree.heading("#0", text="Topic")
+        self.tree.heading("rate", text="msg/s")
+        self.tree.heading("bytes", text="bytes/s")
+        self.tree.heading("jitter", text="jitter")
+        self.tree.heading("sizes", text="sizes")
+        self.tree.column("#0", width=140)
+        for column, width in zip(self.COLUMNS, (55, 70, 60, 90)):
+            self.tree.column(column, width=width, anchor="e")
+        self.tree.pack(fill="both", expand=True)
+        self.after_id = None
+
+    def start(self):
+        """
+        Schedules the first refresh (only once).
+        """
+        if self.after_id is None:
+            self.after_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def refresh(self):
+        """
+        Updates all rows with the current snapshot and schedules the next refresh.
+
+        Input: None
+        Output: None
+        """
+        for topic, snapshot in self.registry.snapshot(time.perf_counter()).items():
+            values = (
+                f"{snapshot['rate']:.1f}",
+                human_bytes(snapshot["bytes_rate"]),
+                f"{snapshot['jitter_ms']:.1f} ms",
+                sparkline(snapshot["histogram"]),
+            )
+            row = self.rows.get(topic)
+            if row is None:
+                self.rows[topic] = self.tree.insert("", "end", text=topic, values=values)
+            else:
+                self.tree.item(row, values=values)
+        self.after_id = self.root.after(self.refresh_ms, self.refresh)
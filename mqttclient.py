@@ -9,10 +9,14 @@ and class required for communication with an MQTT broker.
 # IMPORTS
 #############################################################################
 import paho.mqtt.client as mqtt
-import tkinter as tk
 import ssl #For TLS certificates
 import traceback #For error handling 
 
+from ingest import FLAG_DUP, FLAG_RETAIN, IngestEvent # Event records for the hand-off to the GUI
+from network import NetworkLoop # One network thread for all broker connections
+from recorder import MessageRecorder # Optional recording of the messages
+from config import Plant, load_plants # Plants (further brokers) are declared in 'config.yaml'
+
 ##############################################################################
 # MQTT METHODS + CLASS
 ##############################################################################
@@ -22,96 +26,191 @@ class MQTTClient:
 
     1. Establish connection to the MQTT broker
     2. Register callback functions for connection and message events
-    3. Pass GUI updates back to the GUI instance
+    3. Pass the events to the ingest queue (GUI or headless mode)
+    4. Manage the lifecycle of the paho client: one client per connection, which is
+       reused while broker/port/transport stay the same (only the subscription is
+       changed) and torn down before a new one is created
+
+    All callbacks ('on_connect', 'on_message', ...) run on the network thread (see 
+    'network.py', shared by all broker connections). They never touch Tkinter widgets 
+    directly, but only put events into the ingest queue, which is drained by the GUI 
+    main loop or the headless mode. The class itself does not depend on the GUI.
     """
-    def __init__(self, gui): 
+    def __init__(self, ingest, config=None, log=print, network=None, source=None, parent=None): 
         """
-        Input: gui (MQTTVisualizerGUI), 
+        Input:
+            ingest (IngestQueue): queue for connection and message events
+            config (dict): 'data' section of 'config.yaml'
+            log (callable): status messages (called from the thread calling 'connect')
+            network (NetworkLoop): shared network loop (None -> own loop)
+            source (str): name of the broker (plant), attached to all events
+            parent (MQTTClient): primary client whose recorder is shared
         Output: None
         """
-        self.gui = gui  # Reference to the GUI object
-        self.client = mqtt.Client() # Create MQTT client instance
-        # Callback-Funktionen
-        self.client.on_connect = self.on_connect # Callback on successful connection
-        self.client.on_message = self.on_message # Callback on incoming message
+        self.ingest = ingest
+        self.config = config or {}
+        self.log = log
+        self.network = network or NetworkLoop() # Started on the first 'connect'
+        self.own_network = network is None
+        self.source = source
+        self.parent = parent
+        self.client = None # Active paho client (created on 'Connect')
+        self.settings = None # (broker, port, websocket, tls) of the active client
         self.topic = None
+        self.filters = () # Topic filters to subscribe to
+        self.subscribed = None # Topic filters currently subscribed (None -> not connected)
+        self.qos = 0 # QoS of the subscriptions
+        self.subscribed_qos = 0 # QoS of the current subscriptions
+        self.recorder = None # Optional recording of all messages (see 'recorder.py')
 
-    def connect_to_broker(self):
+    def connect(self, broker, port, topic, websocket=False, tls=False, filters=None, qos=None):
         """
-        Called when the user clicks the 'Connect' button in the GUI.
+        Connects to the broker and subscribes to the topic (and all its subtopics).
+        Called when the user clicks the 'Connect' button in the GUI or by the 
+        headless mode.
 
-        Input: None,
+        Input:
+            broker (str): broker address (HIVEMQ)
+            port (int): port of the broker
+            topic (str): topic to subscribe to
+            websocket (bool): use WebSocket transport
+            tls (bool): enable TLS
+            filters (list): topic filters subscribed instead of 'topic/#' (optional)
+            qos (int): QoS of the subscriptions (None -> 'connection.qos' of 'config.yaml')
         Output: None
-    
         """
-        broker = self.gui.broker_entry.get() # Broker address (HIVEMQ)
-        port = int(self.gui.port_entry.get()) # Port as int
-        self.topic = self.gui.topic_entry.get().strip() # #Topic - Remove leading/trailing spaces
+        connection_config = self.config.get("connection") or {}
+        self.qos = connection_config.get("qos", 0) if qos is None else qos
+        self.topic = topic.strip() # #Topic - Remove leading/trailing spaces
+        self.filters = tuple(filters) if filters else (self.topic + "/#",) #MQTT Wildcard -> all subtopics
                                                 
         """
         Writes information, such as the possible absence of a topic,
-        into the log field in the GUI and then locks it again with [...]tk.DISABLED --> otherwise it is an input field.
+        into the log ('log' -> bounded log view of the GUI or stderr).
 
         Checks whether a topic has been entered.
         """
-        if not self.topic:
-            self.gui.log_text.config(state=tk.NORMAL)
-            self.gui.log_text.insert("end", "Error: No topic specified.\n")
-            self.gui.log_text.config(state=tk.DISABLED)
+        if not self.topic and not filters:
+            self.log(self.prefix + "Error: No topic specified.")
             return #Beendet Methode, falls Topic leer
 
-        # Use WebSocket transport if enabled
-        if self.gui.websocket_enabled.get():
-            self.client = mqtt.Client(transport = "websockets")
+        protocol = mqtt.MQTTv5 if str(connection_config.get("protocol", "3.1.1")) == "5" else mqtt.MQTTv311
+        settings = (broker, port, websocket, tls, protocol)
+
+        # Same broker/port/transport -> keep the connection, only change the subscription
+        if self.client is not None and settings == self.settings:
+            self.update_subscription()
+            return
+
+        # Other connection settings -> tear down the old client first
+        self.disconnect()
+        self.settings = settings
+        self.subscribed = None
+
+        # Use WebSocket transport if enabled; MQTT 5 -> user properties (e.g. publish time) of the messages
+        if websocket:
+            self.client = mqtt.Client(transport = "websockets", protocol = protocol)
         else:
-            self.client = mqtt.Client() #default connection
+            self.client = mqtt.Client(protocol = protocol) #default connection
 
         # Enable TLS if selected
-        if self.gui.tls_enabled.get():
+        if tls:
             self.client.tls_set(cert_reqs=ssl.CERT_NONE)
             self.client.tls_insecure_set(True)
 
         # Set callbacks and attempt connection
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_connect_fail = self.on_connect_fail
 
         """
-        Keep-Alive-Time: 180 Sec
+        Non-blocking connection: 'connect_async' only stores the parameters, DNS lookup,
+        TCP connect and TLS handshake run on the shared network thread ('network.py').
+        The result is reported back via 'on_connect' / 'on_connect_fail' -> ingest queue.
+
+        If the connection fails or is lost, the network loop reconnects automatically 
+        with exponential backoff (the delay doubles from 'reconnect_min_delay' up to 
+        'reconnect_max_delay').
         """
+        self.client.connect_timeout = connection_config.get("connect_timeout", 5)
         try:
-            self.client.connect(broker, port, 180) # Keep-Alive-Time
-            self.client.loop_start()
+            self.client.connect_async(broker, port, connection_config.get("keepalive", 180)) # Keep-Alive-Time
+            if self.network.ident is None:
+                self.network.start()
+            self.network.add(
+                self.client,
+                min_delay=connection_config.get("reconnect_min_delay", 1),
+                max_delay=connection_config.get("reconnect_max_delay", 120),
+            )
         except Exception as e:
-                self.gui.log_text.config(state=tk.NORMAL)
-                self.gui.log_text.insert("end", f"\n+++ Error: Connection failed! - '{e}' +++ \n")
-                self.gui.log_text.insert("end", f"\n+++ ERROR-TRACEBACK: {traceback.format_exc()} +++\n")
-                self.gui.log_text.config(state=tk.DISABLED)
+                self.log(f"+++ Error: Connection failed! - '{e}' +++")
+                self.log(f"+++ ERROR-TRACEBACK: {traceback.format_exc()} +++")
+                self.disconnect()
                 return
 
-        # On success: log to GUI
-        self.gui.log_text.config(state=tk.NORMAL)
-        self.gui.log_text.insert("end", f"\nConnected with broker '{broker}'\nSubscribing to topic: '{self.topic}'")
-        self.gui.log_text.config(state=tk.DISABLED)
+        # Connection is being established in the background
+        self.log(f"{self.prefix}Connecting to broker '{broker}' ...\nSubscribing to topic: '{', '.join(self.filters)}'")
 
-        # Connect' button turns green as long as Keep-Alive-Time is active -> currently 3 minutes
-        connect_button = self.gui.connect_button 
+    @property
+    def prefix(self):
+        """
+        Prefix of the log messages ('[<plant>] ', empty for the primary broker).
+        """
+        return f"[{self.source}] " if self.source else ""
 
-        try:
-            original_style = connect_button.cget("style")
-        except tk.TclError:
-            original_style = ""
+    def update_subscription(self):
+        """
+        Subscription diff for an existing connection: unsubscribes the old topic 
+        filters and subscribes the new ones (nothing happens if they are unchanged).
+
+        Input: None
+        Output: None
+        """
+        wanted = set(self.filters)
+        if wanted == self.subscribed and self.qos == self.subscribed_qos:
+            self.log(f"{self.prefix}Already subscribed to topic: '{', '.join(self.filters)}'")
+            return
+        if self.subscribed is not None:
+            removed = self.subscribed - wanted
+            added = wanted - self.subscribed if self.qos == self.subscribed_qos else wanted # New QoS -> subscribe again
+            if removed:
+                self.client.unsubscribe(sorted(removed))
+            if added:
+                self.client.subscribe([(topic_filter, self.qos) for topic_filter in sorted(added)])
+            self.subscribed = wanted
+            self.subscribed_qos = self.qos
+        # Not connected yet -> 'on_connect' subscribes to the new topic
+        self.log(f"{self.prefix}Subscribing to topic: '{', '.join(self.filters)}'")
+
+    def disconnect(self):
+        """
+        Tears down the active client: it is disconnected from the broker and removed
+        from the network loop (on the network thread, the caller does not wait).
+        Callbacks of the old client are ignored from now on, so the 'disconnect' event
+        (rc 0) is posted here (GUI: resets the 'Connect' button, logs 'Disconnected.').
 
-        connect_button.configure(style="success.TButton")
-        
-        # Timer for resetting the Connect button + Disconnected message
-        self.gui.root.after(180 * 1000, lambda: connect_button.configure(style=original_style))
+        Input: None
+        Output: None
+        """
+        client = self.client
+        if client is None:
+            return
+        self.client = None
+        self.settings = None
+        self.subscribed = None
+        self.network.remove(client)
+        self.ingest.put(IngestEvent("disconnect", info=0, source=self.source))
 
-        # Removes the "No current connections" message
-        self.gui.canvas.delete("no_connection")
-        self.gui.canvas.delete("no_connection2")
-        self.gui.draw_connection_arrows()
+    def close(self):
+        """
+        Disconnects and stops the network thread if this client owns it.
+        """
+        self.disconnect()
+        if self.own_network and self.network.ident is not None:
+            self.network.stop()
 
-    def on_connect(self, client, userdata, flags, rc):
+    def on_connect(self, client, userdata, flags, rc, properties=None):
         """
         Callback function when MQTT client connects.
 
@@ -119,49 +218,165 @@ class MQTTClient:
         - client: the MQTT client instance
         - userdata: custom user data (not used)
         - flags: response flags from the broker
-        - rc: result code (0 = success)
+        - rc: result code (0 = success), reason code for MQTT 5
+        - properties: CONNACK properties (MQTT 5 only)
 
         Input: multiple MQTT-specific objects; 
         Output: None
         """
-        # Successfull connection
+        if client is not self.client:
+            return # Callback of a client which was already torn down
+
+        # Successfull connection -> subscribe directly on the network thread
+        # (also after an automatic reconnect)
         if rc == 0:
-            self.gui.log_text.config(state=tk.NORMAL)
-            self.gui.log_text.insert("end", " - Successfully connected.\n")
-            self.gui.log_text.config(state=tk.DISABLED)
-            client.subscribe(self.topic + "/#") #MQTT Wildecard -> subscribe to all subtopics
-        
-        # Error message
-        else:
-            self.gui.log_text.config(state=tk.NORMAL)
-            self.gui.log_text.insert("end", f" -->  +++ Connection failed with error code '{rc}'. +++\n")
-            self.gui.log_text.config(state=tk.DISABLED)
+            client.subscribe([(topic_filter, self.qos) for topic_filter in self.filters])
+            self.subscribed = set(self.filters)
+            self.subscribed_qos = self.qos
+
+        # Result (success or error code) is logged by the GUI on the main loop
+        self.ingest.put(IngestEvent("connect", info=getattr(rc, "value", rc), source=self.source)) # MQTT 5: ReasonCode -> number
+
+    def on_disconnect(self, client, userdata, rc, properties=None):
+        """
+        Callback function when the connection is closed (rc = 0) or lost (rc != 0).
+        After a lost connection the network loop reconnects automatically (exponential backoff).
+
+        Input: multiple MQTT-specific objects; 
+        Output: None
+        """
+        if client is not self.client:
+            return # Callback of a client which was already torn down
+        self.subscribed = None
+        self.ingest.put(IngestEvent("disconnect", info=getattr(rc, "value", rc), source=self.source))
+
+    def on_connect_fail(self, client, userdata):
+        """
+        Callback function when a connection attempt fails (e.g. DNS, TCP or TLS error).
+        The network loop retries the connection automatically after the backoff delay.
+
+        Input: multiple MQTT-specific objects; 
+        Output: None
+        """
+        if client is not self.client:
+            return # Callback of a client which was already torn down
+        self.ingest.put(IngestEvent("connect_fail", source=self.source))
 
     def on_message(self, client, userdata, message):
         """
         Callback function triggered upon receiving an MQTT message.
+        DUP / RETAIN flags and the MQTT 5 user properties (publish time, message id)
+        are passed on for the latency tracking ('latency.py').
 
-        Depending on the subtopic, a different animation is triggered.
+        The message is only handed over to the ingest queue (and to the recorder, if
+        recording is active); logging and the animation depending on the subtopic 
+        are done by the GUI on the main loop. Replayed messages take the same path.
 
         Input: MQTT message components; 
         Output: None
         """
-        incoming_message = f"\nTopic: '{message.topic}'  +++ Incoming message: '{message.payload.decode('utf-8')}' +++\n"
-        self.gui.log_text.config(state=tk.NORMAL)
-        self.gui.log_text.insert("end", incoming_message)
-        self.gui.log_text.see("end")
-        self.gui.log_text.config(state=tk.DISABLED)
+        if client is not self.client:
+            return # Message of a client which was already torn down
+        recorder = (self.parent or self).recorder # Plants share the recorder of the primary client
+        if recorder is not None:
+            recorder.record(message.topic, message.payload, message.qos)
+        flags = (FLAG_DUP if message.dup else 0) | (FLAG_RETAIN if message.retain else 0)
+        user_properties = getattr(message.properties, "UserProperty", None) # MQTT 5 only
+        self.ingest.put(IngestEvent("message", message.topic, message.payload, message.qos, source=self.source,
+                                    flags=flags, properties=dict(user_properties) if user_properties else None))
 
+    def start_recording(self, path):
         """
-        Based on the subtopic, an animation is triggered as soon as the input message 
-        contains one of the topics
+        Records every incoming message to the given file (append-only).
+
+        Input: path (str)
+        Output: None
         """
-        subtopic = message.topic.split("/")[-1] # Filtering the subtopics
-        
-        # Differentiation of the input message to the animation
-        if subtopic == 'toERP':
-            self.gui.start_animation('toERP')
-        elif subtopic == 'toMES':
-            self.gui.start_animation('toMES')
-        else:
-            print(f"Unknown topic: '{message.topic}'.")
+        self.stop_recording()
+        recording_config = self.config.get("recording") or {}
+        self.recorder = MessageRecorder(path, recording_config.get("flush_interval", 1.0))
+        self.log(f"Recording messages to '{path}'.")
+
+    def stop_recording(self):
+        """
+        Stops the recording and closes the file.
+        """
+        recorder = self.recorder
+        if recorder is not None:
+            self.recorder = None
+            recorder.close()
+            self.log(f"Recording stopped ({recorder.count} messages).")
+
+
+##############################################################################
+# MULTI-BROKER FAN-IN (PLANTS)
+##############################################################################
+class BrokerFanIn:
+    """
+    +++ Responsibilities of the broker fan-in +++
+
+    1. Create one MQTTClient per plant (broker declared under 'brokers')
+    2. Share the network loop of the primary client -> one network thread in total
+    3. Tag all events of a plant with its name ('source'), 'lanes' maps the names
+       to the lanes of the diagram
+    4. Apply changed declarations ('update'): only new or changed plants are
+       (re)connected, removed plants are disconnected
+    """
+    def __init__(self, primary, plants):
+        """
+        Input:
+            primary (MQTTClient): client of the broker from the input fields / command line
+            plants (list of Plant)
+        Output: None
+        """
+        self.primary = primary
+        self.plants = plants
+        self.clients = [self.create_client(plant) for plant in plants]
+        self.lanes = {plant.name: plant.lane for plant in plants}
+
+    def create_client(self, plant):
+        primary = self.primary
+        return MQTTClient(primary.ingest, primary.config, primary.log, network=primary.network, source=plant.name, parent=primary)
+
+    def update(self, plants):
+        """
+        Applies changed plant declarations (changed 'config.yaml'). Clients of
+        unchanged plants are kept, their connections are not touched.
+
+        Input: plants (list of Plant)
+        Output: list of Plant - new or changed plants (to be connected)
+        """
+        current = {plant.name: (plant, client) for plant, client in zip(self.plants, self.clients)}
+        clients = []
+        changed = []
+        for plant in plants:
+            entry = current.pop(plant.name, None)
+            if entry is None:
+                clients.append(self.create_client(plant))
+                changed.append(plant)
+                continue
+            old_plant, client = entry
+            client.config = self.primary.config
+            clients.append(client)
+            if any(getattr(old_plant, name) != getattr(plant, name) for name in Plant.__slots__):
+                changed.append(plant)
+        for plant, client in current.values():
+            client.disconnect() # Plant removed
+        self.plants = list(plants)
+        self.clients = clients
+        self.lanes.clear() # Same dictionary -> 'lanes' of the GUI stays valid
+        self.lanes.update((plant.name, plant.lane) for plant in plants)
+        return changed
+
+    def connect(self, plants=None):
+        """
+        Connects all plants or the given ones (existing connections are reused).
+        """
+        for plant, client in zip(self.plants, self.clients):
+            if plants is not None and plant not in plants:
+                continue
+            client.connect(plant.broker, plant.port, "", websocket=plant.websocket, tls=plant.tls, filters=plant.filters, qos=plant.qos)
+
+    def disconnect(self):
+        for client in self.clients:
+            client.disconnect()
@@ -0,0 +1,305 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'network.py' contains the shared network loop of
+all broker connections. Instead of one paho thread per broker ('loop_start'), one
+thread waits on the sockets of all paho clients with a selector and calls paho's
+'loop_read' / 'loop_write' / 'loop_misc' for the clients which are ready. CPU load
+and thread count stay flat when more plants (brokers) are added.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import concurrent.futures
+import selectors
+import socket
+import threading
+import time
+import traceback
+
+
+##############################################################################
+# CONNECTION RECORD
+##############################################################################
+class Connection:
+    """
+    One paho client handled by the network loop.
+
+    client: paho client ('connect_async' already called -> host/port are set)
+    sock: socket currently registered in the selector
+    events: selector events currently registered (read / write)
+    min_delay, max_delay: reconnect backoff in seconds
+    delay: current backoff delay (doubles after every attempt without CONNACK rc 0)
+    next_attempt: time (monotonic) of the next connection attempt
+    attempt: running connection attempt (Future of the connector thread) or None
+    attempted: True while the socket of the last attempt is open -> its loss starts the backoff
+    closing: True after 'remove' -> dropped as soon as the socket is closed
+    """
+    __slots__ = ("client", "sock", "events", "min_delay", "max_delay", "delay", "next_attempt", "attempt",
+                 "attempted", "closing")
+
+    def __init__(self, client, min_delay, max_delay):
+        self.client = client
+        self.sock = None
+        self.events = 0
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min_delay
+        self.next_attempt = 0.0  # Connect immediately
+        self.attempt = None
+        self.attempted = False
+        self.closing = False
+
+
+##############################################################################
+# NETWORK LOOP
+##############################################################################
+class NetworkLoop(threading.Thread):
+    """
+    +++ Responsibilities of the network loop +++
+
+    1. Connect all added paho clients and reconnect them with exponential backoff
+    2. Wait on all sockets at once (selector) and read/write only ready clients
+    3. Run paho's housekeeping (keep-alive pings) once per 'misc_interval'
+    4. Close clients on 'remove' after the DISCONNECT packet was written
+
+    'add', 'remove' and 'stop' may be called from any thread; they only queue a
+    command and wake up the loop. The blocking part of a connection attempt (DNS,
+    TCP, TLS) runs on the connector threads, all other paho network calls run on the
+    loop thread -> a slow broker never stalls the other connections.
+    """
+    def __init__(self, misc_interval=1.0, connectors=4):
+        """
+        Input:
+            misc_interval (float): seconds between two 'loop_misc' calls
+            connectors (int): maximum number of connection attempts running at once
+        Output: None
+        """
+        super().__init__(name="mqtt-network", daemon=True)
+        self.misc_interval = misc_interval
+        self.connector = concurrent.futures.ThreadPoolExecutor(connectors, thread_name_prefix="mqtt-connect")
+        self.selector = selectors.DefaultSelector()
+        self.connections = {}  # paho client -> Connection
+        self.commands = []
+        self.lock = threading.Lock()
+        self.stopped = False
+        self.stop_deadline = None
+        # Wakes up 'select' when a command arrives or paho has data to write
+        self.wakeup_receiver, self.wakeup_sender = socket.socketpair()
+        self.wakeup_receiver.setblocking(False)
+        self.wakeup_sender.setblocking(False)
+        self.selector.register(self.wakeup_receiver, selectors.EVENT_READ)
+
+    def add(self, client, min_delay=1, max_delay=120):
+        """
+        Hands a paho client to the loop. 'connect_async' must have been called.
+
+        Input: client (paho Client), min_delay / max_delay (float) - reconnect backoff
+        Output: None
+        """
+        client.on_socket_register_write = self.wake  # New outgoing packets wake the loop
+        self.command("add", Connection(client, min_delay, max_delay))
+
+    def remove(self, client):
+        """
+        Disconnects the client and removes it from the loop.
+
+        Input: client (paho Client)
+        Output: None
+        """
+        self.command("remove", client)
+
+    def stop(self):
+        """
+        Disconnects all clients and ends the thread after the current iteration.
+        """
+        self.command("stop", None)
+
+    def command(self, name, argument):
+        with self.lock:
+            self.commands.append((name, argument))
+        self.wake()
+
+    def wake(self, *args):
+        """
+        Interrupts the 'select' of the loop (also used as paho's 'on_socket_register_write').
+        """
+        try:
+            self.wakeup_sender.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Loop is already woken up (or stopped)
+
+    def run(self):
+        next_misc = time.monotonic() + self.misc_interval
+        while not self.stopped or self.connections:
+            self.handle_commands()
+            now = time.monotonic()
+            timeout = next_misc - now
+            for connection in list(self.connections.values()):
+                timeout = min(timeout, self.update(connection, now))
+
+            for key, events in self.selector.select(max(0.0, timeout)):
+                if key.fileobj is self.wakeup_receiver:
+                    self.drain_wakeup()
+                    continue
+                connection = key.data
+                if events & selectors.EVENT_READ:
+                    self.read(connection)
+                if events & selectors.EVENT_WRITE and connection.client.socket() is not None:
+                    connection.client.loop_write()
+                self.check_socket(connection)
+
+            now = time.monotonic()
+            if now >= next_misc:
+                next_misc = now + self.misc_interval
+                for connection in self.connections.values():
+                    if connection.attempt is None:  # The connector thread owns the client meanwhile
+                        connection.client.loop_misc()  # Keep-alive ping / timeout
+                        self.check_socket(connection)
+            if self.stopped and now >= self.stop_deadline:
+                break  # Brokers did not take the DISCONNECT in time
+        self.connector.shutdown(wait=False)
+        self.selector.close()
+        self.wakeup_receiver.close()
+        self.wakeup_sender.close()
+
+    def handle_commands(self):
+        """
+        Executes the queued 'add' / 'remove' / 'stop' commands on the loop thread.
+        """
+        with self.lock:
+            commands, self.commands = self.commands, []
+        for name, argument in commands:
+            if name == "add":
+                self.connections[argument.client] = argument
+            elif name == "remove":
+                self.close(self.connections.get(argument))
+            elif name == "stop":
+                self.stopped = True
+                self.stop_deadline = time.monotonic() + 2.0
+                for connection in list(self.connections.values()):
+                    self.close(connection)
+
+    def close(self, connection):
+        if connection is None or connection.closing:
+            return
+        connection.closing = True
+        if connection.attempt is not None:
+            return  # Disconnected as soon as the running attempt is finished ('update')
+        connection.client.disconnect()  # DISCONNECT is written by the loop, then paho closes the socket
+        if connection.client.socket() is None:
+            self.forget(connection)
+
+    def forget(self, connection):
+        self.unregister(connection)
+        self.connections.pop(connection.client, None)
+
+    def update(self, connection, now):
+        """
+        Connects or reconnects the client if needed and registers its socket for
+        the events it waits for.
+
+        Input: connection (Connection), now (float)
+        Output: float - seconds until the client needs the loop again
+        """
+        client = connection.client
+        if connection.attempt is not None:
+            if not connection.attempt.done():
+                return self.misc_interval  # The connector thread wakes the loop when it is done
+            if self.attempt_finished(connection, now) and connection.closing:
+                client.disconnect()  # Removed during the attempt
+        sock = client.socket()
+        if sock is None:
+            self.unregister(connection)
+            if connection.closing:
+                self.forget(connection)
+                return self.misc_interval
+            if connection.attempted:
+                # Socket closed without CONNACK rc 0 (refused, dropped) or connection
+                # lost -> wait before the next attempt
+                connection.attempted = False
+                self.back_off(connection, now)
+            if now < connection.next_attempt:
+                return connection.next_attempt - now
+            connection.attempt = self.connector.submit(client.reconnect)
+            connection.attempt.add_done_callback(self.wake)
+            return self.misc_interval
+        if client.is_connected():
+            connection.delay = connection.min_delay  # CONNACK rc 0 -> reset the backoff
+
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.want_write() else 0)
+        if sock is not connection.sock:
+            self.unregister(connection)
+            self.selector.register(sock, events, connection)
+            connection.sock = sock
+            connection.events = events
+        elif events != connection.events:
+            self.selector.modify(sock, events, connection)
+            connection.events = events
+        return self.misc_interval
+
+    def attempt_finished(self, connection, now):
+        """
+        Takes the result of a connection attempt of the connector thread. On failure
+        the next attempt is scheduled after the backoff delay and paho's
+        'on_connect_fail' callback is called.
+
+        Input: connection (Connection), now (float)
+        Output: bool - True if the socket is open (CONNACK still pending)
+        """
+        attempt, connection.attempt = connection.attempt, None
+        if attempt.exception() is None:
+            connection.attempted = True
+            return True
+        self.back_off(connection, now)
+        client = connection.client
+        on_connect_fail = client.on_connect_fail
+        if on_connect_fail is not None and not connection.closing:
+            on_connect_fail(client, None)
+        return False
+
+    def back_off(self, connection, now):
+        connection.next_attempt = now + connection.delay
+        connection.delay = min(connection.delay * 2, connection.max_delay)
+
+    def read(self, connection):
+        """
+        Reads all available packets, including data buffered inside TLS / WebSocket
+        wrappers (invisible to the selector).
+        """
+        client = connection.client
+        sock = client.socket()
+        while sock is not None:
+            try:
+                client.loop_read()
+            except Exception:
+                traceback.print_exc()
+                return
+            sock = client.socket()
+            if not (hasattr(sock, "pending") and sock.pending()):
+                return
+
+    def check_socket(self, connection):
+        """
+        Unregisters a socket closed by paho right away, before its file descriptor
+        can be reused by the socket of another connection.
+        """
+        if connection.sock is not None and connection.client.socket() is not connection.sock:
+            self.unregister(connection)
+
+    def unregister(self, connection):
+        if connection.sock is not None:
+            try:
+                self.selector.unregister(connection.sock)
+            except (KeyError, ValueError):
+                pass  # Socket was already closed by paho
+            connection.sock = None
+            connection.events = 0
+
+    def drain_wakeup(self):
+        try:
+            while self.wakeup_receiver.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
@@ -0,0 +1,96 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'payload.py' turns raw MQTT payloads (bytes) into
+text for the GUI. Payloads stay raw bytes in the message path and are only decoded
+when they are displayed: the log shows a preview of the first bytes (hex preview for
+binary data), the full body is decoded only on demand ("expand" view). Payloads cut
+by the ingest process are marked with their original size.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import binascii
+import re
+
+CONTROL_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")  # Everything except \t, \n, \r
+
+
+##############################################################################
+# PREVIEW (LOG LINE)
+##############################################################################
+def decode_text(data, truncated=False):
+    """
+    Decodes UTF-8 text. If the data was cut in the middle of a multi-byte character
+    ('truncated'), the incomplete character is dropped.
+
+    Input: data (bytes/memoryview), truncated (bool)
+    Output: str or None (no valid UTF-8 or control characters -> binary data)
+    """
+    try:
+        text = str(data, "utf-8")
+    except UnicodeDecodeError as e:
+        if not (truncated and e.start >= len(data) - 3 and e.reason == "unexpected end of data"):
+            return None
+        text = str(data[:e.start], "utf-8")
+    if CONTROL_CHARACTERS.search(text):
+        return None
+    return text
+
+
+class CutPayload(bytes):
+    """
+    Payload which was cut by the ingest process; 'size' is the original size.
+    """
+    def __new__(cls, data, size):
+        payload = super().__new__(cls, data)
+        payload.size = size
+        return payload
+
+
+def preview_payload(payload, limit=200, size=None):
+    """
+    Returns a one-line preview of the payload: at most 'limit' bytes are decoded,
+    binary payloads are shown as hex. Larger payloads are marked with their size.
+
+    Input:
+        payload (bytes), limit (int) - maximum number of bytes shown
+        size (int): original size of a payload which was cut before (None -> len(payload))
+    Output: str
+    """
+    length = len(payload)
+    size = length if size is None else size
+    truncated = length > limit
+    head = memoryview(payload)[:limit] if truncated else payload  # No copy of the full payload
+
+    text = decode_text(head, truncated or length < size)
+    if text is None:
+        text = "hex: " + binascii.hexlify(head[:limit // 2], " ").decode("ascii")
+        truncated = length > limit // 2
+    else:
+        text = text.replace("\r", "\\r").replace("\n", "\\n")  # One log line per message
+    if truncated or length < size:
+        text += f" ... ({size} bytes)"
+    return text
+
+
+##############################################################################
+# FULL BODY (EXPAND VIEW)
+##############################################################################
+def format_payload(payload, bytes_per_line=16):
+    """
+    Returns the full payload as text: decoded UTF-8 or a hex dump for binary data.
+
+    Input: payload (bytes)
+    Output: str
+    """
+    text = decode_text(payload, isinstance(payload, CutPayload))
+    if text is not None:
+        return text
+    lines = []
+    for offset in range(0, len(payload), bytes_per_line):
+        chunk = payload[offset:offset + bytes_per_line]
+        ascii_text = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+        lines.append(f"{offset:08x}  {binascii.hexlify(chunk, ' ').decode('ascii'):<{bytes_per_line * 3}} {ascii_text}")
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'pipeline.py' contains the GUI-independent core of
+the message processing: every incoming message is classified (topic -> flow, payload
+rules may choose another flow) and counted per topic. The GUI and the headless mode both use this pipeline.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import time
+
+from ingest import FLAG_CLASSIFIED
+from metrics import OTHER_TOPICS
+
+
+##############################################################################
+# TOPIC STATISTICS
+##############################################################################
+class TopicStats:
+    """
+    Counters of one topic since the start and since the last report.
+    """
+    __slots__ = ("topic", "flow", "count", "bytes", "interval_count", "interval_bytes",
+                 "latency_sum", "latency_max")
+
+    def __init__(self, topic, flow):
+        self.topic = topic
+        self.flow = flow
+        self.count = 0
+        self.bytes = 0
+        self.interval_count = 0
+        self.interval_bytes = 0
+        self.latency_sum = 0.0  # Time from reception (network thread) to processing
+        self.latency_max = 0.0
+
+
+##############################################################################
+# EVENT PIPELINE
+##############################################################################
+class EventPipeline:
+    """
+    +++ Responsibilities of the event pipeline +++
+
+    1. Classify incoming messages: topic -> flow (routing table), payload rules first
+    2. Keep per-topic counters (messages, bytes, latency); at most 'max_topics' topics,
+       further topics share the '(other)' counters
+    3. Feed the rolling metrics windows (messages/s, bytes/s, jitter, payload sizes)
+    4. Feed the end-to-end latency per flow (publish time -> reception, 'latency.py')
+    5. Provide reports (counts, rates, latencies) of the topics active in the interval
+       for the headless mode
+    """
+    def __init__(self, router, metrics=None, rules=None, latency=None, max_topics=200):
+        """
+        Input:
+            router (FlowRouter)
+            metrics (MetricsRegistry): rolling windows per topic (optional)
+            rules (RuleEngine): payload rules (optional)
+            latency (LatencyTracker): end-to-end latency per flow (optional)
+            max_topics (int): maximum number of topics with their own counters
+        Output: None
+        """
+        self.router = router
+        self.metrics = metrics
+        self.rules = rules if rules else None  # No rules declared -> payloads are never parsed
+        self.latency = latency
+        self.max_topics = max_topics
+        self.topics = {}  # topic ("[plant] topic" for plants) -> TopicStats
+        self.last_report = time.perf_counter()
+
+    def set_routing(self, router, rules=None):
+        """
+        Replaces routing table and payload rules (changed 'config.yaml'); the counters
+        are kept, the topics are routed again.
+        """
+        self.router = router
+        self.rules = rules if rules else None
+        for stats in self.topics.values():
+            if stats.topic is not None:
+                stats.flow = router.resolve(stats.topic)
+
+    def process(self, event):
+        """
+        Classifies a message event and updates the counters of its topic.
+
+        Input: event (IngestEvent) - 'message' event
+        Output: Flow or None (neither a rule nor the topic routes it to a flow)
+        """
+        key = event.topic if event.source is None else f"[{event.source}] {event.topic}"  # Plants counted separately
+        stats = self.topics.get(key)
+        if stats is None:
+            if len(self.topics) < self.max_topics:
+                stats = self.topics[key] = TopicStats(event.topic, self.router.resolve(event.topic))
+            else:
+                stats = self.topics.get(OTHER_TOPICS)
+                if stats is None:
+                    stats = self.topics[OTHER_TOPICS] = TopicStats(None, None)  # Mixed topics -> no flow
+        size = event.size
+        now = time.perf_counter()
+        latency = now - event.received
+        if self.metrics is not None:
+            self.metrics.record(key, size, now)
+        stats.count += 1
+        stats.bytes += size
+        stats.interval_count += 1
+        stats.interval_bytes += size
+        stats.latency_sum += latency
+        if latency > stats.latency_max:
+            stats.latency_max = latency
+        if event.flags & FLAG_CLASSIFIED:
+            flow = event.flow  # Rules already applied by the ingest process
+        else:
+            flow = None
+            if self.rules is not None:
+                flow = self.rules.classify(event.topic, event.payload)
+            if flow is None:
+                flow = stats.flow if stats.topic is not None else self.router.resolve(event.topic)
+        if self.latency is not None:
+            self.latency.record(event, flow)
+        return flow
+
+    def report(self):
+        """
+        Returns the counters of the topics with messages since the last report and
+        resets the interval counters (idle topics are left out).
+
+        Input: None
+        Output: dict - topic -> counts, rates and latencies
+        """
+        now = time.perf_counter()
+        elapsed = max(now - self.last_report, 1e-9)
+        self.last_report = now
+        windows = self.metrics.snapshot(now) if self.metrics is not None else {}
+
+        report = {}
+        for topic, stats in self.topics.items():
+            interval_count = stats.interval_count
+            if not interval_count:
+                continue
+            report[topic] = entry = {
+                "flow": stats.flow.name if stats.flow is not None else None,
+                "count": stats.count,
+                "bytes": stats.bytes,
+                "rate": round(interval_count / elapsed, 2),
+                "bytes_rate": round(stats.interval_bytes / elapsed, 2),
+                "latency_ms_avg": round(stats.latency_sum / interval_count * 1000, 3),
+                "latency_ms_max": round(stats.latency_max * 1000, 3),
+            }
+            window = windows.get(topic)
+            if window is not None:
+                entry["window_rate"] = round(window["rate"], 2)
+                entry["window_bytes_rate"] = round(window["bytes_rate"], 2)
+                entry["jitter_ms"] = round(window["jitter_ms"], 3)
+            stats.interval_count = 0
+            stats.interval_bytes = 0
+            stats.latency_sum = 0.0
+            stats.latency_max = 0.0
+        return report
@@ -0,0 +1,477 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'procingest.py' moves the receive path into its
+own process ('connection: core: process'). The ingest process owns the paho clients
+(primary broker and plants), classifies every message (routing table + payload rules)
+and reads its publish time; the results are written as fixed-layout records into a
+ring buffer in shared memory. The GUI process only drains the ring on its ingest pump
+and renders -> JSON parsing and paho no longer compete with Tk for the GIL.
+
+Ring buffer (single producer, single consumer): a header with write index, read index
+and drop counter, followed by 'slots' records of the same size. The producer writes a
+record and then advances the write index, the consumer reads and then advances the
+read index; the two processes never wait on each other. The indexes are aligned
+8-byte stores; the hand-off relies on stores becoming visible in program order,
+which only x86-64 guarantees (Python has no memory barriers) -> 'ORDERED_STORES',
+the GUI uses the selector core on other CPUs. If the ring is full, new messages are
+dropped (counted), the GUI catches up with the existing ones. Topics and payloads are
+cut to 'topic_bytes' / 'payload_bytes'; cut payloads keep their original size and are
+marked with FLAG_TRUNCATED.
+
+Commands (connect, disconnect, recording, replay, stop) go from the GUI to the
+ingest process through a multiprocessing queue.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import math
+import multiprocessing
+import platform
+import queue
+import struct
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+
+from ingest import FLAG_CLASSIFIED, FLAG_TRUNCATED, IngestEvent
+
+KINDS = ("message", "connect", "disconnect", "connect_fail", "status")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# Header: write index, drop counter (producer) | read index (consumer, own cache line)
+WRITE_OFFSET = 0
+DROPPED_OFFSET = 8
+READ_OFFSET = 64
+HEADER_SIZE = 128
+INDEX = struct.Struct("Q")  # Native format: one aligned 8-byte store ('<Q' is written byte by byte -> torn reads)
+
+# Record: kind, flags, qos, flow (-1 = none), source (-1 = primary broker), info (result code),
+# topic length, payload size (original), reception (epoch), publish time (NaN = none),
+# message id (hash, only with RECORD_ID)
+RECORD = struct.Struct("<BBBxhhiHIddq")
+RECORD_ID = 0x80  # Record flag: the message has a message id
+
+# Stores become visible to the other process in program order (x86-64 only, e.g. not on ARM)
+ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64")
+
+
+##############################################################################
+# SHARED RING BUFFER
+##############################################################################
+class SharedRing:
+    """
+    Layout of the ring buffer, shared by the writer (ingest process) and the reader (GUI).
+    """
+    def __init__(self, memory, slots, topic_bytes=256, payload_bytes=1024):
+        """
+        Input:
+            memory (SharedMemory): segment of at least 'ring_size' bytes
+            slots (int): number of records in the ring
+            topic_bytes (int): maximum topic length per record
+            payload_bytes (int): maximum payload length per record
+        Output: None
+        """
+        self.memory = memory
+        self.buffer = memory.buf
+        self.slots = slots
+        self.topic_bytes = topic_bytes
+        self.payload_bytes = payload_bytes
+        self.slot_size = record_size(topic_bytes, payload_bytes)
+
+    def index(self, offset):
+        return INDEX.unpack_from(self.buffer, offset)[0]
+
+    @property
+    def dropped(self):
+        return self.index(DROPPED_OFFSET)
+
+    def __len__(self):
+        return self.index(WRITE_OFFSET) - self.index(READ_OFFSET)
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+
+
+def record_size(topic_bytes, payload_bytes):
+    return RECORD.size + topic_bytes + payload_bytes
+
+
+def ring_size(slots, topic_bytes, payload_bytes):
+    return HEADER_SIZE + slots * record_size(topic_bytes, payload_bytes)
+
+
+class RingWriter(SharedRing):
+    """
+    +++ Responsibilities of the ring writer (ingest process) +++
+
+    1. Take the events of the MQTT clients ('put', same interface as the ingest queue)
+    2. Classify messages (payload rules, routing table) and read their publish time
+    3. Write one fixed-layout record per event; drop new events while the ring is full
+    """
+    def __init__(self, memory, slots, topic_bytes=256, payload_bytes=1024, router=None, rules=None,
+                 latency=None, sources=()):
+        """
+        Input:
+            memory, slots, topic_bytes, payload_bytes: see SharedRing
+            router (FlowRouter): routing table (flow index = position in 'router.flows')
+            rules (RuleEngine): payload rules (optional)
+            latency (LatencyTracker): reads the publish times (optional)
+            sources (sequence): plant names (source index = position)
+        Output: None
+        """
+        super().__init__(memory, slots, topic_bytes, payload_bytes)
+        self.write_index = self.index(WRITE_OFFSET)
+        self.dropped_count = self.index(DROPPED_OFFSET)
+        self.lock = threading.Lock()  # Network thread, replay thread and status messages share the ring
+        self.set_routing(router, rules, latency, sources)
+
+    def set_routing(self, router, rules=None, latency=None, sources=()):
+        """
+        Replaces routing table, rules, latency tracker and plant names (also while
+        messages arrive, changed 'config.yaml').
+        """
+        with self.lock:
+            self.router = router
+            self.rules = rules if rules else None
+            self.latency = latency
+            self.flow_index = {flow.name: index for index, flow in enumerate(router.flows)} if router else {}
+            self.source_index = {name: index for index, name in enumerate(sources)}
+
+    def put(self, event):
+        """
+        Writes one event into the ring. Called from the network thread of the ingest process.
+
+        Input: event (IngestEvent)
+        Output: None
+        """
+        with self.lock:
+            self.write(event)
+
+    def write(self, event):
+        write_index = self.write_index
+        if write_index - self.index(READ_OFFSET) >= self.slots:
+            self.dropped_count += 1  # Ring full -> the GUI is behind, the new event is dropped
+            INDEX.pack_into(self.buffer, DROPPED_OFFSET, self.dropped_count)
+            return
+
+        flow = -1
+        sent = math.nan
+        message_id = 0
+        flags = event.flags
+        info = 0
+        if event.kind == "message":
+            topic = event.topic.encode("utf-8", "replace")[:self.topic_bytes]
+            payload = event.payload
+            found = self.rules.classify(event.topic, payload) if self.rules is not None else None
+            if found is None:
+                found = self.router.resolve(event.topic)
+            if found is not None:
+                flow = self.flow_index[found.name]
+            if self.latency is not None:
+                publish_time, publish_id = self.latency.publish_info(event)
+                if publish_time is not None:
+                    sent = publish_time
+                if publish_id is not None:
+                    message_id = hash(publish_id) & 0x7FFFFFFFFFFFFFFF  # Only compared within this process
+                    flags |= RECORD_ID
+        elif event.kind == "status":
+            topic = b""
+            payload = event.info.encode("utf-8", "replace")
+        else:
+            topic = b""
+            payload = b""
+            info = event.info or 0
+        size = len(payload)
+        if size > self.payload_bytes:
+            payload = payload[:self.payload_bytes]
+            if event.kind == "message":
+                flags |= FLAG_TRUNCATED  # Marked in the GUI, kept out of the history
+
+        offset = HEADER_SIZE + (write_index % self.slots) * self.slot_size
+        buffer = self.buffer
+        RECORD.pack_into(
+            buffer, offset, KIND_CODES[event.kind], flags, event.qos, flow,
+            self.source_index.get(event.source, -1), info, len(topic), size,
+            time.time() - (time.perf_counter() - event.received), sent, message_id,
+        )
+        start = offset + RECORD.size
+        buffer[start:start + len(topic)] = topic
+        start += self.topic_bytes
+        buffer[start:start + len(payload)] = payload
+        # Record complete -> publish it to the reader
+        self.write_index = write_index + 1
+        INDEX.pack_into(buffer, WRITE_OFFSET, self.write_index)
+
+    def status(self, text):
+        """
+        Status messages of the MQTT clients -> log of the GUI.
+        """
+        self.put(IngestEvent("status", info=text))
+
+
+class RingReader(SharedRing):
+    """
+    +++ Responsibilities of the ring reader (GUI process) +++
+
+    1. Hand out the records as IngestEvents ('get', same interface as the ingest queue)
+    2. Resolve flow and plant indexes (same 'config.yaml' as the ingest process)
+    """
+    def __init__(self, memory, slots, topic_bytes=256, payload_bytes=1024, flows=(), sources=()):
+        """
+        Input:
+            memory, slots, topic_bytes, payload_bytes: see SharedRing
+            flows (sequence of Flow): flows of the routing table (same order as in the writer)
+            sources (sequence): plant names (same order as in the writer)
+        Output: None
+        """
+        super().__init__(memory, slots, topic_bytes, payload_bytes)
+        self.flows = tuple(flows)
+        self.sources = tuple(sources)
+        self.read_index = self.index(READ_OFFSET)
+        self.available = self.read_index  # Write index seen last (read again when reached)
+
+    def get(self):
+        """
+        Returns the oldest record as IngestEvent or None if the ring is empty.
+        """
+        read_index = self.read_index
+        if read_index >= self.available:
+            self.available = self.index(WRITE_OFFSET)
+            if read_index >= self.available:
+                return None
+        buffer = self.buffer
+        offset = HEADER_SIZE + (read_index % self.slots) * self.slot_size
+        kind, flags, qos, flow, source, info, topic_length, size, received, sent, message_id = RECORD.unpack_from(buffer, offset)
+        start = offset + RECORD.size
+        topic = bytes(buffer[start:start + topic_length]).decode("utf-8", "replace")
+        start += self.topic_bytes
+        payload = bytes(buffer[start:start + min(size, self.payload_bytes)])
+        # Record copied -> the writer may reuse the slot
+        self.read_index = read_index + 1
+        INDEX.pack_into(buffer, READ_OFFSET, self.read_index)
+
+        kind = KINDS[kind]
+        source = self.sources[source] if 0 <= source < len(self.sources) else None  # Out of range: written before a reload
+        if kind == "status":
+            return IngestEvent(kind, info=payload.decode("utf-8", "replace"), source=source)
+        if kind != "message":
+            return IngestEvent(kind, info=info, source=source)
+        event = IngestEvent(kind, topic, payload, qos, source=source, flags=(flags & ~RECORD_ID) | FLAG_CLASSIFIED)
+        event.received -= time.time() - received  # Reception in the ingest process (own clock of this process)
+        event.size = size
+        event.flow = self.flows[flow] if 0 <= flow < len(self.flows) else None
+        event.publish = (None if math.isnan(sent) else sent, message_id if flags & RECORD_ID else None)
+        return event
+
+
+##############################################################################
+# INGEST PROCESS (GUI SIDE)
+##############################################################################
+class IngestProcess:
+    """
+    +++ Responsibilities of the ingest process handle +++
+
+    1. Create the shared ring and start the ingest process ('run_ingest')
+    2. Forward the commands of the GUI (same methods as MQTTClient: 'connect',
+       'disconnect', 'start_recording', 'stop_recording'; 'replay', 'reload')
+    3. Stop the process and release the shared memory ('stop')
+
+    'plants' stands in for the BrokerFanIn of the GUI: the plants are connected inside
+    the ingest process. 'ident' / 'stop' match the network cores ('network.py').
+    """
+    def __init__(self, config, flows, plants, slots=8192, topic_bytes=256, payload_bytes=1024):
+        """
+        Input:
+            config (dict): 'data' section of 'config.yaml' (passed to the ingest process)
+            flows (sequence of Flow): flows of the GUI's routing table
+            plants (list of Plant): plants of 'config.yaml'
+            slots, topic_bytes, payload_bytes: size of the ring (see SharedRing)
+        Output: None
+        """
+        sources = [plant.name for plant in plants]
+        self.memory = shared_memory.SharedMemory(create=True, size=ring_size(slots, topic_bytes, payload_bytes))
+        self.memory.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self.reader = RingReader(self.memory, slots, topic_bytes, payload_bytes, flows, sources)
+        context = multiprocessing.get_context("spawn")  # No fork of the Tk process
+        self.commands = context.Queue()
+        self.process = context.Process(
+            target=run_ingest,
+            args=(self.memory.name, slots, topic_bytes, payload_bytes, config, self.commands),
+            name="mqtt-ingest",
+            daemon=True,
+        )
+        self.process.start()
+        self.plants = RemotePlants(self, plants)
+
+    @property
+    def ident(self):
+        return None if self.reader.buffer is None else self.process.pid  # Until the ring is released
+
+    def send(self, *command):
+        self.commands.put(command)
+
+    def connect(self, broker, port, topic, websocket=False, tls=False, filters=None, qos=None):
+        self.send("connect", broker, port, topic, websocket, tls, filters, qos)
+
+    def disconnect(self):
+        self.send("disconnect")
+
+    def start_recording(self, path):
+        self.send("start_recording", path)
+
+    def stop_recording(self):
+        self.send("stop_recording")
+
+    def replay(self, path, speed=1.0):
+        self.send("replay", path, speed)
+
+    def reload(self, config, flows, plants):
+        """
+        Applies a changed 'config.yaml': the ingest process routes with the new flows
+        and rules and updates its plants; the reader resolves the new indexes.
+
+        Input: config (dict) - 'data' section, flows (sequence of Flow), plants (list of Plant)
+        Output: None
+        """
+        self.reader.flows = tuple(flows)
+        self.reader.sources = tuple(plant.name for plant in plants)
+        self.send("config", config)
+
+    def stop(self, timeout=5.0):
+        """
+        Stops the ingest process (DISCONNECTs are sent there) and releases the ring.
+        """
+        if self.process.is_alive():
+            self.send("stop")
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.reader.close()
+        self.memory.unlink()
+
+
+class RemotePlants:
+    """
+    Plants connected by the ingest process (interface of BrokerFanIn).
+    """
+    def __init__(self, ingest_process, plants):
+        self.ingest_process = ingest_process
+        self.plants = plants
+        self.clients = []  # No client in the GUI process
+        self.lanes = {plant.name: plant.lane for plant in plants}
+
+    def connect(self, plants=None):
+        self.ingest_process.send("connect_plants")
+
+    def update(self, plants):
+        """
+        New plant declarations: the ingest process connects changed plants itself ('reload').
+        """
+        self.plants = plants
+        self.lanes.clear()
+        self.lanes.update((plant.name, plant.lane) for plant in plants)
+        return []
+
+    def disconnect(self):
+        self.ingest_process.send("disconnect_plants")
+
+
+##############################################################################
+# INGEST PROCESS (MAIN FUNCTION)
+##############################################################################
+def run_ingest(name, slots, topic_bytes, payload_bytes, config, commands):
+    """
+    Main function of the ingest process: MQTT clients, classification and ring
+    writer; then executes the commands of the GUI until 'stop' (or until the GUI
+    process is gone).
+
+    Input:
+        name (str): name of the shared memory segment
+        slots, topic_bytes, payload_bytes: size of the ring
+        config (dict): 'data' section of 'config.yaml'
+        commands (multiprocessing.Queue): commands of the GUI
+    Output: None
+    """
+    from mqttclient import MQTTClient, BrokerFanIn, load_plants
+    from network import NetworkLoop
+    from routing import FlowRouter, load_flows
+    from rules import RuleEngine, load_rules
+    from latency import load_latency
+    from recorder import Replayer
+
+    memory = shared_memory.SharedMemory(name)
+    router = FlowRouter(load_flows(config.get("flows")))
+    plants = load_plants(config.get("brokers"))
+    ring = RingWriter(
+        memory, slots, topic_bytes, payload_bytes, router,
+        RuleEngine(*load_rules(config.get("rules"), router.flows)),
+        load_latency(config.get("latency")),
+        [plant.name for plant in plants],
+    )
+    network = NetworkLoop()
+    client = MQTTClient(ring, config, ring.status, network=network)
+    fan_in = BrokerFanIn(client, plants)
+    replayer = None
+    plants_connected = False
+    parent = multiprocessing.parent_process()
+
+    try:
+        while True:
+            try:
+                command, *args = commands.get(timeout=1.0)
+            except queue.Empty:
+                if parent is not None and not parent.is_alive():
+                    break  # GUI process is gone
+                continue
+            if command == "stop":
+                break
+            try:
+                if command == "connect":
+                    broker, port, topic, websocket, tls, filters, qos = args
+                    client.connect(broker, port, topic, websocket=websocket, tls=tls, filters=filters, qos=qos)
+                elif command == "connect_plants":
+                    fan_in.connect()
+                    plants_connected = True
+                elif command == "disconnect":
+                    client.disconnect()
+                elif command == "disconnect_plants":
+                    fan_in.disconnect()
+                    plants_connected = False
+                elif command == "start_recording":
+                    client.start_recording(*args)
+                elif command == "stop_recording":
+                    client.stop_recording()
+                elif command == "replay":
+                    path, speed = args
+                    ring.status(f"Replaying '{path}' (speed: {speed or 'max'}).")
+                    replayer = Replayer(path, client, speed)
+                    replayer.start()
+                elif command == "config":
+                    new_config, = args
+                    old_connection, new_connection = config.get("connection") or {}, new_config.get("connection") or {}
+                    inherited_changed = any(old_connection.get(key) != new_connection.get(key) for key in ("qos", "protocol"))
+                    config = client.config = new_config
+                    router = FlowRouter(load_flows(config.get("flows")))
+                    plants = load_plants(config.get("brokers"))
+                    ring.set_routing(router, RuleEngine(*load_rules(config.get("rules"), router.flows)),
+                                     load_latency(config.get("latency")), [plant.name for plant in plants])
+                    changed = fan_in.update(plants)
+                    if plants_connected:
+                        # Plants inheriting QoS / protocol resubscribe / reconnect, otherwise only changed plants
+                        fan_in.connect(None if inherited_changed else changed)
+            except Exception as e:  # A failed command must not end the ingest process
+                ring.status(f"+++ Error: Ingest process command '{command}' failed! - '{e}' +++")
+                ring.status(f"+++ ERROR-TRACEBACK: {traceback.format_exc()} +++")
+    finally:
+        if replayer is not None:
+            replayer.stop()
+        client.stop_recording()
+        fan_in.disconnect()
+        client.disconnect()
+        if network.ident is not None:
+            network.stop()  # Sends the DISCONNECTs and ends the network thread
+        ring.close()
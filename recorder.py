@@ -0,0 +1,192 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'recorder.py' records incoming MQTT messages to an
+append-only binary file and replays such a recording through the normal
+'MQTTClient.on_message' path (1x, Nx or maximum speed). Used for offline debugging
+and as a realistic load generator.
+
+File format: 8 byte header 'MQTTREC1', then one record per message:
+    timestamp (double, seconds since epoch), qos (uint8), topic length (uint16),
+    payload length (uint32), topic (UTF-8), payload (raw bytes)
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import mmap
+import os
+import struct
+import threading
+import time
+
+#############################################################################
+# FILE FORMAT
+#############################################################################
+MAGIC = b"MQTTREC1"
+RECORD_HEADER = struct.Struct("<dBHI")  # timestamp, qos, topic length, payload length
+
+
+##############################################################################
+# RECORDING
+##############################################################################
+class MessageRecorder:
+    """
+    +++ Responsibilities of the recorder +++
+
+    1. Append every message (timestamp, topic, QoS, raw payload) to the file
+    2. Buffer the writes in memory and flush them periodically (not per message);
+       a flusher thread writes them within 'flush_interval', also without traffic
+    """
+    def __init__(self, path, flush_interval=1.0, buffer_size=1 << 20):
+        """
+        Input:
+            path (str): recording file (created or appended)
+            flush_interval (float): seconds between two flushes
+            buffer_size (int): size of the write buffer in bytes
+        Output: None
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab", buffering=buffer_size)
+        if new_file:
+            self.file.write(MAGIC)
+        self.lock = threading.Lock()
+        self.pending = False  # Records written since the last flush
+        self.count = 0
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.run, name="recorder-flush", daemon=True)
+        self.flusher.start()
+
+    def record(self, topic, payload, qos=0, timestamp=None):
+        """
+        Appends one message. Called from the network thread.
+
+        Input: topic (str), payload (bytes), qos (int), timestamp (float, default: now)
+        Output: None
+        """
+        encoded_topic = topic.encode("utf-8")
+        header = RECORD_HEADER.pack(timestamp or time.time(), qos, len(encoded_topic), len(payload))
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(header)
+            self.file.write(encoded_topic)
+            self.file.write(payload)
+            self.count += 1
+            self.pending = True
+
+    def run(self):
+        """
+        Flusher thread: flushes the buffered records every 'flush_interval' seconds.
+        """
+        while not self.closed.wait(self.flush_interval):
+            with self.lock:
+                if self.file is None:
+                    return
+                if self.pending:
+                    self.file.flush()
+                    self.pending = False
+
+    def close(self):
+        """
+        Flushes and closes the file.
+        """
+        self.closed.set()
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+##############################################################################
+# REPLAY
+##############################################################################
+class RecordedMessage:
+    """
+    Same attributes as paho's MQTTMessage, created from a record of the file.
+    """
+    __slots__ = ("topic", "payload", "qos", "retain", "mid", "dup", "timestamp", "properties")
+
+    def __init__(self, topic, payload, qos, timestamp):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = False
+        self.mid = 0
+        self.dup = False
+        self.timestamp = timestamp
+        self.properties = None
+
+
+def read_recording(path):
+    """
+    Yields the messages of a recording. The file is memory-mapped, so it is not
+    read into memory as a whole.
+
+    Input: path (str)
+    Output: generator of RecordedMessage
+    Raises: ValueError if the file is no recording
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size <= len(MAGIC):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"'{path}' is no message recording.")
+            offset = len(MAGIC)
+            end = len(data)
+            while offset + RECORD_HEADER.size <= end:
+                timestamp, qos, topic_length, payload_length = RECORD_HEADER.unpack_from(data, offset)
+                offset += RECORD_HEADER.size
+                if offset + topic_length + payload_length > end:
+                    break  # Incomplete last record (recording was interrupted)
+                topic = data[offset:offset + topic_length].decode("utf-8")
+                offset += topic_length
+                payload = data[offset:offset + payload_length]
+                offset += payload_length
+                yield RecordedMessage(topic, payload, qos, timestamp)
+
+
+class Replayer(threading.Thread):
+    """
+    Feeds a recording into 'MQTTClient.on_message' from its own thread (like paho's
+    network thread), keeping the original time gaps divided by 'speed'.
+    speed = 0 replays as fast as possible.
+    """
+    def __init__(self, path, mqtt_client, speed=1.0):
+        """
+        Input:
+            path (str): recording file
+            mqtt_client (MQTTClient): client whose 'on_message' is called
+            speed (float): 1 -> original speed, N -> N times faster, 0 -> maximum
+        Output: None
+        """
+        super().__init__(name="mqtt-replay", daemon=True)
+        self.path = path
+        self.mqtt_client = mqtt_client
+        self.speed = speed
+        self.count = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        first_timestamp = None
+        for message in read_recording(self.path):
+            if self.stopped.is_set():
+                break
+            if self.speed:
+                if first_timestamp is None:
+                    first_timestamp = message.timestamp
+                delay = start + (message.timestamp - first_timestamp) / self.speed - time.monotonic()
+                if delay > 0 and self.stopped.wait(delay):
+                    break
+            self.mqtt_client.on_message(self.mqtt_client.client, None, message)
+            self.count += 1
+
+    def stop(self):
+        """
+        Stops the replay after the current message.
+        """
+        self.stopped.set()
@@ -0,0 +1,194 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'routing.py' maps MQTT topics to the flows of the
+message flow diagram. The flows are declared in 'config.yaml' as MQTT topic filters
+(with '+' and '#') and waypoint paths. The filters are precompiled into a topic trie,
+resolved topics are kept in an LRU cache.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import functools
+
+#############################################################################
+# DEFAULT FLOWS (used if 'config.yaml' does not declare any flows)
+#############################################################################
+DEFAULT_FLOWS = [
+    {
+        "name": "toMES",
+        "filters": ["+/toMES", "+/+/toMES"],
+        "sprite": "yellow_envelope",
+        # SAP -> UCC (SAP) -> 'Retrieve production order' -> 'toMES' -> 'New production order'
+        "path": [[225, 150], [190, 315], [318, 265], [440, 170]],
+        "arrows": ["sap_to_ucc", "ucc_left", "ucc_to_interface", "sap_to_interface",
+                   "interface_up", "interface_to_tomes", "tomes_to_mes"],
+    },
+    {
+        "name": "toERP",
+        "filters": ["+/toERP", "+/+/toERP"],
+        "sprite": "red_envelope",
+        # MES -> 'toERP' -> OData interface -> SAP ('Update production order')
+        "path": [[430, 220], [370, 280], [80, 250]],
+        "arrows": ["mes_down", "mes_to_toerp", "toerp_to_interface", "interface_to_sap"],
+    },
+]
+
+# Named arrows of the diagram ('draw_static_diagram' in 'gui.py'), flows may list them under 'arrows'
+ARROWS = ("sap_to_ucc", "interface_to_sap", "sap_to_interface", "ucc_left", "ucc_to_interface", "mes_to_toerp",
+          "mes_down", "interface_up", "interface_to_tomes", "tomes_to_mes", "toerp_to_interface")
+
+
+##############################################################################
+# FLOW
+##############################################################################
+class Flow:
+    """
+    One flow of the diagram: topic filters, envelope image, waypoints and the names
+    of the diagram arrows the flow runs along (used for the aggregated display).
+    """
+    __slots__ = ("name", "filters", "sprite", "path", "arrows")
+
+    def __init__(self, name, filters, sprite, path, arrows=()):
+        self.name = name
+        self.filters = filters
+        self.sprite = sprite
+        self.path = path
+        self.arrows = arrows
+
+    def __repr__(self):
+        return f"Flow({self.name!r})"
+
+
+def check_filter(topic_filter):
+    """
+    Checks the syntax of an MQTT topic filter: '+' and '#' fill a whole level, '#'
+    only as the last level.
+
+    Input: topic_filter (str)
+    Output: None
+    Raises: ValueError if the filter is invalid
+    """
+    if not isinstance(topic_filter, str) or not topic_filter:
+        raise ValueError(f"Invalid topic filter {topic_filter!r}: must be a non-empty string.")
+    levels = topic_filter.split("/")
+    for index, level in enumerate(levels):
+        if ("+" in level or "#" in level) and len(level) > 1:
+            raise ValueError(f"Invalid topic filter '{topic_filter}': '+' and '#' must fill a whole level.")
+        if level == "#" and index != len(levels) - 1:
+            raise ValueError(f"Invalid topic filter '{topic_filter}': '#' must be the last level.")
+
+
+def load_flows(declarations):
+    """
+    Creates the flows from the declarations of 'config.yaml'.
+
+    Input: declarations (list of dict) - name, filters, sprite, path, arrows (optional)
+    Output: list of Flow
+    Raises: ValueError if a declaration is incomplete or a topic filter is invalid
+    """
+    flows = []
+    for declaration in declarations or DEFAULT_FLOWS:
+        try:
+            name = declaration["name"]
+            filters = declaration["filters"]
+            sprite = declaration["sprite"]
+            path = tuple((int(x), int(y)) for x, y in declaration["path"])
+            arrows = tuple(declaration.get("arrows") or ())
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid flow declaration '{declaration}': {e}") from None
+        if isinstance(filters, str):
+            filters = [filters]
+        if not path:
+            raise ValueError(f"Flow '{name}' has no waypoints.")
+        for topic_filter in filters:
+            check_filter(topic_filter)
+        flows.append(Flow(name, tuple(filters), sprite, path, arrows))
+    return flows
+
+
+##############################################################################
+# TOPIC TRIE
+##############################################################################
+class TopicTrie:
+    """
+    Trie of MQTT topic filters. Every level of a filter is one node; '+' matches
+    exactly one level, '#' matches all remaining levels (including none).
+    """
+    def __init__(self):
+        self.root = {}  # level -> child node; the values of a node are stored under None
+
+    def insert(self, topic_filter, value):
+        """
+        Adds a topic filter with its value.
+
+        Input: topic_filter (str), value (any)
+        Output: None
+        """
+        node = self.root
+        for level in topic_filter.split("/"):
+            node = node.setdefault(level, {})
+        node.setdefault(None, []).append(value)
+
+    def match(self, topic):
+        """
+        Returns the values of all filters matching the topic.
+
+        Input: topic (str)
+        Output: list
+        """
+        levels = topic.split("/")
+        matches = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, index = stack.pop()
+            wildcard = node.get("#")
+            if wildcard is not None:
+                matches.extend(wildcard.get(None, ()))
+            if index == len(levels):
+                matches.extend(node.get(None, ()))
+                continue
+            for key in (levels[index], "+"):
+                child = node.get(key)
+                if child is not None:
+                    stack.append((child, index + 1))
+        return matches
+
+
+##############################################################################
+# FLOW ROUTER
+##############################################################################
+class FlowRouter:
+    """
+    +++ Responsibilities of the flow router +++
+
+    1. Precompile the topic filters of all flows into a topic trie
+    2. Resolve a topic to its flow (the first declared flow wins)
+    3. Cache resolved topics (LRU), so repeated topics cost one dictionary lookup
+    """
+    def __init__(self, flows, cache_size=1024):
+        """
+        Input:
+            flows (list of Flow)
+            cache_size (int): number of cached topics
+        Output: None
+        """
+        self.flows = flows
+        self.trie = TopicTrie()
+        for index, flow in enumerate(flows):
+            for topic_filter in flow.filters:
+                self.trie.insert(topic_filter, index)
+        self.resolve = functools.lru_cache(maxsize=cache_size)(self.match_flow)
+
+    def match_flow(self, topic):
+        """
+        Returns the flow for the topic or None (uncached, see 'resolve').
+
+        Input: topic (str)
+        Output: Flow or None
+        """
+        matches = self.trie.match(topic)
+        if not matches:
+            return None
+        return self.flows[min(matches)]
@@ -0,0 +1,211 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'rules.py' classifies messages by their JSON
+payload. Several message kinds (new order, update, status, ...) can share the same
+subtopic; rules declared in 'config.yaml' match on payload fields and send the
+message to another flow (arrow path) than its topic would.
+
+The rules are compiled once into predicates over a tuple of field values. The field
+values of a payload are extracted with one JSON parse and kept in an LRU cache, so
+repeated payloads cost one dictionary lookup. 'orjson' is used if it is installed.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import functools
+import json
+
+try:
+    import orjson  # Optional, faster JSON parser
+    parse_json = orjson.loads
+except ImportError:
+    parse_json = json.loads
+
+from routing import TopicTrie, check_filter
+
+MISSING = object()  # Field not present in the payload
+ANY = "*"  # Rule value: the field only has to exist
+
+
+##############################################################################
+# RULE
+##############################################################################
+class Rule:
+    """
+    One compiled rule: topic filters, conditions on payload fields and target flow.
+
+    conditions: tuple of (field index, allowed values or None -> field must exist)
+    """
+    __slots__ = ("name", "filters", "conditions", "flow")
+
+    def __init__(self, name, filters, conditions, flow):
+        self.name = name
+        self.filters = filters
+        self.conditions = conditions
+        self.flow = flow
+
+    def matches(self, values):
+        """
+        Input: values (tuple) - extracted field values of the payload
+        Output: bool
+        """
+        for index, allowed in self.conditions:
+            value = values[index]
+            if value is MISSING:
+                return False
+            if allowed is not None and value not in allowed:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"Rule({self.name!r} -> {self.flow.name!r})"
+
+
+def load_rules(declarations, flows):
+    """
+    Compiles the rules of 'config.yaml'. Field names may be dotted paths into nested
+    objects ('order.kind'); a value may be a single value, a list of values or '*'.
+
+    Input:
+        declarations (list of dict) - name (optional), topics (optional, default '#'),
+                                      match (field -> value), flow
+        flows (list of Flow)
+    Output: tuple (list of Rule, tuple of field paths)
+    Raises: ValueError if a declaration is incomplete, names an unknown flow or has an
+            invalid topic filter
+    """
+    flows_by_name = {flow.name: flow for flow in flows}
+    fields = {}  # field path -> index in the value tuple
+    rules = []
+    for number, declaration in enumerate(declarations or (), 1):
+        try:
+            name = declaration.get("name", f"rule {number}")
+            filters = declaration.get("topics", ["#"])
+            match = declaration["match"]
+            flow_name = declaration["flow"]
+            items = match.items()
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid rule declaration '{declaration}': {e}") from None
+        if flow_name not in flows_by_name:
+            raise ValueError(f"Rule '{name}' refers to unknown flow '{flow_name}'.")
+        if isinstance(filters, str):
+            filters = [filters]
+        for topic_filter in filters:
+            check_filter(topic_filter)
+
+        conditions = []
+        for field, value in items:
+            path = tuple(str(field).split("."))
+            index = fields.setdefault(path, len(fields))
+            try:
+                if value == ANY:
+                    allowed = None
+                elif isinstance(value, (list, tuple)):
+                    allowed = frozenset(value)
+                else:
+                    allowed = frozenset((value,))
+            except TypeError:
+                raise ValueError(f"Rule '{name}': only scalar values can be matched ('{field}').") from None
+            conditions.append((index, allowed))
+        rules.append(Rule(name, tuple(filters), tuple(conditions), flows_by_name[flow_name]))
+    return rules, tuple(fields)
+
+
+##############################################################################
+# RULE ENGINE
+##############################################################################
+class RuleEngine:
+    """
+    +++ Responsibilities of the rule engine +++
+
+    1. Select the rules of a topic (topic trie, LRU cache per topic)
+    2. Extract the field values used by the rules from a JSON payload (one parse,
+       LRU cache per payload)
+    3. Return the flow of the first matching rule (declaration order)
+    """
+    def __init__(self, rules, fields, cache_size=1024, max_cached_payload=4096):
+        """
+        Input:
+            rules (list of Rule), fields (tuple of field paths) - see 'load_rules'
+            cache_size (int): number of cached topics / payloads
+            max_cached_payload (int): larger payloads are parsed every time
+        Output: None
+        """
+        self.rules = rules
+        self.fields = fields
+        self.max_cached_payload = max_cached_payload
+        self.trie = TopicTrie()
+        for index, rule in enumerate(rules):
+            for topic_filter in rule.filters:
+                self.trie.insert(topic_filter, index)
+        self.rules_for = functools.lru_cache(maxsize=cache_size)(self.match_rules)
+        self.cached_values = functools.lru_cache(maxsize=cache_size)(self.extract)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match_rules(self, topic):
+        """
+        Returns the rules whose topic filters match the topic (uncached, see 'rules_for').
+
+        Input: topic (str)
+        Output: tuple of Rule (declaration order)
+        """
+        return tuple(self.rules[index] for index in sorted(set(self.trie.match(topic))))
+
+    def extract(self, payload):
+        """
+        Parses the payload once and returns the values of all rule fields
+        (uncached, see 'values').
+
+        Input: payload (bytes)
+        Output: tuple - value or MISSING per field; None if the payload is no JSON object
+        """
+        try:
+            document = parse_json(payload)
+        except ValueError:  # Also orjson.JSONDecodeError
+            return None
+        if not isinstance(document, dict):
+            return None
+        values = []
+        for path in self.fields:
+            value = document
+            for key in path:
+                if not isinstance(value, dict):
+                    value = MISSING
+                    break
+                value = value.get(key, MISSING)
+            if isinstance(value, (dict, list)):
+                value = MISSING  # Only scalar values can be compared
+            values.append(value)
+        return tuple(values)
+
+    def values(self, payload):
+        """
+        Field values of the payload, cached for small payloads.
+        """
+        if len(payload) > self.max_cached_payload:
+            return self.extract(payload)
+        return self.cached_values(bytes(payload))
+
+    def classify(self, topic, payload):
+        """
+        Returns the flow of the first rule matching topic and payload.
+
+        Input: topic (str), payload (bytes)
+        Output: Flow or None (no rule matches -> flow of the topic)
+        """
+        rules = self.rules_for(topic)
+        if not rules:
+            return None
+        if payload[:1] != b"{" and payload.lstrip()[:1] != b"{":
+            return None  # No JSON object -> not parsed at all
+        values = self.values(payload)
+        if values is None:
+            return None
+        for rule in rules:
+            if rule.matches(values):
+                return rule.flow
+        return None
@@ -0,0 +1,127 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'scene.py' is a small scene graph on top of the
+Tkinter canvas. The items of the diagram are created once and addressed by name;
+changes are sent to Tk only for options which really changed, and groups of items
+are hidden / shown instead of being deleted and recreated. The canvas item table
+therefore stays the same size during long runs.
+"""
+#############################################################################
+# ITEM STATES
+#############################################################################
+HIDDEN = "hidden"
+NORMAL = "normal"
+
+
+##############################################################################
+# SCENE ITEM RECORD
+##############################################################################
+class SceneItem:
+    """
+    One named canvas item.
+
+    item_id: canvas item
+    coords: current coordinates of the item (tuple)
+    options: current options of the item (as last sent to Tk)
+    """
+    __slots__ = ("item_id", "coords", "options")
+
+    def __init__(self, item_id, coords, options):
+        self.item_id = item_id
+        self.coords = coords
+        self.options = options
+
+
+##############################################################################
+# SCENE
+##############################################################################
+class Scene:
+    """
+    +++ Responsibilities of the scene +++
+
+    1. Create every named item exactly once ('add' of an existing name is ignored)
+    2. Update items only with the options or coordinates which changed
+       ('configure', 'place')
+    3. Show / hide groups of items ('show') instead of deleting them
+    """
+    def __init__(self, canvas):
+        """
+        Input: canvas (Canvas)
+        Output: None
+        """
+        self.canvas = canvas
+        self.items = {}  # name -> SceneItem
+        self.groups = {}  # group -> list of item names
+        self.updates = 0  # Number of 'itemconfigure' calls sent to Tk
+
+    def add(self, name, kind, coords, group=None, hidden=False, **options):
+        """
+        Creates a named item (once).
+
+        Input:
+            name (str): name of the item in the scene
+            kind (str): canvas item type ('rectangle', 'text', 'line', 'image', ...)
+            coords (sequence): coordinates of the item
+            group (str): group for 'show' (optional)
+            hidden (bool): create the item hidden
+            options: canvas options (fill, width, text, ...)
+        Output: int - canvas item
+        """
+        item = self.items.get(name)
+        if item is not None:
+            return item.item_id
+        options["state"] = HIDDEN if hidden else NORMAL
+        item_id = getattr(self.canvas, "create_" + kind)(*coords, **options)
+        self.items[name] = SceneItem(item_id, tuple(coords), options)
+        if group is not None:
+            self.groups.setdefault(group, []).append(name)
+        return item_id
+
+    def __contains__(self, name):
+        return name in self.items
+
+    def item_id(self, name):
+        return self.items[name].item_id
+
+    def configure(self, name, **options):
+        """
+        Sends the options which differ from the current ones to Tk (dirty items only).
+
+        Input: name (str), options - canvas options
+        Output: bool - True if the item was updated
+        """
+        item = self.items[name]
+        current = item.options
+        changed = {key: value for key, value in options.items() if current.get(key) != value}
+        if not changed:
+            return False
+        self.canvas.itemconfigure(item.item_id, **changed)
+        current.update(changed)
+        self.updates += 1
+        return True
+
+    def place(self, name, coords):
+        """
+        Moves an item to new coordinates (only sent to Tk if they differ).
+
+        Input: name (str), coords (sequence) - coordinates as for 'add'
+        Output: bool - True if the item was moved
+        """
+        item = self.items[name]
+        coords = tuple(coords)
+        if item.coords == coords:
+            return False
+        self.canvas.coords(item.item_id, *coords)
+        item.coords = coords
+        self.updates += 1
+        return True
+
+    def show(self, group, visible=True):
+        """
+        Shows or hides all items of a group.
+        """
+        state = NORMAL if visible else HIDDEN
+        for name in self.groups.get(group, ()):
+            self.configure(name, state=state)
@@ -0,0 +1,182 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'searchindex.py' contains the full-text index of
+the message log (inverted index). Every log line (topic + payload) is split into
+words (letters, digits, '_'); each word maps to the ascending sequence numbers of the
+lines containing it. A query only checks the lines of the words containing its most
+selective word, so a search over the whole retention window takes milliseconds
+instead of a scan of the text widget. Words are used instead of trigrams: about 1/7
+of the postings per line and a fraction of the indexing time on the receive path.
+
+The index keeps exactly the last 'capacity' lines (same retention as the log view):
+lines live in a ring buffer, posting lists of evicted lines are pruned in bulk.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import bisect
+import collections
+import re
+
+WORD = re.compile(r"\w+")  # Words of the index ('PO-0150123' -> 'po', '0150123')
+
+
+##############################################################################
+# SEARCH INDEX
+##############################################################################
+class SearchIndex:
+    """
+    +++ Responsibilities of the search index +++
+
+    1. Collect new log lines ('add', cheap) and index them in batches ('update')
+    2. Keep the last 'capacity' lines in a ring buffer; prune the posting lists of
+       evicted lines once per 'capacity' indexed lines
+    3. Answer substring queries (case-insensitive), newest matches last
+    """
+    def __init__(self, capacity=1000, max_bytes=512, preview_bytes=0):
+        """
+        Input:
+            capacity (int): number of lines kept in the index (log retention)
+            max_bytes (int): payload bytes indexed per message
+            preview_bytes (int): payload bytes already contained in the log line
+        Output: None
+        """
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.preview_bytes = preview_bytes
+        self.lines = [None] * capacity  # Ring buffer: slot -> (sequence, text (lower case), line, payload)
+        self.pending = collections.deque(maxlen=capacity)  # (line, payload) not yet indexed
+        self.postings = {}  # word -> list of sequence numbers (ascending)
+        self.next_sequence = 0  # Sequence number of the next indexed line
+        self.since_compaction = 0
+
+    def __len__(self):
+        return min(self.next_sequence, self.capacity)
+
+    @property
+    def oldest(self):
+        """
+        Sequence number of the oldest retained line.
+        """
+        return max(0, self.next_sequence - self.capacity)
+
+    def add(self, line, payload=None):
+        """
+        Queues one log line for the next batch. Called for every message.
+
+        Input: line (str), payload (bytes, optional)
+        Output: None
+        """
+        self.pending.append((line, payload))
+
+    def update(self):
+        """
+        Indexes all queued lines (one batch per log refresh tick). Lines which were
+        already pushed out of the retention window are never indexed.
+
+        Input: None
+        Output: int - number of indexed lines
+        """
+        pending = self.pending
+        count = len(pending)
+        postings = self.postings
+        max_bytes = self.max_bytes
+        preview_bytes = self.preview_bytes
+        while pending:
+            line, payload = pending.popleft()
+            text = line
+            if payload is not None and len(payload) > preview_bytes and max_bytes > preview_bytes:
+                text += "\n" + payload[preview_bytes:max_bytes].decode("utf-8", "replace")  # Rest beyond the preview
+            text = text.lower()
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.lines[sequence % self.capacity] = (sequence, text, line, payload)
+            for word in set(WORD.findall(text)):
+                posting = postings.get(word)
+                if posting is None:
+                    postings[word] = [sequence]
+                else:
+                    posting.append(sequence)
+        self.since_compaction += count
+        if self.since_compaction >= self.capacity:
+            self.compact()
+        return count
+
+    def compact(self):
+        """
+        Removes the sequence numbers of evicted lines from all posting lists (and
+        words without retained lines). Memory stays proportional to 'capacity'.
+        """
+        oldest = self.oldest
+        for word in list(self.postings):
+            posting = self.postings[word]
+            start = bisect.bisect_left(posting, oldest)
+            if start == len(posting):
+                del self.postings[word]
+            elif start:
+                del posting[:start]
+        self.since_compaction = 0
+
+    def search(self, query, limit=500):
+        """
+        Returns the retained lines containing the query (case-insensitive).
+
+        Input: query (str), limit (int) - maximum number of results (newest are kept)
+        Output: list of (line, payload), oldest first
+        """
+        self.update()
+        query = query.lower()
+        if not query:
+            return []
+        oldest = self.oldest
+        selected = None  # Posting lists of the most selective query word
+        selected_count = 0
+        for part in sorted(set(WORD.findall(query)), key=len, reverse=True):  # Long words are selective
+            # A query word may be part of an indexed word ('0150' -> '0150123')
+            postings = [posting for word, posting in self.postings.items() if part in word]
+            if not postings:
+                return []
+            count = sum(map(len, postings))
+            if selected is None or count < selected_count:
+                selected = postings
+                selected_count = count
+            if selected_count <= limit:
+                break  # Few enough lines to check them all
+        if selected is None:
+            candidates = range(self.next_sequence - 1, oldest - 1, -1)  # No word in the query -> all lines
+        else:
+            candidates = self.newest_first(selected, oldest)
+
+        results = []
+        capacity = self.capacity
+        for sequence in candidates:  # Newest first, stop at 'limit'
+            entry = self.lines[sequence % capacity]
+            if query in entry[1]:  # Words match -> confirm the whole query
+                results.append((entry[2], entry[3]))
+                if len(results) >= limit:
+                    break
+        results.reverse()
+        return results
+
+    @staticmethod
+    def newest_first(postings, oldest):
+        """
+        Sequence numbers of the posting lists (from 'oldest' on), newest first.
+        """
+        if len(postings) == 1:
+            posting = postings[0]
+            start = bisect.bisect_left(posting, oldest)
+            return (posting[i] for i in range(len(posting) - 1, start - 1, -1))
+        sequences = set()
+        for posting in postings:
+            sequences.update(posting[bisect.bisect_left(posting, oldest):])
+        return sorted(sequences, reverse=True)
+
+    def clear(self):
+        self.lines = [None] * self.capacity
+        self.pending.clear()
+        self.postings.clear()
+        self.next_sequence = 0
+        self.since_compaction = 0
@@ -0,0 +1,139 @@
+#############################################################################
+# DESCRIPTION
+#############################################################################
+"""
+Brief explanation of the function: 'searchview.py' contains the search/filter bar of
+the message log. While a query is entered, the log widget is replaced by the lines
+matching the query (answered by the index of 'searchindex.py', matches highlighted);
+the results follow new messages. An empty query shows the normal log again.
+"""
+#############################################################################
+# IMPORTS
+#############################################################################
+import tkinter as tk
+from tkinter import ttk
+
+
+##############################################################################
+# SEARCH BAR
+##############################################################################
+class SearchBar:
+    """
+    +++ Responsibilities of the search bar +++
+
+    1. Run the query shortly after the last key stroke (debounced)
+    2. Show the matching lines instead of the log widget, newest at the bottom
+    3. Refresh the results while new lines are indexed
+    4. Hand out the payload of a result line ('payload_at', like the log view)
+    """
+    def __init__(self, parent, root, index, log_widget, limit=500, debounce_ms=150, refresh_ms=500):
+        """
+        Input:
+            parent: frame of the log (the bar is placed above the log widget)
+            root: Tkinter root window (provides 'after')
+            index (SearchIndex): full-text index of the log
+            log_widget (tk.Text): log widget, hidden while results are shown
+            limit (int): maximum number of result lines (newest)
+            debounce_ms (int): delay between the last key stroke and the query
+            refresh_ms (int): refresh cadence of the results while a query is active
+        Output: None
+        """
+        self.root = root
+        self.index = index
+        self.log_widget = log_widget
+        self.limit = limit
+        self.debounce_ms = debounce_ms
+        self.refresh_ms = refresh_ms
+        self.query = ""
+        self.payloads = []  # Payload per result line
+        self.indexed = -1  # 'next_sequence' of the index when the results were built
+        self.search_id = None
+        self.refresh_id = None
+
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill="x", pady=(0, 5), before=log_widget)
+        ttk.Label(self.frame, text="Search:").pack(side="left", padx=(0, 5))
+        self.entry = ttk.Entry(self.frame, width=40)
+        self.entry.pack(side="left")
+        self.entry.bind("<KeyRelease>", self.schedule)
+        self.entry.bind("<Escape>", lambda event: self.reset())
+        ttk.Button(self.frame, text="Clear", command=self.reset).pack(side="left", padx=5)
+        self.status = ttk.Label(self.frame, text="")
+        self.status.pack(side="left", padx=5)
+
+        self.results = tk.Text(parent, wrap="word", height=10, state=tk.DISABLED)
+        self.results.tag_configure("match", background="#FFD700", foreground="black")
+
+    def schedule(self, event=None):
+        """
+        Runs the query 'debounce_ms' after the last key stroke.
+        """
+        if self.search_id is not None:
+            self.root.after_cancel(self.search_id)
+        self.search_id = self.root.after(self.debounce_ms, self.search)
+
+    def reset(self):
+        self.entry.delete(0, "end")
+        self.search()
+
+    def search(self):
+        """
+        Applies the current query: shows the results or, for an empty query, the log.
+        """
+        self.search_id = None
+        self.query = self.entry.get().strip()
+        if not self.query:
+            if self.refresh_id is not None:
+                self.root.after_cancel(self.refresh_id)
+                self.refresh_id = None
+            self.results.pack_forget()
+            self.log_widget.pack(fill="both", expand=True)
+            self.status.configure(text="")
+            return
+        self.log_widget.pack_forget()
+        self.results.pack(fill="both", expand=True)
+        self.show_results()
+        if self.refresh_id is None:
+            self.refresh_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def refresh(self):
+        """
+        Rebuilds the results if new lines were indexed since the last query.
+        """
+        if self.index.next_sequence != self.indexed:
+            self.show_results()
+        self.refresh_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def show_results(self):
+        """
+        Writes the matching lines in one insert and highlights the query.
+        """
+        matches = self.index.search(self.query, self.limit)
+        self.indexed = self.index.next_sequence
+        lines = [line for line, payload in matches]
+        self.payloads = [payload for line, payload in matches]
+
+        self.results.config(state=tk.NORMAL)
+        self.results.delete("1.0", "end")
+        self.results.insert("end", "\n".join(lines))
+        query = self.query.lower()
+        for number, line in enumerate(lines, 1):
+            lowered = line.lower()
+            start = lowered.find(query)
+            while start >= 0:  # Matches in the payload beyond the preview are not visible
+                self.results.tag_add("match", f"{number}.{start}", f"{number}.{start + len(query)}")
+                start = lowered.find(query, start + len(query))
+        self.results.see("end")
+        self.results.config(state=tk.DISABLED)
+
+        suffix = f" (newest {self.limit})" if len(lines) >= self.limit else ""
+        self.status.configure(text=f"{len(lines)} of {len(self.index)} lines{suffix}")
+
+    def payload_at(self, index):
+        """
+        Returns the payload of the result line at the given widget index (or None).
+        """
+        line = int(str(index).split(".")[0])
+        if 1 <= line <= len(self.payloads):
+            return self.payloads[line - 1]
+        return None